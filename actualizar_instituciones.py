@@ -0,0 +1,37 @@
+"""Actualiza el indice persistente de instituciones con los CSV del SAT.
+
+Asigna un inst_id a cada institucion de data/clean/ (año por año, en orden) y
+agrega los alias nuevos a data/instituciones.csv. El dashboard solo lee ese
+archivo; correr este script despues de agregar o cambiar un año.
+
+    python actualizar_instituciones.py
+"""
+import argparse
+import sys
+
+from utils.instituciones import RUTA_INSTITUCIONES, IndiceInstituciones
+from utils.sat import DIRECTORIO_SAT, cargar_anios, descubrir_anios
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--directorio", default=DIRECTORIO_SAT, help="directorio con un CSV por año académico")
+    parser.add_argument("--indice", default=RUTA_INSTITUCIONES)
+    args = parser.parse_args()
+
+    anios = descubrir_anios(args.directorio)
+    if not anios:
+        sys.exit(f"error: no hay CSV en '{args.directorio}'")
+
+    indice = IndiceInstituciones.cargar(args.indice)
+    alias_previos = len(indice.tabla)
+    df = cargar_anios(anios, indice)
+    modificado = indice.modificado
+    indice.guardar(args.indice)
+    print(f" {len(anios)} años, {df['inst_id'].nunique()} instituciones; "
+          f"{len(indice.tabla) - alias_previos} alias nuevos "
+          f"({'guardado en' if modificado else 'sin cambios en'} '{args.indice}').")
+
+
+if __name__ == "__main__":
+    main()
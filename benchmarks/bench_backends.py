@@ -0,0 +1,63 @@
+"""Precision y throughput de los backends del modelo de sentimiento.
+
+Usa las etiquetas fp32 que ya estan en comentarios_con_sentimiento.csv como
+referencia y mide, para cada backend, comentarios por segundo y porcentaje
+de etiquetas que coinciden. Los modelos se leen de modelos/ (ver
+exportar_modelo.py), asi que no necesita conexion.
+
+    python benchmarks/bench_backends.py --n 500
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.inferencia import MotorInferencia  # noqa: E402
+from utils.registro import ruta_repo  # noqa: E402
+
+ETIQUETAS = {"positivo": "POS", "negativo": "NEG", "neutro": "NEU"}
+CONFIGURACIONES = [
+    ("pytorch fp32", "pytorch", ruta_repo("modelos", "robertuito")),
+    ("pytorch int8", "int8", ruta_repo("modelos", "robertuito")),
+    ("onnx fp32", "onnx", ruta_repo("modelos", "robertuito-onnx")),
+    ("onnx int8", "onnx", ruta_repo("modelos", "robertuito-onnx-int8")),
+]
+
+
+def cargar_referencia(ruta, n):
+    with open(ruta, encoding="utf-8") as f:
+        filas = list(csv.DictReader(f))[:n]
+    return [fila["texto"] for fila in filas], [ETIQUETAS[fila["sentimiento"]] for fila in filas]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv", default=ruta_repo("comentarios_con_sentimiento.csv"))
+    parser.add_argument("--n", type=int, default=500, help="cantidad de comentarios a evaluar")
+    parser.add_argument("--hilos", type=int, default=None, help="hilos por backend (default: todos)")
+    args = parser.parse_args()
+
+    textos, referencia = cargar_referencia(args.csv, args.n)
+    print(f"{'backend':<14} {'coment/s':>10} {'speedup':>8} {'acuerdo':>8}")
+    base = None
+    for nombre, backend, directorio in CONFIGURACIONES:
+        if not os.path.isdir(directorio):
+            print(f"{nombre:<14} (sin modelo en '{directorio}', corre exportar_modelo.py)")
+            continue
+        with MotorInferencia(directorio, procesos=1, hilos_por_proceso=args.hilos, backend=backend) as motor:
+            motor(textos[:16])  # calentamiento: carga del modelo fuera de la medicion
+            inicio = time.perf_counter()
+            resultados = motor(textos)
+            segundos = time.perf_counter() - inicio
+
+        throughput = len(textos) / segundos
+        base = base or throughput
+        acuerdo = sum(r["label"] == e for r, e in zip(resultados, referencia)) / len(textos) * 100
+        print(f"{nombre:<14} {throughput:>10.1f} {throughput / base:>7.2f}x {acuerdo:>7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Densidades de los puntajes SAT: KDE directo (como sns.kdeplot) contra binning + FFT.
+
+Usa los datos SAT sinteticos de benchmarks/sinteticos.py a la escala pedida y
+calcula una curva por cada combinacion año x seccion x region. El KDE directo
+es scipy.stats.gaussian_kde evaluado en 200 puntos, lo que hace seaborn por
+cada curva; el otro es utils/densidad.py. Reporta tiempos y el error maximo
+relativo entre ambas curvas.
+
+    python benchmarks/bench_densidad.py --escala 10
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.stats import gaussian_kde
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_suite import DIRECTORIO_DATOS, preparar_datos  # noqa: E402
+from utils.densidad import densidades_por  # noqa: E402
+from utils.sat import COLUMNAS_SAT, cargar_anios, descubrir_anios  # noqa: E402
+
+POR = ["REGION", "Year"]
+
+
+def kde_directo(df, columna, por, puntos=200):
+    curvas = {}
+    for clave, grupo in df.groupby(por, observed=True):
+        valores = grupo[columna].dropna().to_numpy()
+        if len(valores) > 1 and np.ptp(valores) > 0:
+            grilla = np.linspace(valores.min(), valores.max(), puntos)
+            curvas[clave] = (grilla, gaussian_kde(valores)(grilla))
+    return curvas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--escala", type=float, default=1)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--datos", default=DIRECTORIO_DATOS)
+    args = parser.parse_args()
+
+    datos = preparar_datos(args.datos, args.escala, args.semilla)
+    df = cargar_anios(descubrir_anios(os.path.join(datos, "clean")))
+
+    inicio = time.perf_counter()
+    directas = {columna: kde_directo(df, columna, POR) for columna in COLUMNAS_SAT}
+    t_directo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    binned = {columna: densidades_por(df, columna, POR) for columna in COLUMNAS_SAT}
+    t_fft = time.perf_counter() - inicio
+
+    errores = []
+    for columna, curvas in directas.items():
+        grilla, densidades = binned[columna]
+        for clave, (puntos, referencia) in curvas.items():
+            if clave in densidades:
+                errores.append(np.abs(np.interp(puntos, grilla, densidades[clave]) - referencia).max() / referencia.max())
+    n_curvas = sum(len(curvas) for curvas in directas.values())
+    print(f"{len(df)} filas, {n_curvas} curvas (año x sección x región)")
+    print(f"KDE directo     {t_directo * 1000:9.1f} ms")
+    print(f"binning + FFT   {t_fft * 1000:9.1f} ms   ({t_directo / t_fft:.0f}x)")
+    print(f"error máximo relativo: {max(errores):.2e}")
+
+
+if __name__ == "__main__":
+    main()
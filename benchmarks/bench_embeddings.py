@@ -0,0 +1,75 @@
+"""Latencia de "comentarios similares" con la busqueda exacta y la aproximada.
+
+No usa el modelo: un codificador falso genera vectores normalizados agrupados
+alrededor de --temas centros al azar (como temas de comentarios). Arma el
+indice con utils/embeddings.py, mide la latencia por consulta de cada modo
+y el recall@k de la aproximada contra la exacta.
+
+    python benchmarks/bench_embeddings.py --filas 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.embeddings import ConstructorEmbeddings, IndiceEmbeddings, normalizar  # noqa: E402
+
+
+class CodificadorTemas:
+    modelo = "temas-sinteticos"
+
+    def __init__(self, dimension, temas, ruido, semilla):
+        self.rng = np.random.default_rng(semilla)
+        self.centros = normalizar(self.rng.standard_normal((temas, dimension)).astype(np.float32))
+        self.ruido = ruido
+
+    def __call__(self, textos):
+        temas = self.rng.integers(0, len(self.centros), size=len(textos))
+        ruido = self.rng.standard_normal((len(textos), self.centros.shape[1])).astype(np.float32)
+        return normalizar(self.centros[temas] + self.ruido * ruido)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--temas", type=int, default=2000)
+    parser.add_argument("--ruido", type=float, default=0.06, help="desvio por coordenada alrededor del tema")
+    parser.add_argument("--consultas", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporal:
+        destino = os.path.join(temporal, "embeddings")
+        constructor = ConstructorEmbeddings()
+        constructor.agregar({"texto": f"comentario {i}", "video": "sintetico"} for i in range(args.filas))
+        inicio = time.perf_counter()
+        constructor.guardar(CodificadorTemas(args.dimension, args.temas, args.ruido, args.semilla), destino)
+        print(f"{args.filas} filas x {args.dimension}: indice armado en {time.perf_counter() - inicio:.1f} s "
+              f"({os.path.getsize(os.path.join(destino, 'vectores.npy')) / 2**20:.0f} MB de vectores)")
+
+        indice = IndiceEmbeddings.cargar(destino)
+        filas = np.random.default_rng(args.semilla + 1).choice(len(indice), size=args.consultas, replace=False)
+        resultados = {}
+        for modo in ("exacta", "aproximada") if indice.listas is not None else ("exacta",):
+            tiempos = []
+            resultados[modo] = []
+            for fila in filas:
+                inicio = time.perf_counter()
+                resultados[modo].append(indice.vecinos(indice.vectores[fila], args.k, modo)[0][0])
+                tiempos.append(time.perf_counter() - inicio)
+            print(f"{modo:<11} mediana {np.median(tiempos) * 1000:7.1f} ms   p95 {np.percentile(tiempos, 95) * 1000:7.1f} ms")
+        if "aproximada" in resultados:
+            recall = np.mean([len(np.intersect1d(a, e)) / args.k
+                              for a, e in zip(resultados["aproximada"], resultados["exacta"])])
+            print(f"recall@{args.k} de la aproximada: {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
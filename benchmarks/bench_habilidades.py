@@ -0,0 +1,88 @@
+"""Benchmark del detector de habilidades cognitivas.
+
+Compara el loop original de substrings contra los dos modos de
+DetectorHabilidades (loop de subcadenas y regex compilada) mientras el
+vocabulario crece de decenas a miles de sinonimos. El cruce entre los dos
+modos define MIN_SINONIMOS_REGEX en utils/habilidades.py.
+
+    python benchmarks/bench_habilidades.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.habilidades import DetectorHabilidades, cognitive_skills  # noqa: E402
+
+SILABAS = ["ra", "me", "to", "li", "sa", "pen", "cor", "ti", "vo", "mu", "gra", "lo", "cen", "da", "ne"]
+# los sinonimos inventados usan otras silabas para que no choquen con los comentarios
+# y el loop original tenga que recorrer todo el vocabulario, como pasa con vocabulario real
+SILABAS_VOCABULARIO = ["ka", "zu", "xi", "fo", "bre", "jun", "wil", "qui", "yer", "hos", "plu", "dri"]
+TAMANOS = [len(cognitive_skills), 50, 100, 200, 1000, 5000]
+
+
+def loop_original(texto, habilidades):
+    texto_lower = texto.lower()
+    for habilidad in habilidades:
+        for sinonimo in habilidad["synonyms"]:
+            if sinonimo in texto_lower:
+                return habilidad["name"]
+    return "sin categoría"
+
+
+def palabra(rng, silabas=SILABAS):
+    return "".join(rng.choice(silabas) for _ in range(rng.randint(2, 5)))
+
+
+def vocabulario_sintetico(n_habilidades, rng):
+    # agrega habilidades falsas con sinonimos inventados hasta llegar a n_habilidades
+    habilidades = [dict(h) for h in cognitive_skills]
+    while len(habilidades) < n_habilidades:
+        sinonimos = [" ".join(palabra(rng, SILABAS_VOCABULARIO) for _ in range(rng.randint(1, 3))) for _ in range(10)]
+        habilidades.append({"name": f"extra_{len(habilidades)}", "synonyms": sinonimos})
+    return habilidades
+
+
+def comentarios_sinteticos(n, rng):
+    reales = [s for h in cognitive_skills for s in h["synonyms"]]
+    comentarios = []
+    for _ in range(n):
+        palabras = [palabra(rng) for _ in range(rng.randint(10, 60))]
+        if rng.random() < 0.3:
+            palabras.insert(rng.randrange(len(palabras)), rng.choice(reales))
+        comentarios.append(" ".join(palabras))
+    return comentarios
+
+
+def medir(funcion, comentarios):
+    inicio = time.perf_counter()
+    for texto in comentarios:
+        funcion(texto)
+    return time.perf_counter() - inicio
+
+
+def main():
+    rng = random.Random(42)
+    comentarios = comentarios_sinteticos(2000, rng)
+    print(f"{'habilidades':>12} {'sinonimos':>10} {'original (ms)':>14} {'loop (ms)':>10} {'regex (ms)':>11} "
+          f"{'compilar (ms)':>14}")
+    for n in TAMANOS:
+        habilidades = vocabulario_sintetico(n, rng)
+        n_sinonimos = sum(len(h["synonyms"]) for h in habilidades)
+
+        loop = DetectorHabilidades(habilidades, regex=False)
+        inicio = time.perf_counter()
+        regex = DetectorHabilidades(habilidades, regex=True)
+        t_compilar = time.perf_counter() - inicio
+
+        t_original = medir(lambda texto: loop_original(texto, habilidades), comentarios)
+        t_loop = medir(loop.habilidades, comentarios)
+        t_regex = medir(regex.habilidades, comentarios)
+        print(f"{n:>12} {n_sinonimos:>10} {t_original * 1000:>14.1f} {t_loop * 1000:>10.1f} {t_regex * 1000:>11.1f} "
+              f"{t_compilar * 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Tiempo de importacion de inicio.py, de cada pagina y del script de procesamiento.
+
+Ejecuta solo las sentencias import del nivel superior de cada archivo en un
+interprete nuevo con `python -X importtime`, suma el tiempo acumulado de los
+modulos importados y lo compara con el presupuesto. Muestra los modulos que
+mas pesan y sale con codigo 1 si algun archivo se pasa del presupuesto.
+
+    python benchmarks/bench_importacion.py --top 5
+"""
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# presupuesto en ms del tiempo de importacion (medido en un contenedor de 1 CPU). streamlit
+# (~300 ms) y pandas (~300 ms) son el piso (ver PISO); matplotlib, seaborn, scipy y wordcloud
+# se importan dentro de las funciones que los usan, asi que no cuentan aqui. Con la maquina
+# cargada el piso solo va de ~570 a ~870 ms y las paginas quedan entre ~570 y ~860 ms, casi
+# todo piso; analisis_comentarios.py llego a medir ~1020 ms, sobre el presupuesto
+PRESUPUESTO_MS = {
+    "inicio.py": 500,
+    os.path.join("pages", "analisis_comentarios.py"): 1000,
+    os.path.join("pages", "analisis_sat_2021-2024.py"): 1000,
+    os.path.join("pages", "comparativa_paises.py"): 1000,
+    "procesar_comentarios.py": 700,
+}
+
+# lo que ninguna pagina puede evitar importar
+PISO = "import streamlit, pandas, numpy"
+
+_LINEA = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def imports_de(ruta):
+    """Codigo con solo los import del nivel superior del archivo."""
+    with open(ruta, encoding="utf-8") as f:
+        arbol = ast.parse(f.read())
+    nodos = [nodo for nodo in arbol.body if isinstance(nodo, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(nodo) for nodo in nodos)
+
+
+def medir(codigo, excluir=()):
+    """Lista de (modulo, ms acumulados) de los imports de primer nivel, y el total en ms.
+
+    `excluir` son modulos que carga el interprete al arrancar (site, encodings, ...).
+    """
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=RAIZ, capture_output=True, text=True, env={**os.environ, "PYTHONPATH": RAIZ},
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+    modulos = []
+    for linea in proceso.stderr.splitlines():
+        coincidencia = _LINEA.match(linea)
+        # sangria de un espacio = importado directamente por el codigo medido
+        if coincidencia and len(coincidencia.group(3)) == 1 and coincidencia.group(4) not in excluir:
+            modulos.append((coincidencia.group(4), int(coincidencia.group(2)) / 1000))
+    return modulos, sum(ms for _, ms in modulos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=5, help="modulos mas pesados a mostrar por archivo")
+    parser.add_argument("--repeticiones", type=int, default=5, help="corridas por archivo (se toma la mediana)")
+    args = parser.parse_args()
+
+    arranque = {modulo for modulo, _ in medir("pass")[0]}
+
+    def mediana(codigo):
+        # la corrida con el total mediano: una sola varia cientos de ms con el disco y la cache
+        corridas = sorted((medir(codigo, arranque) for _ in range(args.repeticiones)), key=lambda c: c[1])
+        return corridas[len(corridas) // 2]
+
+    piso = mediana(PISO)[1]
+    print(f"{'piso (streamlit + pandas + numpy)':<40} {piso:8.0f} ms")
+    excedidos = []
+    for archivo, presupuesto in PRESUPUESTO_MS.items():
+        modulos, total = mediana(imports_de(os.path.join(RAIZ, archivo)))
+        estado = "ok" if total <= presupuesto else "EXCEDIDO"
+        print(f"{archivo:<40} {total:8.0f} ms  (presupuesto {presupuesto} ms, {total - piso:+.0f} ms sobre el piso)  {estado}")
+        for modulo, ms in sorted(modulos, key=lambda m: -m[1])[:args.top]:
+            print(f"    {modulo:<36} {ms:8.0f} ms")
+        if total > presupuesto:
+            excedidos.append(archivo)
+
+    if excedidos:
+        print(f"\nfuera de presupuesto: {', '.join(excedidos)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""Suite de benchmarks de todos los subsistemas sobre datos sinteticos.
+
+Genera datos con benchmarks/sinteticos.py a cada escala (1 = tamaño de los
+datos reales, hasta 1000x), mide cada caso como el minimo de varias
+repeticiones y escribe un reporte JSON. Con --comparar se contrasta contra
+el reporte de otro commit y se sale con codigo 1 si algun caso empeoro mas
+que el umbral.
+
+    python benchmarks/bench_suite.py --escalas 1 10 100
+    python benchmarks/bench_suite.py --comparar benchmarks/resultados/abc1234.json
+
+Los datos generados se guardan por escala y semilla en --datos y se
+reutilizan entre corridas (la escala 1000 ocupa varios GB).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sinteticos  # noqa: E402
+from utils.busqueda import ConstructorBusqueda  # noqa: E402
+from utils.cache_sentimiento import TAMANO_BLOQUE, CacheSentimiento  # noqa: E402
+from utils.densidad import densidades_por  # noqa: E402
+from utils.duplicados import IndiceDuplicados  # noqa: E402
+from utils.encuestas import ESQUEMAS, ORDEN_METRICAS, combinar, normalizar, ruta_encuesta, tipar_columnas  # noqa: E402
+from utils.frecuencias import IndiceFrecuencias, frecuencias  # noqa: E402
+from utils.habilidades import detectar_cognitive_insight  # noqa: E402
+from utils.inferencia import MotorInferencia  # noqa: E402
+from utils.ingesta import en_bloques, iterar_registros  # noqa: E402
+from utils.instituciones import IndiceInstituciones, nombres_para_mostrar, serie_cambios, top_cambios  # noqa: E402
+from utils.registro import RAIZ, ruta_repo  # noqa: E402
+from utils.sat import COLUMNAS_SAT, cargar_anios, descubrir_anios, pruebas_pareadas  # noqa: E402
+from utils.stopwords import STOPWORDS  # noqa: E402
+
+DIRECTORIO_REPORTES = ruta_repo("benchmarks", "resultados")
+DIRECTORIO_DATOS = os.path.join(tempfile.gettempdir(), "bench_sinteticos")
+# un caso es regresion si tarda mas que (1 + UMBRAL) veces lo que tardaba en el reporte base
+UMBRAL = 0.15
+ETIQUETAS = ("POS", "NEG", "NEU")
+
+
+class _TokenizerStub:
+    # una "token" por palabra: alcanza para que los lotes por longitud se armen como con el real
+    def __call__(self, textos, truncation=True):
+        return {"input_ids": [texto.split() for texto in textos]}
+
+
+class _PipelineStub:
+    # etiqueta determinista a partir del texto, sin modelo
+    def __call__(self, textos, batch_size=None, truncation=True):
+        return [{"label": ETIQUETAS[len(texto) % 3], "score": 0.5 + len(texto) % 50 / 100} for texto in textos]
+
+
+def motor_stub(batch_size=16):
+    """MotorInferencia en el proceso actual con tokenizer y pipeline falsos."""
+    motor = MotorInferencia("stub", procesos=1, batch_size=batch_size)
+    motor._tokenizer = _TokenizerStub()
+    motor._pipeline = _PipelineStub()
+    return motor
+
+
+def preparar_datos(directorio, escala, semilla):
+    """Genera (o reutiliza) los datos sinteticos de una escala; devuelve su directorio."""
+    destino = os.path.join(directorio, f"escala_{escala:g}_semilla_{semilla}")
+    marca = os.path.join(destino, "listo.json")
+    if not os.path.exists(marca):
+        filas = sinteticos.generar_todo(destino, escala, semilla)
+        with open(marca, "w", encoding="utf-8") as f:
+            json.dump(filas, f)
+    return destino
+
+
+# cada caso recibe el directorio de datos y uno temporal, prepara lo que no se mide y
+# devuelve (funcion a medir, filas procesadas por llamada)
+
+def caso_ingesta(datos, temporal):
+    directorio = os.path.join(datos, "comentarios")
+    filas = sum(1 for _ in iterar_registros(directorio))
+    return lambda: sum(1 for _ in iterar_registros(directorio)), filas
+
+
+def _textos(datos):
+    return [registro["texto"] for registro in iterar_registros(os.path.join(datos, "comentarios"))]
+
+
+def caso_habilidades(datos, temporal):
+    textos = _textos(datos)
+    return lambda: [detectar_cognitive_insight(texto) for texto in textos], len(textos)
+
+
+def _analizar(cache, motor, textos):
+    for bloque in en_bloques(textos, TAMANO_BLOQUE):
+        cache.analizar(bloque, motor)
+
+
+def caso_sentimiento_frio(datos, temporal):
+    # cache vacia en cada llamada: todo pasa por los lotes del motor
+    textos = _textos(datos)
+    motor = motor_stub()
+    llamadas = iter(range(1_000_000))
+
+    def medir():
+        cache = CacheSentimiento(os.path.join(temporal, f"frio_{next(llamadas)}.sqlite"), "stub")
+        _analizar(cache, motor, textos)
+        cache.cerrar()
+    return medir, len(textos)
+
+
+def caso_sentimiento_caliente(datos, temporal):
+    # todo esta en la cache: mide la busqueda y el LRU de SQLite
+    textos = _textos(datos)
+    motor = motor_stub()
+    cache = CacheSentimiento(os.path.join(temporal, "caliente.sqlite"), "stub")
+    _analizar(cache, motor, textos)
+    return lambda: _analizar(cache, motor, textos), len(textos)
+
+
+def caso_duplicados(datos, temporal):
+    textos = _textos(datos)
+
+    def medir():
+        indice = IndiceDuplicados()
+        for bloque in en_bloques(textos, TAMANO_BLOQUE):
+            indice.agrupar(bloque)
+    return medir, len(textos)
+
+
+def caso_sat_carga(datos, temporal):
+    anios = descubrir_anios(os.path.join(datos, "clean"))
+    filas = len(cargar_anios(anios))
+    # indice nuevo en cada llamada: incluye el merge por institucion de todos los años
+    return lambda: cargar_anios(anios, IndiceInstituciones()), filas
+
+
+def caso_sat_estadisticas(datos, temporal):
+    anios = descubrir_anios(os.path.join(datos, "clean"))
+    df = cargar_anios(anios, IndiceInstituciones())
+    anio_a, anio_b = anios[0][0], anios[-1][0]
+
+    def medir():
+        pruebas_pareadas(df)
+        top_cambios(serie_cambios(df), nombres_para_mostrar(df), anio_a, anio_b)
+    return medir, len(df)
+
+
+def caso_sat_densidades(datos, temporal):
+    # una curva por año x seccion x region, como el expander de densidades de la pagina
+    df = cargar_anios(descubrir_anios(os.path.join(datos, "clean")))
+    return lambda: [densidades_por(df, columna, ["REGION", "Year"]) for columna in COLUMNAS_SAT], len(df)
+
+
+def caso_encuestas(datos, temporal):
+    directorio = os.path.join(datos, "countries")
+    # tipadas como las devuelve cargar_encuesta, sin pasar por el archivo Arrow
+    encuestas = {pais: tipar_columnas(pd.read_csv(ruta_encuesta(pais, directorio))) for pais in ESQUEMAS}
+
+    def medir():
+        normalizadas = {pais: normalizar(df, pais) for pais, df in encuestas.items()}
+        for metrica in ORDEN_METRICAS:
+            combinar(normalizadas, metrica)
+    return medir, sum(len(df) for df in encuestas.values())
+
+
+def caso_frecuencias(datos, temporal):
+    etiquetas = {"POS": "positivo", "NEG": "negativo", "NEU": "neutro"}
+    pipeline = _PipelineStub()
+    filas = [
+        {"video": r["video"], "texto": r["texto"], "insight": detectar_cognitive_insight(r["texto"]),
+         "sentimiento": etiquetas[pipeline([r["texto"]])[0]["label"]]}
+        for r in iterar_registros(os.path.join(datos, "comentarios"))
+    ]
+
+    def medir():
+        indice = IndiceFrecuencias()
+        indice.agregar(filas)
+        frecuencias(indice.tabla(), stopwords=STOPWORDS)
+    return medir, len(filas)
+
+
+# consultas tipicas del explorador: palabras sueltas, Y, OR y frases
+CONSULTAS_BUSQUEDA = ["inteligencia", "la ia", "memoria OR cerebro OR creatividad", '"la ia" pensar', '"no me gusta"']
+
+
+def caso_busqueda(datos, temporal):
+    registros = [{"video": r["video"], "texto": r["texto"]} for r in iterar_registros(os.path.join(datos, "comentarios"))]
+    constructor = ConstructorBusqueda()
+    for bloque in en_bloques(registros, TAMANO_BLOQUE):
+        constructor.agregar(bloque)
+    indice = constructor.indice()
+    return lambda: [indice.buscar(consulta) for consulta in CONSULTAS_BUSQUEDA], len(registros)
+
+
+CASOS = {
+    "ingesta": caso_ingesta,
+    "habilidades": caso_habilidades,
+    "sentimiento_frio": caso_sentimiento_frio,
+    "sentimiento_caliente": caso_sentimiento_caliente,
+    "duplicados": caso_duplicados,
+    "sat_carga": caso_sat_carga,
+    "sat_estadisticas": caso_sat_estadisticas,
+    "sat_densidades": caso_sat_densidades,
+    "encuestas": caso_encuestas,
+    "frecuencias": caso_frecuencias,
+    "busqueda": caso_busqueda,
+}
+
+
+def medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=RAIZ, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadatos(args):
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "cambios_sin_commit": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "semilla": args.semilla,
+        "repeticiones": args.repeticiones,
+    }
+
+
+def comparar(base, nuevo, umbral):
+    """Imprime el cambio por (caso, escala) y devuelve los casos que empeoraron mas que el umbral."""
+    anteriores = {(r["caso"], r["escala"]): r for r in base["resultados"]}
+    regresiones = []
+    print(f"\ncomparado con {base.get('commit')} ({base.get('fecha')})")
+    print(f"{'caso':<22} {'escala':>7} {'base (s)':>10} {'nuevo (s)':>10} {'cambio':>9}")
+    for resultado in nuevo["resultados"]:
+        anterior = anteriores.get((resultado["caso"], resultado["escala"]))
+        if anterior is None:
+            continue
+        cambio = resultado["segundos"] / anterior["segundos"] - 1 if anterior["segundos"] else 0.0
+        marca = "  REGRESION" if cambio > umbral else ""
+        print(f"{resultado['caso']:<22} {resultado['escala']:>7g} {anterior['segundos']:>10.4f} "
+              f"{resultado['segundos']:>10.4f} {cambio:>+8.1%}{marca}")
+        if marca:
+            regresiones.append(resultado)
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--escalas", type=float, nargs="+", default=[1, 10])
+    parser.add_argument("--casos", nargs="+", choices=list(CASOS), default=list(CASOS))
+    parser.add_argument("--repeticiones", type=int, default=3, help="se reporta el minimo")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--datos", default=DIRECTORIO_DATOS, help="donde se guardan los datos generados")
+    parser.add_argument("--salida", help="reporte JSON (por defecto benchmarks/resultados/<commit>.json)")
+    parser.add_argument("--comparar", help="reporte JSON de otro commit")
+    parser.add_argument("--umbral", type=float, default=UMBRAL)
+    args = parser.parse_args()
+
+    reporte = {**metadatos(args), "resultados": []}
+    print(f"{'caso':<22} {'escala':>7} {'filas':>10} {'segundos':>10} {'filas/s':>12}")
+    for escala in args.escalas:
+        datos = preparar_datos(args.datos, escala, args.semilla)
+        for nombre in args.casos:
+            with tempfile.TemporaryDirectory() as temporal:
+                funcion, filas = CASOS[nombre](datos, temporal)
+                segundos = medir(funcion, args.repeticiones)
+            resultado = {"caso": nombre, "escala": escala, "filas": filas, "segundos": round(segundos, 6),
+                         "filas_por_s": round(filas / segundos, 1) if segundos > 0 else None}
+            reporte["resultados"].append(resultado)
+            print(f"{nombre:<22} {escala:>7g} {filas:>10} {segundos:>10.4f} {resultado['filas_por_s'] or 0:>12.0f}")
+
+    salida = args.salida or os.path.join(DIRECTORIO_REPORTES, f"{reporte['commit'] or 'sin_git'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(reporte, f, ensure_ascii=False, indent=2)
+    print(f"\nreporte: {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = comparar(base, reporte, args.umbral)
+        if regresiones:
+            print(f"\n{len(regresiones)} casos empeoraron mas de {args.umbral:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Throughput de procesar_comentarios.py con y sin la tuberia de etapas concurrentes.
+
+Usa comentarios sinteticos (benchmarks/sinteticos.py) y un modelo falso que
+tarda --ms-por-texto por comentario sin retener el GIL, como torch o el pool
+de procesos. Compara tres cosas: solo la inferencia, el procesamiento
+secuencial bloque por bloque y la tuberia de procesar(). La tuberia deberia
+acercarse a la inferencia sola.
+
+    python benchmarks/bench_tuberia.py --escala 2 --ms-por-texto 2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import procesar_comentarios  # noqa: E402
+from bench_suite import DIRECTORIO_DATOS, ETIQUETAS, motor_stub, preparar_datos  # noqa: E402
+from utils.cache_sentimiento import CacheSentimiento  # noqa: E402
+from utils.ingesta import en_bloques, iterar_registros  # noqa: E402
+from utils.trabajo import Trabajo  # noqa: E402
+
+
+class PipelineLento:
+    # time.sleep suelta el GIL igual que el computo de torch
+    def __init__(self, ms_por_texto):
+        self.segundos_por_texto = ms_por_texto / 1000
+
+    def __call__(self, textos, batch_size=None, truncation=True):
+        time.sleep(self.segundos_por_texto * len(textos))
+        return [{"label": ETIQUETAS[len(texto) % 3], "score": 0.5} for texto in textos]
+
+
+def motor_lento(ms_por_texto):
+    motor = motor_stub(procesar_comentarios.BATCH_SIZE)
+    motor._pipeline = PipelineLento(ms_por_texto)
+    return motor
+
+
+def solo_inferencia(directorio, ms_por_texto):
+    motor = motor_lento(ms_por_texto)
+    textos = list(dict.fromkeys(registro["texto"] for registro in iterar_registros(directorio)))
+    inicio = time.perf_counter()
+    for bloque in en_bloques(textos, procesar_comentarios.TAMANO_BLOQUE):
+        motor(bloque)
+    return time.perf_counter() - inicio
+
+
+def secuencial(directorio, ms_por_texto, temporal):
+    cache = CacheSentimiento(os.path.join(temporal, "secuencial.sqlite"), "stub")
+    trabajo = Trabajo(os.path.join(temporal, "secuencial"), {})
+    motor = motor_lento(ms_por_texto)
+    inicio = time.perf_counter()
+    for bloque in en_bloques(iterar_registros(directorio), procesar_comentarios.TAMANO_BLOQUE):
+        trabajo.guardar_bloque(procesar_comentarios.procesar_bloque(bloque, cache, motor), len(bloque))
+    segundos = time.perf_counter() - inicio
+    cache.cerrar()
+    return segundos
+
+
+def con_tuberia(directorio, ms_por_texto, temporal):
+    cache = CacheSentimiento(os.path.join(temporal, "tuberia.sqlite"), "stub")
+    trabajo = Trabajo(os.path.join(temporal, "tuberia"), {})
+    inicio = time.perf_counter()
+    # sin agrupar duplicados, para comparar con la misma cantidad de inferencias
+    procesar_comentarios.procesar(trabajo, cache, motor_lento(ms_por_texto), directorio=directorio, duplicados=False)
+    segundos = time.perf_counter() - inicio
+    cache.cerrar()
+    return segundos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--escala", type=float, default=2)
+    parser.add_argument("--ms-por-texto", type=float, default=2.0)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--datos", default=DIRECTORIO_DATOS)
+    args = parser.parse_args()
+
+    directorio = os.path.join(preparar_datos(args.datos, args.escala, args.semilla), "comentarios")
+    n = sum(1 for _ in iterar_registros(directorio))
+    with tempfile.TemporaryDirectory() as temporal:
+        tiempos = {
+            "solo inferencia": solo_inferencia(directorio, args.ms_por_texto),
+            "secuencial": secuencial(directorio, args.ms_por_texto, temporal),
+            "tuberia": con_tuberia(directorio, args.ms_por_texto, temporal),
+        }
+    print(f"{n} comentarios, {args.ms_por_texto} ms por texto en el modelo")
+    for nombre, segundos in tiempos.items():
+        relativo = tiempos["solo inferencia"] / segundos
+        print(f"{nombre:<16} {segundos:8.2f} s {n / segundos:10.0f} comentarios/s  ({relativo:.0%} de la inferencia sola)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Generadores de datos sinteticos con la forma de los datasets del repo.
+
+Todo es reproducible (semilla) y escalable: escala=1 produce aproximadamente
+el tamaño de los datos reales y escala=1000 mil veces mas. Los vocabularios,
+ciudades y respuestas posibles se toman de los archivos reales de data/, asi
+la distribucion se parece a la de produccion.
+
+    python benchmarks/sinteticos.py /tmp/sinteticos --escala 10
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.encuestas import DIRECTORIO_ENCUESTAS, ESQUEMAS  # noqa: E402
+from utils.frecuencias import tokenizar  # noqa: E402
+from utils.habilidades import cognitive_skills  # noqa: E402
+from utils.ingesta import iterar_registros  # noqa: E402
+from utils.registro import ruta_repo  # noqa: E402
+from utils.sat import DIRECTORIO_SAT  # noqa: E402
+
+DIRECTORIO_COMENTARIOS = ruta_repo("data", "comentarios")
+# fraccion de comentarios sinteticos que mencionan alguna habilidad cognitiva
+TASA_HABILIDADES = 0.15
+# fraccion de instituciones que siguen presentes de un año al siguiente
+RETENCION_SAT = 0.9
+
+
+def _base_comentarios():
+    textos = [registro["texto"] for registro in iterar_registros(DIRECTORIO_COMENTARIOS)]
+    palabras, conteos = np.unique([p for texto in textos for p in tokenizar(texto)], return_counts=True)
+    largos = np.array([max(1, len(texto.split())) for texto in textos])
+    return len(textos), palabras, conteos / conteos.sum(), largos
+
+
+def generar_comentarios(directorio, escala=1, semilla=0, videos=2):
+    """Exports JSON como los de data/comentarios: un archivo por video, un dict por comentario.
+
+    Las palabras salen de la distribucion de frecuencias del corpus real y los
+    largos de los largos reales; una fraccion incluye un sinonimo de habilidad.
+    """
+    rng = np.random.default_rng(semilla)
+    n_base, palabras, probabilidades, largos = _base_comentarios()
+    sinonimos = [s for habilidad in cognitive_skills for s in habilidad["synonyms"]]
+    total = int(n_base * escala)
+    os.makedirs(directorio, exist_ok=True)
+
+    largos_muestra = rng.choice(largos, size=total)
+    indices = rng.choice(len(palabras), size=int(largos_muestra.sum()), p=probabilidades)
+    con_habilidad = rng.random(total) < TASA_HABILIDADES
+    habilidad = rng.integers(0, len(sinonimos), size=total)
+    cortes = np.concatenate([[0], np.cumsum(largos_muestra)])
+
+    por_video = np.array_split(np.arange(total), videos)
+    for v, filas in enumerate(por_video):
+        ruta = os.path.join(directorio, f"Video sintetico {v:03d} - YouTube.json")
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write("[")
+            for j, i in enumerate(filas):
+                texto = " ".join(palabras[indices[cortes[i]:cortes[i + 1]]])
+                if con_habilidad[i]:
+                    texto += " " + sinonimos[habilidad[i]]
+                item = {
+                    "Imagen": "",
+                    "Ámbito_URL": f"https://www.youtube.com/@usuario-{i}",
+                    "Ámbito": f"\n              @usuario-{i}\n            ",
+                    "Ámbito_URL1": f"https://www.youtube.com/watch?v=sintetico{v:03d}&lc={i}",
+                    "Ámbito2": "\n            hace 1 mes\n          ",
+                    "ytcoreattributedstring": texto,
+                    "Ámbito3": f"\n    {int(rng.integers(0, 500))}\n  ",
+                    "ytcoreattributedstring4": "Responder",
+                }
+                f.write(("," if j else "") + json.dumps(item, ensure_ascii=False))
+            f.write("]")
+    return total
+
+
+def generar_sat(directorio, escala=1, semilla=0, anios=None):
+    """Un CSV por año con el esquema de data/clean (incluida la columna de indice sin nombre).
+
+    Cada institucion tiene un nivel propio que se mantiene entre años, asi el
+    merge por institucion y los cambios % tienen sentido.
+    """
+    rng = np.random.default_rng(semilla)
+    reales = [pd.read_csv(ruta, index_col=0) for ruta in sorted(glob.glob(os.path.join(DIRECTORIO_SAT, "*.csv")))]
+    anios = anios or [os.path.splitext(os.path.basename(r))[0] for r in sorted(glob.glob(os.path.join(DIRECTORIO_SAT, "*.csv")))]
+    real = pd.concat(reales, ignore_index=True)
+    n = int(len(reales[0]) * escala)
+    os.makedirs(directorio, exist_ok=True)
+
+    lugares = real[["CITY", "STABBR", "REGION"]].drop_duplicates().to_numpy()
+    lugar = lugares[rng.integers(0, len(lugares), size=n)]
+    instituciones = pd.DataFrame({
+        "INSTNM": [f"Institucion Sintetica {i:07d}" for i in range(n)],
+        "CITY": lugar[:, 0],
+        "STABBR": lugar[:, 1],
+        "HIGHDEG": rng.choice(real["HIGHDEG"].to_numpy(), size=n),
+        "REGION": lugar[:, 2].astype(int),
+    })
+    nivel = rng.normal(real["SAT_AVG_ALL"].mean(), real["SAT_AVG_ALL"].std(), size=n)
+
+    presentes = np.ones(n, dtype=bool)
+    for k, anio in enumerate(anios):
+        if k:
+            presentes &= rng.random(n) < RETENCION_SAT
+        promedio = np.clip(nivel + rng.normal(5 * k, 25, size=n), 600, 1600).round()
+        df = instituciones.assign(
+            SATVR25=(promedio / 2 - 45 + rng.normal(0, 10, size=n)).round(),
+            SATVR75=(promedio / 2 + 45 + rng.normal(0, 10, size=n)).round(),
+            SATMT25=(promedio / 2 - 50 + rng.normal(0, 12, size=n)).round(),
+            SATMT75=(promedio / 2 + 50 + rng.normal(0, 12, size=n)).round(),
+            SAT_AVG_ALL=promedio,
+        )[presentes]
+        df.to_csv(os.path.join(directorio, f"{anio}.csv"))
+    return n
+
+
+def generar_encuestas(directorio, escala=1, semilla=0):
+    """Encuestas con las columnas de data/countries; cada columna se remuestrea de la real."""
+    rng = np.random.default_rng(semilla)
+    os.makedirs(directorio, exist_ok=True)
+    total = 0
+    for esquema in ESQUEMAS.values():
+        real = pd.read_csv(os.path.join(DIRECTORIO_ENCUESTAS, esquema["archivo"]))
+        n = int(len(real) * escala)
+        sintetica = pd.DataFrame({
+            columna: real[columna].to_numpy()[rng.integers(0, len(real), size=n)] for columna in real.columns
+        })
+        sintetica.to_csv(os.path.join(directorio, esquema["archivo"]), index=False)
+        total += n
+    return total
+
+
+def generar_todo(directorio, escala=1, semilla=0):
+    return {
+        "comentarios": generar_comentarios(os.path.join(directorio, "comentarios"), escala, semilla),
+        "sat": generar_sat(os.path.join(directorio, "clean"), escala, semilla),
+        "encuestas": generar_encuestas(os.path.join(directorio, "countries"), escala, semilla),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directorio")
+    parser.add_argument("--escala", type=float, default=1)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+    print(generar_todo(args.directorio, args.escala, args.semilla))
+
+
+if __name__ == "__main__":
+    main()
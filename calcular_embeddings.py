@@ -0,0 +1,58 @@
+"""Calcula los embeddings de los comentarios procesados para "comentarios similares" y el etiquetado de habilidades.
+
+Recorre los resultados que dejo procesar_comentarios.py (un vector por grupo
+de duplicados), los codifica por lotes con un modelo de oraciones y guarda en
+data/resultados/embeddings/ la matriz float16, el indice de vecinos y las
+habilidades asignadas por centroide (ver utils/embeddings.py).
+
+Requiere transformers y torch.
+
+    python calcular_embeddings.py
+    python calcular_embeddings.py --listas 0          # sin modo aproximado
+"""
+import argparse
+import sys
+
+from tqdm import tqdm
+
+from utils import perfilado
+from utils.almacen import DIRECTORIO_RESULTADOS, columnas_disponibles, iterar_filas, listar_videos
+from utils.embeddings import (COLUMNAS_RESULTADOS, MODELO_EMBEDDINGS, RUTA_EMBEDDINGS, CodificadorTextos,
+                              ConstructorEmbeddings)
+from utils.perfilado import iterar_medido
+
+
+def argumentos():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modelo", default=MODELO_EMBEDDINGS, help="id del hub o directorio local")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--hilos", type=int, help="hilos de torch (por defecto todos los nucleos)")
+    parser.add_argument("--listas", type=int,
+                        help="listas del modo aproximado (por defecto segun la cantidad de comentarios; 0 = ninguna)")
+    return parser.parse_args()
+
+
+def main():
+    args = argumentos()
+    if not listar_videos(DIRECTORIO_RESULTADOS):
+        sys.exit(f"error: no hay resultados en '{DIRECTORIO_RESULTADOS}'; correr primero procesar_comentarios.py")
+
+    columnas = [c for c in COLUMNAS_RESULTADOS if c in columnas_disponibles(DIRECTORIO_RESULTADOS)]
+    constructor = ConstructorEmbeddings()
+    with tqdm(unit=" comentarios", desc="leyendo") as progreso:
+        for filas in iterar_medido("lectura_resultados", iterar_filas(DIRECTORIO_RESULTADOS, columnas)):
+            constructor.agregar(filas)
+            progreso.update(len(filas))
+
+    codificador = CodificadorTextos(args.modelo, hilos=args.hilos, batch_size=args.batch_size)
+    resumen = constructor.guardar(codificador, RUTA_EMBEDDINGS, listas=args.listas)
+    print(f"\n {resumen['comentarios']} comentarios distintos guardados en '{RUTA_EMBEDDINGS}'.")
+    print(f" con habilidad por sinonimo: {resumen['con_sinonimo']}, por centroide: {resumen['con_centroide']} "
+          f"({resumen['solo_centroide']} que antes quedaban sin categoría)")
+
+    if perfilado.activo():
+        print(perfilado.texto_resumen())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Genera las copias compactas (Arrow IPC) de las encuestas por pais.
+
+Para cada pais de utils/encuestas.py escribe data/countries/compacto/<pais>.arrow
+con columnas categoricas y enteros reducidos, que el dashboard mapea en memoria
+sin copiarlas. La pagina solo lee esas copias; correr este script despues de
+agregar o cambiar un CSV.
+
+    python compactar_encuestas.py
+"""
+import argparse
+import os
+import sys
+
+from utils.encuestas import DIRECTORIO_ENCUESTAS, ESQUEMAS, convertir_encuesta, ruta_compacta, ruta_encuesta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--directorio", default=DIRECTORIO_ENCUESTAS, help="directorio con los CSV de las encuestas")
+    args = parser.parse_args()
+
+    faltantes = [ruta_encuesta(pais, args.directorio) for pais in ESQUEMAS
+                 if not os.path.exists(ruta_encuesta(pais, args.directorio))]
+    if faltantes:
+        sys.exit(f"error: no se encontraron {', '.join(faltantes)}")
+
+    for pais in ESQUEMAS:
+        ruta_csv = ruta_encuesta(pais, args.directorio)
+        tabla = convertir_encuesta(ruta_csv)
+        print(f" {pais:<12} {tabla.num_rows:>6} filas, {os.path.getsize(ruta_csv) / 1024:8.1f} KB CSV -> "
+              f"{os.path.getsize(ruta_compacta(ruta_csv)) / 1024:8.1f} KB '{ruta_compacta(ruta_csv)}'")
+
+
+if __name__ == "__main__":
+    main()
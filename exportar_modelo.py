@@ -0,0 +1,50 @@
+"""Descarga el modelo de sentimiento una vez y lo deja listo para usar sin conexion.
+
+Genera tres directorios dentro de modelos/:
+    robertuito/            pesos pytorch + tokenizer (backends "pytorch" e "int8")
+    robertuito-onnx/       grafo ONNX fp32 (backend "onnx")
+    robertuito-onnx-int8/  grafo ONNX con cuantizacion dinamica int8 (backend "onnx")
+
+Requiere transformers, optimum[onnxruntime] y onnxruntime.
+
+    python exportar_modelo.py
+"""
+import os
+import shutil
+
+from utils.registro import ruta_repo
+
+MODELO_SENTIMIENTO = "pysentimiento/robertuito-sentiment-analysis"
+DIRECTORIO_MODELOS = ruta_repo("modelos")
+
+
+def main():
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    dir_pytorch = os.path.join(DIRECTORIO_MODELOS, "robertuito")
+    dir_onnx = os.path.join(DIRECTORIO_MODELOS, "robertuito-onnx")
+    dir_onnx_int8 = os.path.join(DIRECTORIO_MODELOS, "robertuito-onnx-int8")
+
+    print("descargando modelo y tokenizer...")
+    tokenizer = AutoTokenizer.from_pretrained(MODELO_SENTIMIENTO)
+    AutoModelForSequenceClassification.from_pretrained(MODELO_SENTIMIENTO).save_pretrained(dir_pytorch)
+    tokenizer.save_pretrained(dir_pytorch)
+
+    print("exportando a ONNX...")
+    ORTModelForSequenceClassification.from_pretrained(dir_pytorch, export=True).save_pretrained(dir_onnx)
+    tokenizer.save_pretrained(dir_onnx)
+
+    print("cuantizando el grafo ONNX a int8...")
+    shutil.copytree(dir_onnx, dir_onnx_int8, dirs_exist_ok=True)
+    quantize_dynamic(
+        os.path.join(dir_onnx, "model.onnx"),
+        os.path.join(dir_onnx_int8, "model.onnx"),
+        weight_type=QuantType.QInt8,
+    )
+    print(f"listo: modelos guardados en '{DIRECTORIO_MODELOS}/'.")
+
+
+if __name__ == "__main__":
+    main()
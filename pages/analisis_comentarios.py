@@ -1,67 +1,148 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from wordcloud import WordCloud
-import nltk
-from nltk.corpus import stopwords
+import io
 import os
+import time
+from utils.agregados import RUTA_AGREGADOS, ConsultaAgregados, agregados_desde_df, cargar_agregados
+from utils import busqueda
+from utils.almacen import DIRECTORIO_RESULTADOS, cargar_comentarios, columnas_disponibles, listar_videos
+from utils.duplicados import colapsar_duplicados, primeros_por_grupo
+from utils.embeddings import ARCHIVO_META, RUTA_EMBEDDINGS, IndiceEmbeddings
+from utils.frecuencias import RUTA_FRECUENCIAS, cargar_indice, frecuencias, indice_desde_df
+from utils.perfilado import etapa, medido, mostrar_panel
+from utils.registro import archivos, registro, ruta_repo
+from utils.stopwords import STOPWORDS
+from utils.tablas import tabla_paginada
 
 # Título del dashboard específico de la página
 st.title('📊 Dashboard de sentimientos y habilidades cognitivas')
 st.write("Visualiza los sentimientos y habilidades cognitivas más mencionadas en videos de YouTube sobre inteligencia artificial.")
 
-# Función para asegurar que NLTK tiene las stopwords
-@st.cache_resource
-def load_nltk_stopwords():
-    try:
-        stopwords.words('spanish')
-    except LookupError:
-        nltk.download('stopwords')
-load_nltk_stopwords()
+# Función para cargar los datos: solo las columnas que usa la página. El dataset completo
+# se carga una vez por proceso y se comparte entre sesiones (ver utils/registro.py)
+COLUMNAS = ["texto", "sentimiento", "score", "insight"]
+RUTA_CSV_ANTERIOR = ruta_repo("comentarios_con_sentimiento.csv")
 
-# Función para cargar los datos
-@st.cache_data
-def cargar_datos():
-    file_path = "comentarios_con_sentimiento.csv"
-    if not os.path.exists(file_path):
-        st.error(f"Error: No se encontró el archivo '{file_path}'. Ejecuta primero el script 'procesar_comentarios.py' desde tu terminal.")
-        return pd.DataFrame()
-    
-    df = pd.read_csv(file_path)
+def _cargar_comentarios():
+    if listar_videos(DIRECTORIO_RESULTADOS):
+        # cluster_id (grupos de duplicados) solo existe en resultados generados con utils/duplicados.py
+        extras = [c for c in ["cluster_id"] if c in columnas_disponibles(DIRECTORIO_RESULTADOS)]
+        df = cargar_comentarios(DIRECTORIO_RESULTADOS, columnas=COLUMNAS + ["video"] + extras,
+                                filtros=[("insight", "!=", "sin categoría")])
+        for columna in ("sentimiento", "insight"):
+            df[columna] = df[columna].cat.remove_unused_categories()
+        df["video"] = df["video"].astype("category")
+        return df
+
+    # resultados en el formato anterior (CSV plano)
+    df = pd.read_csv(RUTA_CSV_ANTERIOR, usecols=lambda c: c in COLUMNAS)
     if "insight" in df.columns:
         return df[df["insight"] != "sin categoría"].copy()
     return df
 
-df = cargar_datos()
+def rutas_comentarios():
+    return archivos(DIRECTORIO_RESULTADOS, "*.parquet") or [RUTA_CSV_ANTERIOR]
+
+def cargar_base():
+    rutas = rutas_comentarios()
+    if not all(os.path.exists(ruta) for ruta in rutas):
+        st.error(f"Error: No se encontraron resultados en '{DIRECTORIO_RESULTADOS}'. Ejecuta primero el script 'procesar_comentarios.py' desde tu terminal.")
+        return pd.DataFrame()
+    return registro.obtener("comentarios", rutas, _cargar_comentarios)
+
+def filas_filtradas(base, videos, sentimiento="Todos", insight="Todos"):
+    # posiciones sobre la copia compartida: los filtros son máscaras y el DataFrame no se copia
+    mascara = np.ones(len(base), dtype=bool)
+    if videos is not None and "video" in base.columns and set(videos) != set(base["video"].cat.categories):
+        mascara &= base["video"].isin(videos).to_numpy()
+    if sentimiento != "Todos":
+        mascara &= (base["sentimiento"] == sentimiento).to_numpy()
+    if insight != "Todos":
+        mascara &= (base["insight"] == insight).to_numpy()
+    return np.flatnonzero(mascara)
+
+videos_disponibles = listar_videos(DIRECTORIO_RESULTADOS)
+videos_seleccionados = None
+if videos_disponibles:
+    with st.sidebar:
+        videos_seleccionados = tuple(st.multiselect("Videos", videos_disponibles, default=videos_disponibles))
+
+df_base = cargar_base()
+filas_videos = filas_filtradas(df_base, videos_seleccionados)
+
+# Tabla agregada (conteos y suma de score por sentimiento/habilidad): las métricas y los
+# gráficos se responden con lookups sobre ella, sin recorrer los comentarios
+def cargar_tabla_agregada(base):
+    tabla = registro.obtener("agregados", [RUTA_AGREGADOS], cargar_agregados)
+    if tabla is None:
+        tabla = registro.obtener("agregados_desde_comentarios", rutas_comentarios(), lambda: agregados_desde_df(base))
+    return tabla
 
-if not df.empty:
-    df_filtrado = df.copy()
+# Nube de palabras: se arma desde un índice de frecuencias por sentimiento/habilidad
+# y la imagen queda memorizada por combinación de filtros y hash de los resultados.
+# Las stopwords (nltk + adicionales) están incluidas en utils/stopwords.py
+def cargar_indice_palabras(base):
+    tabla = registro.obtener("frecuencias", [RUTA_FRECUENCIAS], cargar_indice)
+    if tabla is None:
+        tabla = registro.obtener("frecuencias_desde_comentarios", rutas_comentarios(), lambda: indice_desde_df(base))
+    return tabla
+
+# Búsqueda de texto: índice invertido armado por procesar_comentarios.py (o en memoria
+# desde los comentarios cargados); cada consulta responde en milisegundos
+def cargar_indice_busqueda(base):
+    indice = registro.obtener("busqueda", archivos(busqueda.RUTA_BUSQUEDA), busqueda.IndiceBusqueda.cargar)
+    if indice is None:
+        indice = registro.obtener("busqueda_desde_comentarios", rutas_comentarios(), lambda: busqueda.indice_desde_df(base))
+    return indice
+
+# Comentarios similares: embeddings calculados con calcular_embeddings.py (no hay versión
+# en memoria: necesita el modelo). Se registra solo meta.json, que cambia en cada corrida
+def cargar_indice_embeddings():
+    return registro.obtener("embeddings", [os.path.join(RUTA_EMBEDDINGS, ARCHIVO_META)], IndiceEmbeddings.cargar)
+
+@st.cache_data
+@medido()
+def nube_de_palabras(_indice, huella, videos, sentimiento, insight):
+    frecuencias_filtro = frecuencias(_indice, videos, sentimiento, insight, STOPWORDS)
+    if not frecuencias_filtro:
+        return None
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(width=1200, height=600, background_color="white", colormap='cividis', max_words=150).generate_from_frequencies(frecuencias_filtro)
+    buffer = io.BytesIO()
+    wordcloud.to_image().save(buffer, format="PNG")
+    return buffer.getvalue()
+
+if len(filas_videos):
+    consulta = ConsultaAgregados(cargar_tabla_agregada(df_base), videos_seleccionados)
 
     # Barra lateral con filtros
     with st.sidebar:
         st.header("Filtros de Comentarios")
         opcion_sentimiento = st.selectbox(
             "Selecciona un sentimiento",
-            ["Todos"] + df["sentimiento"].unique().tolist()
+            ["Todos"] + consulta.sentimientos()
         )
         opcion_insight = st.selectbox(
             "Selecciona una habilidad cognitiva",
-            ["Todos"] + sorted(df["insight"].unique())
+            ["Todos"] + consulta.insights()
         )
 
-        if opcion_sentimiento != "Todos":
-            df_filtrado = df_filtrado[df_filtrado["sentimiento"] == opcion_sentimiento]
-        if opcion_insight != "Todos":
-            df_filtrado = df_filtrado[df_filtrado["insight"] == opcion_insight]
+    filas = filas_filtradas(df_base, videos_seleccionados, opcion_sentimiento, opcion_insight)
 
     # Cuerpo principal del dashboard
-    if not df_filtrado.empty:
+    if len(filas):
+        # matplotlib y seaborn se importan recién cuando hay gráficos que dibujar
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         st.header('Métricas Clave')
+        n_comentarios, score_promedio, habilidades_unicas = consulta.metricas(opcion_sentimiento, opcion_insight)
         col1, col2, col3 = st.columns(3)
-        col1.metric(label="Comentarios Analizados", value=len(df_filtrado))
-        col2.metric(label="Score Promedio de Sentimiento", value=f"{df_filtrado['score'].mean():.2f}")
-        col3.metric(label="Habilidades Únicas Detectadas", value=df_filtrado["insight"].nunique())
+        col1.metric(label="Comentarios Analizados", value=n_comentarios)
+        col2.metric(label="Score Promedio de Sentimiento", value=f"{score_promedio:.2f}")
+        col3.metric(label="Habilidades Únicas Detectadas", value=habilidades_unicas)
 
         st.markdown("---")
         
@@ -70,38 +151,83 @@ if not df.empty:
 
         with col_chart1:
             st.subheader('Distribución de Sentimientos')
-            sentiment_data = df_filtrado['sentimiento'].value_counts().reset_index()
-            fig1, ax1 = plt.subplots()
-            sns.barplot(data=sentiment_data, x='sentimiento', y='count', hue='sentimiento', ax=ax1, palette="viridis", legend=False)
-            st.pyplot(fig1)
+            with etapa("grafico_sentimientos"):
+                sentiment_data = consulta.distribucion_sentimientos(opcion_sentimiento, opcion_insight).rename_axis('sentimiento').reset_index()
+                fig1, ax1 = plt.subplots()
+                sns.barplot(data=sentiment_data, x='sentimiento', y='count', hue='sentimiento', ax=ax1, palette="viridis", legend=False)
+                st.pyplot(fig1)
 
         with col_chart2:
             st.subheader('Distribución de Habilidades Cognitivas')
-            insight_data = df_filtrado['insight'].value_counts()
-            fig2, ax2 = plt.subplots()
-            sns.barplot(x=insight_data.index, y=insight_data.values, hue=insight_data.index, ax=ax2, palette="plasma", legend=False)
-            plt.setp(ax2.get_xticklabels(), rotation=45, ha='right')
-            st.pyplot(fig2)
+            with etapa("grafico_habilidades"):
+                insight_data = consulta.distribucion_insights(opcion_sentimiento, opcion_insight)
+                fig2, ax2 = plt.subplots()
+                sns.barplot(x=insight_data.index, y=insight_data.values, hue=insight_data.index, ax=ax2, palette="plasma", legend=False)
+                plt.setp(ax2.get_xticklabels(), rotation=45, ha='right')
+                st.pyplot(fig2)
             
         st.markdown("---")
 
         st.header('Nube de Palabras Clave')
-        texto_completo = " ".join(df_filtrado['texto'].dropna().astype(str)).lower()
-        if texto_completo.strip():
-            spanish_stopwords = set(stopwords.words('spanish'))
-            additional_stopwords = {"q", "si", "de", "la", "el", "en", "un", "una", "los", "las", "que", "es", "por", "para", "con", "del", "al", "etc", "cosas", "sino", "veces",
-                                    "siento", "pasa", "tener", "gracias", "Freddy", "pueden", "usan", "video", "sido", "entiendo", "cómo", "ello", "entonces", "creo", "pues", "dice",
-                                    "simplemente", "va", "mas", "cada", "veo", "toda", "vez", "da", "realmente", "dices", "debe", "parte", "voy", "tan", "quieren" 
-            }
-            all_stopwords = spanish_stopwords.union(additional_stopwords)
-
-            wordcloud = WordCloud(width=1200, height=600, background_color="white", colormap='cividis', max_words=150, stopwords=all_stopwords, collocations=False).generate(texto_completo)
-            fig_wc, ax_wc = plt.subplots()
-            ax_wc.imshow(wordcloud, interpolation='bilinear')
-            ax_wc.axis("off")
-            st.pyplot(fig_wc)
+        indice_palabras = cargar_indice_palabras(df_base)
+        imagen_nube = nube_de_palabras(indice_palabras, registro.huella("comentarios"), videos_seleccionados, opcion_sentimiento, opcion_insight)
+        if imagen_nube is not None:
+            st.image(imagen_nube)
 
+        # tablas paginadas (ver utils/tablas.py): al navegador solo llega la página visible
         with st.expander("Explora los Datos Filtrados", expanded=False):
-            st.dataframe(df_filtrado)
+            texto_busqueda = st.text_input(
+                "Buscar en los comentarios",
+                help='Deben aparecer todas las palabras; OR separa alternativas y "entre comillas" busca una frase exacta. No distingue acentos ni mayúsculas.',
+            )
+            # cluster_id queda nulo en resultados procesados sin AGRUPAR_DUPLICADOS (ver procesar_comentarios.py)
+            agrupar = ("cluster_id" in df_base.columns and df_base["cluster_id"].notna().any()
+                       and st.checkbox("Agrupar comentarios repetidos", value=True))
+            if texto_busqueda.strip():
+                # los mismos filtros que el resto de la página (el índice incluye "sin categoría")
+                filtros = {
+                    "sentimiento": consulta.sentimientos() if opcion_sentimiento == "Todos" else [opcion_sentimiento],
+                    "insight": consulta.insights() if opcion_insight == "Todos" else [opcion_insight],
+                }
+                if videos_seleccionados is not None:
+                    filtros["video"] = videos_seleccionados
+                inicio = time.perf_counter()
+                with etapa("busqueda"):
+                    resultados, total = cargar_indice_busqueda(df_base).buscar(texto_busqueda, filtros=filtros)
+                mostrados = f", se muestran los {len(resultados)} más relevantes" if total > len(resultados) else ""
+                st.caption(f"{total} comentarios coinciden{mostrados} ({(time.perf_counter() - inicio) * 1000:.0f} ms)")
+                if "cluster_id" in resultados.columns:
+                    resultados = colapsar_duplicados(resultados) if agrupar else resultados.drop(columns="cluster_id")
+                vista = tabla_paginada(resultados, "explorador_busqueda")
+            else:
+                extras = None
+                if agrupar:
+                    primeras, conteos = primeros_por_grupo(df_base["cluster_id"].to_numpy()[filas])
+                    filas = filas[primeras]
+                    repeticiones = np.zeros(len(df_base), dtype=np.int64)
+                    repeticiones[filas] = conteos
+                    extras = {"repeticiones": repeticiones}
+                vista = tabla_paginada(df_base, "explorador", filas, extras,
+                                       columnas=[c for c in df_base.columns if c != "cluster_id"])
+
+            indice_embeddings = cargar_indice_embeddings()
+            if indice_embeddings is not None and "texto" in vista.columns and not vista.empty:
+                elegido = st.selectbox(
+                    "Ver comentarios similares a",
+                    vista["texto"],
+                    index=None,
+                    placeholder="Elige un comentario de la página visible",
+                    help="Por significado, no por palabras: vecinos más cercanos en el espacio de embeddings. "
+                         "La columna habilidades es el etiquetado por centroides.",
+                )
+                if elegido is not None:
+                    with etapa("similares"):
+                        similares = indice_embeddings.similares(elegido)
+                    if similares is None:
+                        st.info("Ese comentario no está en el índice de embeddings; vuelve a ejecutar 'calcular_embeddings.py'.")
+                    else:
+                        st.dataframe(similares)
     else:
-        st.warning("No se encontraron datos para los filtros seleccionados.")
\ No newline at end of file
+        st.warning("No se encontraron datos para los filtros seleccionados.")
+
+mostrar_panel()
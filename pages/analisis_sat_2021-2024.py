@@ -1,197 +1,293 @@
-
 # streamlit_app.py
 
 import streamlit as st
 import pandas as pd
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
 import os
-from scipy.stats import ttest_ind, zscore
+from utils.densidad import densidades_por
+from utils.figuras import figura_a_png, huella_archivos
+from utils.instituciones import (RUTA_INSTITUCIONES, IndiceInstituciones, nombres_para_mostrar, serie_cambios,
+                                 top_cambios)
+from utils.perfilado import medido, mostrar_panel
+from utils.registro import registro
+from utils.remuestreo import tabla_remuestreo
+from utils.sat import (COLUMNAS_SAT, DIRECTORIO_SAT, NOMBRES_REGION, SECCIONES_SAT, cargar_anios, descubrir_anios,
+                       desempeno_por_anio, kpis, pruebas_pareadas, ratio_verbal_matematico)
 
 
 # Título
 st.title("📊 Dashboard de Análisis Puntuaciones de exámenes de admisión")
 
-# Carga de datos
-path_2021 = os.path.join("data", "clean", "2021-2022.csv")
-path_2023 = os.path.join("data", "clean", "2023-2024.csv")
+# Carga de datos: cada CSV de data/clean es un año académico
+anios = descubrir_anios(DIRECTORIO_SAT)
+etiquetas = [etiqueta for etiqueta, _ in anios]
 
-df_2021 = pd.read_csv(path_2021)
-df_2023 = pd.read_csv(path_2023)
+# La página se divide en etapas cacheadas (datos -> estadísticas -> figuras). Los datos viven
+# en el registro compartido del proceso; el resto usa como clave el hash de los CSV, así un
+# rerun sin cambios en los archivos no recalcula ni redibuja. El índice de instituciones
+# (inst_id) entra en ambas claves: al actualizarlo cambian los cruces entre años
+rutas_datos = [ruta for _, ruta in anios] + [ruta for ruta in [RUTA_INSTITUCIONES] if os.path.exists(ruta)]
+huella = huella_archivos(rutas_datos)
 
-# Limpieza básica
-cols = ["SAT_AVG_ALL", "SATVR25", "SATVR75", "SATMT25", "SATMT75"]
-df_2021[cols] = df_2021[cols].apply(pd.to_numeric, errors="coerce")
-df_2023[cols] = df_2023[cols].apply(pd.to_numeric, errors="coerce")
 
+def _cargar_sat():
+    # un solo DataFrame largo con la columna Year; la limpieza y las categorías
+    # de desempeño se aplican una vez para todos los años (ver utils/sat.py).
+    # Cada fila lleva el inst_id del índice persistente de instituciones, que la
+    # página solo lee: lo actualiza actualizar_instituciones.py. Las instituciones
+    # que todavía no están en el índice reciben un id nuevo solo en memoria
+    return cargar_anios(anios, IndiceInstituciones.cargar(RUTA_INSTITUCIONES))
 
 
-t_stat, p_value = ttest_ind(df_2021["SAT_AVG_ALL"], df_2023["SAT_AVG_ALL"], equal_var=True)
+def cargar_datos():
+    # una sola copia por proceso del servidor, compartida entre sesiones (ver utils/registro.py)
+    return registro.obtener("sat", rutas_datos, _cargar_sat)
 
-# Cohen's d
-def cohens_d(x, y):
-    nx, ny = len(x), len(y)
-    pooled_std = np.sqrt(((nx - 1)*np.std(x, ddof=1)**2 + (ny - 1)*np.std(y, ddof=1)**2) / (nx + ny - 2))
-    return (np.mean(x) - np.mean(y)) / pooled_std
 
-d = cohens_d(df_2021["SAT_AVG_ALL"], df_2023["SAT_AVG_ALL"])
+@st.cache_data
+@medido()
+def calcular_estadisticas(huella):
+    df = cargar_datos()
+    return {
+        "kpis": kpis(df),
+        "desempeno": desempeno_por_anio(df),
+        "ratios": ratio_verbal_matematico(df),
+        "pruebas": pruebas_pareadas(df),
+        # cambio % por institución para todos los pares de años, unido por inst_id
+        "cambios": serie_cambios(df),
+        "nombres": nombres_para_mostrar(df),
+    }
 
-# --- Layout con columnas ---
-st.subheader("🧪 Prueba de Hipótesis: Comparación SAT_AVG_ALL (2021–2022 vs 2023–2024)")
 
-col_spacer,col1, col2 = st.columns([0.25,1, 1.25])  # KDE más ancho
+@st.cache_data
+@medido()
+def calcular_cambios(huella, anio_a, anio_b):
+    # Seleccionamos top 5 positivos y negativos
+    stats = calcular_estadisticas(huella)
+    return top_cambios(stats["cambios"], stats["nombres"], anio_a, anio_b, k=5)
 
-with col1:
-    st.markdown("#### 📊 Resultados Estadísticos")
-    st.write(f"• **Estadístico t**: {t_stat:.3f}")
-    st.write(f"• **Valor p**: {p_value:.4f}")
-    st.write("• **¿Diferencia significativa?**: {}".format("✅ Sí (p < 0.05)" if p_value < 0.05 else "❌ No (p ≥ 0.05)"))
-    st.write(f"• **d de Cohen**: {d:.3f}")
-    st.write("Hay diferencia estadística pero el tamaño de impacto en la práctica no es significativo.")
 
-with col2:
-    # KDE plot
-    fig_kde, ax = plt.subplots(figsize=(6, 3))
-    sns.kdeplot(df_2021["SAT_AVG_ALL"], label="2021–2022", fill=True, alpha=0.5, ax=ax)
-    sns.kdeplot(df_2023["SAT_AVG_ALL"], label="2023–2024", fill=True, alpha=0.5, ax=ax)
-    ax.set_title("Distribución de SAT_AVG_ALL por Año (KDE)")
-    ax.set_xlabel("Puntaje SAT")
-    ax.set_ylabel("Densidad")
-    ax.legend()
-    ax.grid(True, linestyle="--", alpha=0.6)
-    st.pyplot(fig_kde)
+@st.cache_data
+@medido()
+def calcular_remuestreo(huella, anio_a, anio_b, columnas, por=None):
+    # bootstrap (IC 95%) y permutación con 10 000 remuestreos y semilla fija;
+    # queda cacheado por huella de los datos, par de años, columnas y agrupación
+    return tabla_remuestreo(cargar_datos(), anio_a, anio_b, list(columnas), por=por)
 
-# --- Fila inferior con boxplot y barplot ---
-col3, col4 = st.columns(2)
 
-# Preparación
-df_2021_temp = df_2021.assign(Year="2021–2022")
-df_2023_temp = df_2023.assign(Year="2023–2024")
-df_box = pd.concat([df_2021_temp, df_2023_temp])
+@st.cache_data
+@medido()
+def calcular_densidades(huella, columna, por=("Year",)):
+    # curvas KDE por binning + FFT (ver utils/densidad.py): (grilla, {grupo: densidad}),
+    # cacheadas por columna y agrupación; las figuras solo las dibujan
+    return densidades_por(cargar_datos(), columna, list(por))
 
-# Boxplot
-col_box, col_spacer, col_bar = st.columns([1.2, 0.3, 1.8])  # proporciones: más espacio al barplot
 
-# Preparación
-df_2021_temp = df_2021.assign(Year="2021–2022")
-df_2023_temp = df_2023.assign(Year="2023–2024")
-df_box = pd.concat([df_2021_temp, df_2023_temp])
-# Calcular el cambio porcentual por institución
-df_merged = pd.merge(
-    df_2021[["INSTNM", "SAT_AVG_ALL"]],
-    df_2023[["INSTNM", "SAT_AVG_ALL"]],
-    on="INSTNM",
-    suffixes=("_2021", "_2023")
-)
-
-df_merged["%_cambio_SAT"] = (
-    (df_merged["SAT_AVG_ALL_2023"] - df_merged["SAT_AVG_ALL_2021"]) / df_merged["SAT_AVG_ALL_2021"]
-) * 100
-
-# Seleccionamos top 5 positivos y negativos
-top_positive = df_merged.sort_values(by="%_cambio_SAT", ascending=False).head(5)
-top_negative = df_merged.sort_values(by="%_cambio_SAT", ascending=True).head(5)
-
-# Unión final
-df_barras = pd.concat([top_positive, top_negative]).sort_values(by="%_cambio_SAT")
+def _dibujar_densidad(ax, grilla, densidad, etiqueta):
+    linea, = ax.plot(grilla, densidad, label=etiqueta)
+    ax.fill_between(grilla, densidad, alpha=0.5, color=linea.get_color())
 
-col_box, col_spacer, col_bar = st.columns([1.2, 0.3, 1.8])  # proporciones: más espacio al barplot
 
-# Boxplot reducido
-with col_box:
+# Figuras: cada una devuelve los bytes PNG y queda memorizada por huella de los datos.
+# matplotlib y seaborn se importan dentro de cada figura, solo cuando hay que dibujarla
+
+@st.cache_data
+@medido()
+def figura_kde(huella, anios_kde):
+    import matplotlib.pyplot as plt
+
+    grilla, curvas = calcular_densidades(huella, "SAT_AVG_ALL")
+    fig_kde, ax = plt.subplots(figsize=(6, 3))
+    for anio in anios_kde:
+        if anio in curvas:
+            _dibujar_densidad(ax, grilla, curvas[anio], anio)
+    ax.set_title("Distribución de SAT_AVG_ALL por Año (KDE)")
+    ax.set_xlabel("Puntaje SAT")
+    ax.set_ylabel("Densidad")
+    ax.legend()
+    ax.grid(True, linestyle="--", alpha=0.6)
+    return figura_a_png(fig_kde)
+
+
+@st.cache_data
+@medido()
+def figura_densidades_secciones(huella, region=None):
+    import matplotlib.pyplot as plt
+
+    fig, ejes = plt.subplots(2, 2, figsize=(9, 5), sharey=True)
+    for ax, columna in zip(ejes.flat, SECCIONES_SAT):
+        if region is None:
+            grilla, curvas = calcular_densidades(huella, columna)
+        else:
+            grilla, por_region = calcular_densidades(huella, columna, ("REGION", "Year"))
+            curvas = {anio: densidad for (codigo, anio), densidad in por_region.items() if codigo == region}
+        for anio, densidad in curvas.items():
+            _dibujar_densidad(ax, grilla, densidad, anio)
+        ax.set_title(columna, fontsize=10)
+        ax.grid(True, linestyle="--", alpha=0.6)
+    ejes[0, 0].set_ylabel("Densidad")
+    ejes[1, 0].set_ylabel("Densidad")
+    ejes[0, 0].legend(fontsize=8)
+    fig.tight_layout()
+    return figura_a_png(fig)
+
+
+@st.cache_data
+@medido()
+def figura_boxplot(huella):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    df_box = cargar_datos()
     fig_box, ax = plt.subplots()
-    sns.boxplot(data=df_box, x="Year", y="SAT_AVG_ALL", palette="Set2", ax=ax)
+    sns.boxplot(data=df_box, x="Year", y="SAT_AVG_ALL", hue="Year", palette="Set2", legend=False, ax=ax)
     ax.set_title("Boxplot de SAT_AVG_ALL por Año", fontsize=12)
     ax.set_ylabel("Puntaje SAT")
     ax.grid(True, axis='y', linestyle="--", alpha=0.6)
-    st.pyplot(fig_box)
+    return figura_a_png(fig_box)
 
-# Espacio vacío en el centro
-with col_spacer:
-    st.write("")
 
-# Barplot amplio
-with col_bar:
+@st.cache_data
+@medido()
+def figura_barras_cambio(huella, anio_a, anio_b):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    df_barras = calcular_cambios(huella, anio_a, anio_b)
     fig_bar, ax = plt.subplots()
-    sns.barplot(data=df_barras, x="%_cambio_SAT", y="INSTNM", palette="coolwarm", ax=ax)
+    sns.barplot(data=df_barras, x="%_cambio_SAT", y="INSTNM", hue="INSTNM", palette="coolwarm", legend=False, ax=ax)
     ax.set_title("Top ±5 Cambios % SAT_AVG_ALL por Institución", fontsize=12)
     ax.set_xlabel("Cambio porcentual")
     ax.set_ylabel("Institución")
     ax.axvline(x=0, color="gray", linestyle="--")
     ax.grid(True, axis='x', linestyle="--", alpha=0.6)
-    st.pyplot(fig_bar)
+    return figura_a_png(fig_bar)
 
 
-import matplotlib.pyplot as plt
+@st.cache_data
+@medido()
+def figura_pie_desempeno(huella, anio):
+    import matplotlib.pyplot as plt
+
+    desempeno = calcular_estadisticas(huella)["desempeno"].loc[anio]
+    fig, ax = plt.subplots()
+    ax.pie(desempeno, labels=desempeno.index, autopct="%1.1f%%", startangle=140)
+    ax.axis("equal")
+    return figura_a_png(fig)
 
-# KPIs
-kpi_2021 = df_2021["SAT_AVG_ALL"].agg(["mean", "std", "min", "max"]).round(2)
-kpi_2023 = df_2023["SAT_AVG_ALL"].agg(["mean", "std", "min", "max"]).round(2)
 
-# Definimos categorías de desempeño
-bins = [0, 1000, 1200, 1400, 1500, float("inf")]
-labels = ["Bajo", "Básico", "Intermedio", "Alto", "Sobresaliente"]
+@st.cache_data
+@medido()
+def figura_tendencias():
+    import matplotlib.pyplot as plt
 
-# Añadimos categoría al DataFrame
-df_2021["Desempeño"] = pd.cut(df_2021["SAT_AVG_ALL"], bins=bins, labels=labels)
-df_2023["Desempeño"] = pd.cut(df_2023["SAT_AVG_ALL"], bins=bins, labels=labels)
+    years = np.arange(2018, 2025)
+    trends = pd.DataFrame({
+        "Año": years,
+        "ChatGPT": [0, 0, 0, 0, 25, 75, 90],
+        "Gemini": [0, 0, 0, 0, 15, 55, 65],
+        "Wikipedia": [30, 35, 40, 38, 42, 45, 48],
+        "Sci-Hub": [40, 42, 43, 41, 44, 46, 50],
+        "Google Scholar": [20, 25, 30, 40, 50, 55, 60],
+    })
 
-# Conteos para pie charts
-desempeno_2021 = df_2021["Desempeño"].value_counts().sort_index()
-desempeno_2023 = df_2023["Desempeño"].value_counts().sort_index()
+    fig, ax = plt.subplots()
+    for col in trends.columns[1:]:
+        ax.plot(trends["Año"], trends[col], label=col, linewidth=2)
 
-# Layout de 4 columnas
-col1, col2, col3, col4 = st.columns(4)
+    ax.set_title("Tendencias de Búsqueda (2018–2024)", fontsize=12)
+    ax.set_ylabel("Interés relativo (%)")
+    ax.legend()
+    ax.grid(True)
+    return figura_a_png(fig)
 
-with col1:
-    st.markdown("#### 🔵 Año 2021–2022")
-    st.write(f"• Media: {kpi_2021['mean']}")
-    st.write(f"• Desviación estándar: {kpi_2021['std']}")
-    st.write(f"• Mínimo: {kpi_2021['min']}")
-    st.write(f"• Máximo: {kpi_2021['max']}")
 
-with col2:
-    fig1, ax1 = plt.subplots()
-    ax1.pie(desempeno_2021, labels=desempeno_2021.index, autopct="%1.1f%%", startangle=140)
-    ax1.axis("equal")
-    st.pyplot(fig1)
+@st.cache_data
+@medido()
+def figura_publicaciones():
+    import matplotlib.pyplot as plt
 
-with col3:
-    st.markdown("#### 🟢 Año 2023–2024")
-    st.write(f"• Media: {kpi_2023['mean']}")
-    st.write(f"• Desviación estándar: {kpi_2023['std']}")
-    st.write(f"• Mínimo: {kpi_2023['min']}")
-    st.write(f"• Máximo: {kpi_2023['max']}")
+    pub_years = np.arange(2018, 2025)
+    pub_counts = [50, 60, 75, 110, 200, 320, 460]
 
-with col4:
     fig2, ax2 = plt.subplots()
-    ax2.pie(desempeno_2023, labels=desempeno_2023.index, autopct="%1.1f%%", startangle=140)
-    ax2.axis("equal")
-    st.pyplot(fig2)
+    ax2.plot(pub_years, pub_counts, marker='o', linestyle='--', color='purple')
+    ax2.set_title("Publicaciones por Año (Simulado)", fontsize=12)
+    ax2.set_xlabel("Año")
+    ax2.set_ylabel("Cantidad de Publicaciones")
+    ax2.grid(True)
+    return figura_a_png(fig2)
+
+
+stats = calcular_estadisticas(huella)
+
+# Par de años a comparar (por defecto el primero y el último disponibles)
+with st.sidebar:
+    st.header("Años a comparar")
+    anio_a = st.selectbox("Año base", etiquetas, index=0)
+    otros_anios = [e for e in etiquetas if e != anio_a]
+    anio_b = st.selectbox("Año de comparación", otros_anios, index=len(otros_anios) - 1)
+
+prueba = stats["pruebas"].loc[(anio_a, anio_b)]
+intervalo = calcular_remuestreo(huella, anio_a, anio_b, ("SAT_AVG_ALL",)).loc["SAT_AVG_ALL"]
+t_stat, p_value, d = prueba["t"], prueba["p"], prueba["d"]
+
+# --- Layout con columnas ---
+st.subheader(f"🧪 Prueba de Hipótesis: Comparación SAT_AVG_ALL ({anio_a} vs {anio_b})")
+
+col_spacer,col1, col2 = st.columns([0.25,1, 1.25])  # KDE más ancho
+
+with col1:
+    st.markdown("#### 📊 Resultados Estadísticos")
+    st.write(f"• **Estadístico t**: {t_stat:.3f}")
+    st.write(f"• **Valor p**: {p_value:.4f}")
+    st.write("• **¿Diferencia significativa?**: {}".format("✅ Sí (p < 0.05)" if p_value < 0.05 else "❌ No (p ≥ 0.05)"))
+    st.write(f"• **d de Cohen**: {d:.3f}")
+    st.write(f"• **IC 95% bootstrap diferencia de medias ({anio_a} − {anio_b})**: [{intervalo['dif_inf']:.2f}, {intervalo['dif_sup']:.2f}]")
+    st.write(f"• **IC 95% bootstrap d de Cohen**: [{intervalo['d_inf']:.3f}, {intervalo['d_sup']:.3f}]")
+    st.write(f"• **Valor p (permutación)**: {intervalo['p_perm']:.4f}")
+    if p_value < 0.05 and abs(d) < 0.2:
+        st.write("Hay diferencia estadística pero el tamaño de impacto en la práctica no es significativo.")
+    elif p_value < 0.05:
+        st.write("Hay diferencia estadística y el tamaño de impacto es relevante en la práctica.")
+    else:
+        st.write("No hay diferencia estadística entre los años comparados.")
 
+with col2:
+    # KDE plot
+    st.image(figura_kde(huella, (anio_a, anio_b)))
 
+# --- Fila inferior con boxplot y barplot ---
+col_box, col_spacer, col_bar = st.columns([1.2, 0.3, 1.8])  # proporciones: más espacio al barplot
 
+# Boxplot reducido
+with col_box:
+    st.image(figura_boxplot(huella))
 
-mean_2021 = df_2021["SAT_AVG_ALL"].mean()
-mean_2023 = df_2023["SAT_AVG_ALL"].mean()
-pct_change = ((mean_2023 - mean_2021) / mean_2021) * 100
+# Espacio vacío en el centro
+with col_spacer:
+    st.write("")
 
-verbal_2021 = (df_2021["SATVR25"] + df_2021["SATVR75"]) / 2
-math_2021 = (df_2021["SATMT25"] + df_2021["SATMT75"]) / 2
-ratio_2021 = verbal_2021.mean() / math_2021.mean()
+# Barplot amplio
+with col_bar:
+    st.image(figura_barras_cambio(huella, anio_a, anio_b))
 
-verbal_2023 = (df_2023["SATVR25"] + df_2023["SATVR75"]) / 2
-math_2023 = (df_2023["SATMT25"] + df_2023["SATMT75"]) / 2
-ratio_2023 = verbal_2023.mean() / math_2023.mean()
 
-# Z-score promedio
-df_z = pd.concat([
-    df_2021.assign(Year="2021–2022"),
-    df_2023.assign(Year="2023–2024")
-])
-df_z["SAT_AVG_ALL_Z"] = zscore(df_z["SAT_AVG_ALL"])
-zscore_means = df_z.groupby("Year")["SAT_AVG_ALL_Z"].mean()
+# KPIs y distribución de desempeño: dos años por fila en 4 columnas
+iconos = ["🔵", "🟢", "🟠", "🟣", "🔴", "🟡"]
+for inicio in range(0, len(etiquetas), 2):
+    columnas = st.columns(4)
+    for j, anio in enumerate(etiquetas[inicio:inicio + 2]):
+        kpi = stats["kpis"].loc[anio]
+        with columnas[2 * j]:
+            st.markdown(f"#### {iconos[(inicio + j) % len(iconos)]} Año {anio}")
+            st.write(f"• Media: {kpi['mean']}")
+            st.write(f"• Desviación estándar: {kpi['std']}")
+            st.write(f"• Mínimo: {kpi['min']}")
+            st.write(f"• Máximo: {kpi['max']}")
+        with columnas[2 * j + 1]:
+            st.image(figura_pie_desempeno(huella, anio))
+
 
 # ---------------------------
 # Layout en columnas
@@ -203,15 +299,31 @@ col1, col2, col3 = st.columns(3)
 
 with col1:
     st.markdown("#### 📌 Variación % SAT Promedio")
-    st.markdown(f"**{pct_change:.2f}%**")
+    st.markdown(f"**{prueba['cambio_pct']:.2f}%**")
 
 with col2:
     st.markdown("#### 📏 Ratio Verbal/Matemático")
-    st.markdown(f"**2021–2022:** {ratio_2021:.3f}  \n**2023–2024:** {ratio_2023:.3f}")
+    st.markdown("  \n".join(f"**{anio}:** {ratio:.3f}" for anio, ratio in stats["ratios"].items()))
 
 with col3:
     st.markdown("#### ⚖️ Variación de media")
-    st.markdown(f"**2023–2024:** {zscore_means['2023–2024']:.3f}")
+    st.markdown(f"**{anio_b}:** {prueba['z_b']:.3f}")
+
+with st.expander("🔁 Remuestreo por sección del SAT y región"):
+    st.caption(f"Diferencia de medias y d de Cohen ({anio_a} − {anio_b}, el mismo signo que t y d arriba) "
+               "con IC 95% bootstrap y valor p de permutación (10 000 remuestreos).")
+    # se calcula a pedido: son varias decenas de combinaciones sección × región
+    if st.checkbox("Calcular por sección y región"):
+        st.dataframe(calcular_remuestreo(huella, anio_a, anio_b, tuple(COLUMNAS_SAT)).round(4))
+        por_region = calcular_remuestreo(huella, anio_a, anio_b, tuple(COLUMNAS_SAT), por="REGION")
+        st.dataframe(por_region.rename(index=NOMBRES_REGION, level="REGION").round(4))
+
+with st.expander("📈 Distribuciones por sección del SAT"):
+    st.caption("Percentiles 25 y 75 de las secciones verbal (VR) y matemática (MT) por año (KDE gaussiano).")
+    regiones = sorted(int(r) for r in cargar_datos()["REGION"].dropna().unique())
+    region = st.selectbox("Región", [None] + regiones,
+                          format_func=lambda r: "Todas" if r is None else NOMBRES_REGION.get(r, str(r)))
+    st.image(figura_densidades_secciones(huella, region))
 
 st.markdown("---")
 st.subheader("📊 Interés Global y Publicaciones sobre IA en Educación")
@@ -220,37 +332,10 @@ col1,col_spacer, col2 = st.columns([1,0.5,1])
 
 with col1:
     st.markdown("#### 🔎 Tendencias de Búsqueda Simuladas (GTrends)")
-    years = np.arange(2018, 2025)
-    trends = pd.DataFrame({
-        "Año": years,
-        "ChatGPT": [0, 0, 0, 0, 25, 75, 90],
-        "Gemini": [0, 0, 0, 0, 15, 55, 65],
-        "Wikipedia": [30, 35, 40, 38, 42, 45, 48],
-        "Sci-Hub": [40, 42, 43, 41, 44, 46, 50],
-        "Google Scholar": [20, 25, 30, 40, 50, 55, 60],
-    })
-
-    fig, ax = plt.subplots()
-    for col in trends.columns[1:]:
-        ax.plot(trends["Año"], trends[col], label=col, linewidth=2)
-
-    ax.set_title("Tendencias de Búsqueda (2018–2024)", fontsize=12)
-    ax.set_ylabel("Interés relativo (%)")
-    ax.legend()
-    ax.grid(True)
-    st.pyplot(fig)
+    st.image(figura_tendencias())
 
 with col2:
     st.markdown("#### 📚 Publicaciones sobre IA en Educación (Simulación)")
+    st.image(figura_publicaciones())
 
-    pub_years = np.arange(2018, 2025)
-    pub_counts = [50, 60, 75, 110, 200, 320, 460]
-
-    fig2, ax2 = plt.subplots()
-    ax2.plot(pub_years, pub_counts, marker='o', linestyle='--', color='purple')
-    ax2.set_title("Publicaciones por Año (Simulado)", fontsize=12)
-    ax2.set_xlabel("Año")
-    ax2.set_ylabel("Cantidad de Publicaciones")
-    ax2.grid(True)
-    st.pyplot(fig2)
-
+mostrar_panel()
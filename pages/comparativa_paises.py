@@ -1,69 +1,76 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
+from utils.encuestas import (DIRECTORIO_ENCUESTAS, ESQUEMAS, cargar_encuesta, combinar, normalizar, ruta_compacta,
+                             ruta_encuesta)
+from utils.perfilado import etapa, mostrar_panel
+from utils.registro import registro
+from utils.tablas import tabla_paginada
 
 st.title('🌎 Dashboard comparativo del uso de IA en la educación')
 st.write("Análisis comparativo sobre el uso y conocimiento de IA entre estudiantes de Bangladesh, India, Rumania y Turquía.")
 
-@st.cache_data
-def load_and_prepare_data():
-    files = ['bangladesh.csv', 'india.csv', 'rumania.csv', 'turkey.csv']
-    for file in files:
-        if not os.path.exists(file):
-            st.error(f"Error: No se encontró el archivo '{file}'. Asegúrate de que todos los archivos CSV estén en el directorio principal.")
-            return None, None, {}
+def preparar_datos(rutas):
+    # copias compactas (columnas categóricas/int8) mapeadas en memoria y sin copiar; las genera
+    # compactar_encuestas.py, la página solo las lee (ver utils/encuestas.py)
+    all_dfs = {pais: cargar_encuesta(ruta) for pais, ruta in rutas.items()}
 
-    bangladesh_df = pd.read_csv('bangladesh.csv')
-    india_df = pd.read_csv('india.csv')
-    romania_df = pd.read_csv('rumania.csv')
-    turkey_df = pd.read_csv('turkey.csv')
-    
-    all_dfs = {'Bangladesh': bangladesh_df, 'India': india_df, 'Rumania': romania_df, 'Turquía': turkey_df}
-    
-    # Normalización (código original sin cambios)
-    bangladesh_usage_map = {'Never': 0, 'Occasionally': 0.25, 'Monthly': 0.5, 'Weekly': 0.75, 'Daily': 1}
-    bangladesh_df['AI_Usage_Normalized'] = bangladesh_df[bangladesh_df.columns[2]].map(bangladesh_usage_map)
-    bangladesh_df['Country'] = 'Bangladesh'
+    # Normalización declarativa por país (ver utils/encuestas.py): columnas por nombre y
+    # transformaciones vectorizadas, sin lambdas por fila
+    with etapa("normalizacion", filas=sum(len(df) for df in all_dfs.values())):
+        normalizadas = {pais: normalizar(df, pais) for pais, df in all_dfs.items()}
+    # los datos originales se muestran con sus columnas normalizadas al final
+    all_dfs = {pais: df.join(normalizadas[pais]) for pais, df in all_dfs.items()}
 
-    india_df['AI_Usage_Normalized'] = pd.to_numeric(india_df[india_df.columns[5]], errors='coerce').apply(lambda x: 0.25 if x < 1 else (0.5 if 1 <= x <= 3 else 1))
-    india_df['AI_Knowledge_Normalized'] = (pd.to_numeric(india_df[india_df.columns[11]], errors='coerce') - 1) / 9
-    india_df['Country'] = 'India'
+    combined_frequency_df = combinar(normalizadas, "AI_Usage_Normalized")
+    combined_knowledge_df = combinar(normalizadas, "AI_Knowledge_Normalized")
 
-    romania_df['AI_Knowledge_Normalized'] = (pd.to_numeric(romania_df[romania_df.columns[0]], errors='coerce') - 1) / 4
-    romania_df['AI_Usage_Normalized'] = (pd.to_numeric(romania_df[romania_df.columns[2]], errors='coerce') - 1) / 4
-    romania_df['Country'] = 'Rumania'
+    return combined_frequency_df, combined_knowledge_df, all_dfs
 
-    turkey_knowledge_map = {'No knowledge': 0, 'Little knowledge': 1/3, 'Moderate knowledge': 2/3, 'High knowledge': 1}
-    turkey_df['AI_Knowledge_Normalized'] = turkey_df[turkey_df.columns[5]].map(turkey_knowledge_map)
-    turkey_df['Country'] = 'Turquía'
+def load_and_prepare_data():
+    rutas = {pais: ruta_encuesta(pais) for pais in ESQUEMAS}
+    for file in rutas.values():
+        if not os.path.exists(file):
+            st.error(f"Error: No se encontró el archivo '{file}'. Asegúrate de que todos los archivos CSV estén en '{DIRECTORIO_ENCUESTAS}'.")
+            return None, None, {}
 
-    combined_frequency_df = pd.concat([bangladesh_df[['Country', 'AI_Usage_Normalized']], romania_df[['Country', 'AI_Usage_Normalized']], india_df[['Country', 'AI_Usage_Normalized']]], ignore_index=True)
-    combined_knowledge_df = pd.concat([turkey_df[['Country', 'AI_Knowledge_Normalized']], romania_df[['Country', 'AI_Knowledge_Normalized']], india_df[['Country', 'AI_Knowledge_Normalized']]], ignore_index=True)
-    
-    return combined_frequency_df, combined_knowledge_df, all_dfs
+    # una sola copia por proceso del servidor, compartida entre sesiones (ver utils/registro.py)
+    try:
+        # las copias compactas tambien son parte de la firma: al regenerarlas se recarga
+        compactas = [ruta_compacta(ruta) for ruta in rutas.values() if os.path.exists(ruta_compacta(ruta))]
+        return registro.obtener("encuestas", list(rutas.values()) + compactas, lambda: preparar_datos(rutas))
+    except KeyError as e:
+        st.error(f"Error: {e.args[0]}")
+        return None, None, {}
 
 frequency_df, knowledge_df, original_dfs = load_and_prepare_data()
 
 if frequency_df is not None and knowledge_df is not None:
+    # matplotlib y seaborn se importan recién cuando hay datos para graficar
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     st.header('Comparación General Normalizada')
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader('Frecuencia Promedio de Uso de IA')
-        fig1, ax1 = plt.subplots()
-        sns.barplot(data=frequency_df, x='Country', y='AI_Usage_Normalized', hue='Country', estimator='mean', ax=ax1, palette="viridis", errorbar=None, legend=False)
-        st.pyplot(fig1)
+        with etapa("grafico_frecuencia", filas=len(frequency_df)):
+            fig1, ax1 = plt.subplots()
+            sns.barplot(data=frequency_df, x='Country', y='AI_Usage_Normalized', hue='Country', estimator='mean', ax=ax1, palette="viridis", errorbar=None, legend=False)
+            st.pyplot(fig1)
 
     with col2:
         st.subheader('Nivel Promedio de Conocimiento de IA')
-        fig2, ax2 = plt.subplots()
-        sns.barplot(data=knowledge_df, x='Country', y='AI_Knowledge_Normalized', hue='Country', estimator='mean', ax=ax2, palette="plasma", errorbar=None, legend=False)
-        st.pyplot(fig2)
+        with etapa("grafico_conocimiento", filas=len(knowledge_df)):
+            fig2, ax2 = plt.subplots()
+            sns.barplot(data=knowledge_df, x='Country', y='AI_Knowledge_Normalized', hue='Country', estimator='mean', ax=ax2, palette="plasma", errorbar=None, legend=False)
+            st.pyplot(fig2)
 
     st.markdown("---")
     st.header("Explora los Datos Originales")
     selected_country = st.selectbox("Selecciona un país:", list(original_dfs.keys()))
     if selected_country:
-        st.dataframe(original_dfs[selected_country])
\ No newline at end of file
+        # paginada del lado del servidor (ver utils/tablas.py): solo se envía la página visible
+        tabla_paginada(original_dfs[selected_country], f"paises_{selected_country}")
+
+mostrar_panel()
@@ -1,117 +1,58 @@
-import json
-import csv
-from transformers import pipeline
+import argparse
+import os
+import sys
 from tqdm import tqdm
+from utils import perfilado
+from utils.agregados import RUTA_AGREGADOS, AcumuladorAgregados
+from utils.almacen import DIRECTORIO_RESULTADOS, fusionar_datasets, iterar_filas
+from utils.busqueda import RUTA_BUSQUEDA, ConstructorBusqueda
+from utils.cache_sentimiento import CacheSentimiento
+from utils.duplicados import IndiceDuplicados
+from utils.frecuencias import RUTA_FRECUENCIAS, IndiceFrecuencias
+from utils.habilidades import SIN_CATEGORIA, detector
+from utils.inferencia import MotorInferencia
+from utils.ingesta import archivos_de_comentarios, en_bloques, iterar_registros
+from utils.perfilado import etapa, iterar_medido
+from utils.registro import ruta_repo
+from utils.trabajo import (DIRECTORIO_TRABAJOS, Trabajo, firma_entrada, nombre_trabajo, parsear_shard,
+                           revisar_trabajos, seleccionar)
+from utils.tuberia import tuberia
 
-# 1. definicion de habilidades cognitivas
-# tu nueva lista, mejorada con vocabulario de los comentarios reales
-
-cognitive_skills = [
-    {
-        "name": "Memoria",
-        "synonyms": [
-            "memoria", "retención", "recuerdo", "reconocimiento", "memorización", 
-            "memoria a corto plazo", "memoria a largo plazo", "memoria de trabajo", 
-            "olvido", "olvidan", "olvidaba", "no me acuerdo", "no recordaba", "retener información"
-        ]
-    },
-    {
-        "name": "Atención",
-        "synonyms": [
-            "atención", "concentración", "enfoque", "vigilancia", "alerta", 
-            "atención selectiva", "atención sostenida",
-            "no me concentraba", "distracciones", "mantener la atención", "capacidad de atención"
-        ]
-    },
-    {
-        "name": "Velocidad de procesamiento",
-        "synonyms": [
-            "velocidad mental", "velocidad cognitiva", "tiempo de reacción", 
-            "procesamiento de información", "rapidez mental",
-            "agilizar procesos", "más rápido", "ahorrar tiempo", "en segundos", "inmediato"
-        ]
-    },
-    {
-        "name": "Razonamiento",
-        "synonyms": [
-            "pensamiento lógico", "razonamiento deductivo", "razonamiento inductivo", 
-            "pensamiento crítico", "pensamiento abstracto", "resolución de problemas", 
-            "pensamiento analítico", "inferencias", "lógica",
-            "criterio", "sentido crítico", "capacidad de análisis", "capacidad de razonamiento",
-            "analizar", "cuestionar", "conclusiones", "evaluación"
-        ]
-    },
-    {
-        "name": "Función ejecutiva",
-        "synonyms": [
-            "autorregulación", "control cognitivo", "planificación", "toma de decisiones", 
-            "flexibilidad mental", "inhibición", "gestión de metas", "pensamiento estratégico",
-            "organizar ideas", "estructurar ideas", "tomar decisiones"
-        ]
-    },
-    {
-        "name": "Comprensión del lenguaje",
-        "synonyms": [
-            "comprensión verbal", "procesamiento semántico", "comprensión lectora", 
-            "análisis de texto", "habilidades lingüísticas", "razonamiento verbal",
-            "redacción", "capacidad de redacción", "entender"
-        ]
-    },
-    {
-        "name": "Aprendizaje",
-        "synonyms": [
-            "adquisición de conocimiento", "aprendizaje de habilidades", "adaptabilidad", 
-            "crecimiento cognitivo", "aprendizaje asociativo", "aprender",
-            "entender conceptos", "esfuerzo cognitivo", "proceso de aprendizaje", "apropiarme"
-        ]
-    },
-    {
-        "name": "Creatividad",
-        "synonyms": [
-            "pensamiento divergente", "originalidad", "pensamiento innovador", 
-            "generación de ideas", "flexibilidad conceptual", "imaginación",
-            "ideas propias", "chispa inicial", "desbloquear la creatividad"
-        ]
-    },
-    {"name": "Habilidad visoespacial", "synonyms": ["razonamiento espacial", "procesamiento visual", "rotación mental", "visualización espacial", "conciencia espacial", "imaginación visual", "integración visomotriz"]},
-    {"name": "Habilidad numérica", "synonyms": ["razonamiento matemático", "pensamiento cuantitativo", "cálculo", "numeración", "habilidad aritmética", "procesamiento numérico"]},
-    {"name": "Metacognición", "synonyms": ["pensar sobre pensar", "autoconciencia", "reflexión", "evaluación propia", "autorregulación cognitiva", "monitoreo del pensamiento", "reflexionar"]},
-    {"name": "Inteligencia fluida", "synonyms": ["resolución de problemas nuevos", "razonamiento abstracto", "pensamiento adaptativo"]},
-    {"name": "Inteligencia cristalizada", "synonyms": ["base de conocimientos", "habilidad verbal", "conocimiento factual", "conocimiento acumulado", "conocimiento cultural"]},
-    {"name": "Percepción", "synonyms": ["percepción visual", "percepción auditiva", "procesamiento sensorial", "reconocimiento de patrones", "percepción táctil"]},
-    {"name": "Solución de problemas", "synonyms": ["estrategia de solución", "razonamiento heurístico", "pensamiento estratégico", "resolución de problemas", "diagnóstico", "buscar soluciones"]},
-    {"name": "Toma de decisiones", "synonyms": ["juicio", "evaluación", "elección", "priorización", "análisis de riesgos"]},
-    {"name": "Flexibilidad cognitiva", "synonyms": ["flexibilidad mental", "cambio de tareas", "adaptabilidad", "cambio cognitivo"]}
-]
+# 1. las habilidades cognitivas y su detector viven en utils/habilidades.py
 
 # 2. carga de datos y modelo de sentimiento
 
-# cargar archivos json
-try:
-    with open("Cómo ChatGPT arruina tu inteligencia - YouTube.json", encoding="utf-8") as f1:
-        data1 = json.load(f1)
-    with open("El MIT Muestra el Peligro del ChatGPT - YouTube.json", encoding="utf-8") as f2:
-        data2 = json.load(f2)
-    comentarios_json = data1 + data2
-except FileNotFoundError:
-    print("error: asegurate de que los archivos json esten en la misma carpeta.")
-    exit()
+DIRECTORIO_COMENTARIOS = ruta_repo("data", "comentarios")
+# cantidad de comentarios que se analizan y escriben juntos; acota la memoria usada
+TAMANO_BLOQUE = 2000
+# bloques que pueden esperar entre dos etapas de la tuberia (ver procesar())
+CAPACIDAD_COLAS = 2
+# agrupar comentarios repetidos o casi iguales y analizar solo un representante por grupo
+# (ver utils/duplicados.py); los demas heredan su sentimiento
+AGRUPAR_DUPLICADOS = True
 
-# cargar el modelo de hugging face
-print("cargando modelo de analisis de sentimiento...")
-sentiment_pipeline = pipeline("sentiment-analysis", model="pysentimiento/robertuito-sentiment-analysis")
-print("modelo cargado.")
+MODELO_SENTIMIENTO = "pysentimiento/robertuito-sentiment-analysis"
+RUTA_CACHE = ruta_repo("cache", "sentimientos.sqlite")
 
+# motor de inferencia: procesos con su propia copia del modelo y lotes armados por longitud
+# (None = se calcula segun los nucleos disponibles, ver utils/inferencia.py)
+PROCESOS_INFERENCIA = None
+HILOS_POR_PROCESO = None
+BATCH_SIZE = 16
+# "pytorch", "int8" u "onnx"; con DIRECTORIO_MODELO apuntando a modelos/ (ver exportar_modelo.py)
+# el modelo se carga sin conexion. Para "onnx" usar modelos/robertuito-onnx o robertuito-onnx-int8
+BACKEND_INFERENCIA = "pytorch"
+DIRECTORIO_MODELO = None
 
-# 3. funciones de analisis
 
-def detectar_cognitive_insight(texto):
-    texto_lower = texto.lower()
-    for habilidad in cognitive_skills:
-        for sinonimo in habilidad["synonyms"]:
-            if sinonimo in texto_lower:
-                return habilidad["name"]
-    return "sin categoría"
+def id_modelo_cache():
+    # el backend forma parte de la clave: int8/onnx pueden dar etiquetas distintas a fp32
+    if BACKEND_INFERENCIA == "pytorch" and DIRECTORIO_MODELO is None:
+        return MODELO_SENTIMIENTO
+    return f"{MODELO_SENTIMIENTO}@{BACKEND_INFERENCIA}:{os.path.basename(os.path.normpath(DIRECTORIO_MODELO or ''))}"
+
+
+# 3. funciones de analisis
 
 def map_sentiment_label(label):
     if label == 'POS':
@@ -122,41 +63,215 @@ def map_sentiment_label(label):
 
 # 4. procesamiento y exportacion
 
-resultados = []
-textos_para_analizar = []
-
-# extraer el texto de cada comentario
-for item in comentarios_json:
-    texto = item.get("ytcoreattributedstring") or item.get("Título") or ""
-    if texto and isinstance(texto, str) and texto.strip(): # solo procesar si el texto no esta vacio
-        textos_para_analizar.append(texto)
-
-print(f"procesando {len(textos_para_analizar)} comentarios...")
-
-# procesar sentimientos en lote para mas eficiencia
-sentimientos_results = sentiment_pipeline(textos_para_analizar, batch_size=16, truncation=True) 
-
-# usamos tqdm para ver el progreso de la union de datos
-print("uniendo resultados...")
-for i, texto in tqdm(enumerate(textos_para_analizar), total=len(textos_para_analizar)):
-    sentimiento_raw = sentimientos_results[i]
-    
-    sentimiento = map_sentiment_label(sentimiento_raw['label'])
-    score = sentimiento_raw['score'] if sentimiento != 'negativo' else -sentimiento_raw['score']
-    
-    insight = detectar_cognitive_insight(texto)
-    
-    resultados.append({
-        "texto": texto,
-        "sentimiento": sentimiento,
-        "score": round(score, 3),
-        "insight": insight
-    })
-
-# guardar en csv
-with open("comentarios_con_sentimiento.csv", "w", newline='', encoding="utf-8") as f:
-    writer = csv.DictWriter(f, fieldnames=["texto", "sentimiento", "score", "insight"])
-    writer.writeheader()
-    writer.writerows(resultados)
-
-print(f"\n se creo el archivo 'comentarios_con_sentimiento.csv' con {len(resultados)} comentarios procesados.")
\ No newline at end of file
+def armar_resultados(registros, sentimientos, clusters=None):
+    # una sola pasada del detector: la primera habilidad (segun la lista) va en "insight"
+    with etapa("habilidades", filas=len(registros)):
+        habilidades_por_texto = [detector.habilidades(registro["texto"]) for registro in registros]
+    clusters = clusters or [None] * len(registros)
+
+    resultados = []
+    for registro, sentimiento_raw, habilidades, cluster_id in zip(registros, sentimientos, habilidades_por_texto, clusters):
+        texto = registro["texto"]
+        sentimiento = map_sentiment_label(sentimiento_raw['label'])
+        score = sentimiento_raw['score'] if sentimiento != 'negativo' else -sentimiento_raw['score']
+        insight = habilidades[0] if habilidades else SIN_CATEGORIA
+
+        resultados.append({
+            "video": registro["video"],
+            "texto": texto,
+            "sentimiento": sentimiento,
+            "score": round(score, 3),
+            "insight": insight,
+            "insights": "|".join(habilidades),
+            "cluster_id": cluster_id,
+        })
+    return resultados
+
+
+def agrupar(registros, indice):
+    """(cluster_ids, textos para el modelo): el de cada comentario es el de su representante."""
+    if indice is None:
+        return None, [registro["texto"] for registro in registros]
+    with etapa("duplicados", filas=len(registros)):
+        grupos = indice.agrupar([registro["texto"] for registro in registros])
+    return [cluster_id for cluster_id, _ in grupos], [representante for _, representante in grupos]
+
+
+def procesar_bloque(registros, cache, motor, indice=None):
+    # version secuencial de un bloque: sentimientos en lote, reutilizando los resultados ya
+    # guardados en la cache; el motor solo carga el modelo la primera vez que recibe comentarios nuevos.
+    # Con un IndiceDuplicados los comentarios de un grupo usan el texto de su representante,
+    # asi la cache los resuelve con una sola inferencia
+    clusters, textos = agrupar(registros, indice)
+    with etapa("sentimiento", filas=len(textos)):
+        sentimientos_results = cache.analizar(textos, motor)
+    return armar_resultados(registros, sentimientos_results, clusters)
+
+
+def etapas_tuberia(cache, motor, indice=None):
+    """Etapas de procesar(): duplicados, cache + tokenizacion, modelo y habilidades, cada una en su hilo.
+
+    Lo que pasa de una a otra es el bloque mas lo que se lleva calculado.
+    """
+    def agrupar_duplicados(bloque):
+        clusters, textos = agrupar(bloque, indice)
+        return bloque, clusters, textos, indice.nuevos() if indice is not None else None
+
+    # si la tokenizacion o el modelo fallan, la consulta se libera: sus textos dejan de estar
+    # en vuelo y los bloques que los esperaban los infieren al completar (ver utils/cache_sentimiento.py)
+    def consultar(paquete):
+        bloque, clusters, textos, delta = paquete
+        consulta = cache.consultar(textos)
+        pendientes = list(consulta.pendientes.values())
+        try:
+            return bloque, clusters, delta, consulta, pendientes, motor.preparar(pendientes)
+        except BaseException:
+            cache.liberar(consulta)
+            raise
+
+    def inferir(paquete):
+        bloque, clusters, delta, consulta, pendientes, lotes = paquete
+        try:
+            return bloque, clusters, delta, consulta, motor.inferir(pendientes, lotes)
+        except BaseException:
+            cache.liberar(consulta)
+            raise
+
+    def etiquetar(paquete):
+        bloque, clusters, delta, consulta, nuevos = paquete
+        try:
+            resultados = cache.completar(consulta, nuevos, motor)
+        except BaseException:
+            cache.liberar(consulta)
+            raise
+        return bloque, delta, armar_resultados(bloque, resultados, clusters)
+
+    return [("agrupar_duplicados", agrupar_duplicados), ("consulta_cache", consultar),
+            ("modelo", inferir), ("etiquetado", etiquetar)]
+
+
+def procesar(trabajo, cache, motor, shard=None, limite=None, directorio=DIRECTORIO_COMENTARIOS,
+             duplicados=AGRUPAR_DUPLICADOS):
+    """Procesa los registros pendientes del trabajo; cada bloque terminado queda en el checkpoint.
+
+    Lectura, duplicados, cache + tokenizacion, modelo y habilidades corren en hilos conectados por
+    colas acotadas (ver utils/tuberia.py); la escritura y el checkpoint quedan en este
+    hilo, en el orden de los bloques.
+    """
+    # los exports se leen en streaming (ver utils/ingesta.py) y los registros ya
+    # procesados solo se leen y descartan, sin pasar por el modelo
+    registros = seleccionar(iterar_registros(directorio), shard, limite, saltar=trabajo.registros)
+    bloques = en_bloques(registros, TAMANO_BLOQUE)
+    indice = None
+    if duplicados:
+        # al reanudar, el indice se rearma con lo que agregó cada bloque ya guardado
+        indice = IndiceDuplicados()
+        for delta in trabajo.deltas_duplicados():
+            indice.cargar(delta)
+    etapas = etapas_tuberia(cache, motor, indice)
+    with motor, tqdm(unit=" comentarios", desc="procesando", initial=trabajo.registros) as progreso:
+        for bloque, delta, resultados in tuberia(bloques, etapas, CAPACIDAD_COLAS, "lectura_json"):
+            with etapa("escritura_parquet", filas=len(resultados)):
+                trabajo.guardar_bloque(resultados, len(bloque), delta)
+            progreso.update(len(bloque))
+    # con limite el trabajo queda abierto: se puede seguir corriendolo con un limite mayor
+    if limite is None or trabajo.registros < limite:
+        trabajo.terminar()
+
+
+def fusionar(directorios):
+    """Une los resultados de uno o mas trabajos en DIRECTORIO_RESULTADOS y recalcula los indices.
+
+    La tabla agregada, el indice de frecuencias y el de busqueda del dashboard se arman recorriendo
+    el dataset fusionado por lotes, asi que no hace falta tenerlo entero en memoria.
+    """
+    for aviso in revisar_trabajos(directorios):
+        print(f"aviso: {aviso}")
+    with etapa("fusion"):
+        fusionar_datasets({f"{k}-{os.path.basename(os.path.normpath(d))}": os.path.join(d, "comentarios")
+                           for k, d in enumerate(directorios)}, DIRECTORIO_RESULTADOS)
+
+    agregados = AcumuladorAgregados()
+    indice_palabras = IndiceFrecuencias()
+    busqueda = ConstructorBusqueda()
+    total = 0
+    for filas in iterar_medido("lectura_resultados", iterar_filas(DIRECTORIO_RESULTADOS)):
+        with etapa("agregados", filas=len(filas)):
+            agregados.agregar(filas)
+        with etapa("indice_palabras", filas=len(filas)):
+            indice_palabras.agregar(filas)
+        with etapa("indice_busqueda", filas=len(filas)):
+            busqueda.agregar(filas)
+        total += len(filas)
+    with etapa("guardar_indices"):
+        agregados.guardar(RUTA_AGREGADOS)
+        indice_palabras.guardar(RUTA_FRECUENCIAS)
+        busqueda.indice().guardar(RUTA_BUSQUEDA)
+    print(f"\n se guardaron {total} comentarios procesados en '{DIRECTORIO_RESULTADOS}'.")
+
+
+def argumentos():
+    parser = argparse.ArgumentParser(
+        description="Analiza sentimiento y habilidades de los comentarios por bloques, con checkpoint.",
+        epilog="Para repartir el corpus entre maquinas: correr cada una con --shard i/n y despues "
+               "'--fusionar' con los directorios de todos los trabajos.",
+    )
+    parser.add_argument("--limite", "--limit", type=int, help="procesar como mucho N comentarios en este trabajo")
+    parser.add_argument("--shard", type=parsear_shard, help="i/n: procesar solo uno de cada n comentarios (i desde 1)")
+    parser.add_argument("--trabajo", help=f"directorio del trabajo (por defecto en {DIRECTORIO_TRABAJOS})")
+    parser.add_argument("--reiniciar", action="store_true", help="descartar el checkpoint y empezar de cero")
+    parser.add_argument("--fusionar", nargs="+", metavar="TRABAJO",
+                        help="no procesar: unir los resultados de estos trabajos para el dashboard")
+    return parser.parse_args()
+
+
+def main():
+    args = argumentos()
+    if args.fusionar:
+        fusionar(args.fusionar)
+    else:
+        rutas = archivos_de_comentarios(DIRECTORIO_COMENTARIOS)
+        if not rutas:
+            print(f"error: no se encontraron archivos .json o .jsonl en '{DIRECTORIO_COMENTARIOS}'.")
+            return
+
+        parametros = {
+            "entrada": firma_entrada(rutas),
+            "shard": list(args.shard) if args.shard else None,
+            "tamano_bloque": TAMANO_BLOQUE,
+            "modelo": id_modelo_cache(),
+            "duplicados": AGRUPAR_DUPLICADOS,
+        }
+        directorio = args.trabajo or os.path.join(DIRECTORIO_TRABAJOS, nombre_trabajo(args.shard))
+        try:
+            trabajo = Trabajo(directorio, parametros, reiniciar=args.reiniciar)
+        except ValueError as error:
+            sys.exit(f"error: {error}")
+        if trabajo.reiniciado:
+            print(f"'{directorio}' ya había terminado con otra entrada o configuración: se procesa de nuevo "
+                  "(los comentarios ya analizados salen de la cache)")
+        elif trabajo.registros:
+            print(f"reanudando '{directorio}' desde el comentario {trabajo.registros}")
+
+        cache = CacheSentimiento(RUTA_CACHE, id_modelo_cache())
+        motor = MotorInferencia(DIRECTORIO_MODELO or MODELO_SENTIMIENTO, procesos=PROCESOS_INFERENCIA,
+                                hilos_por_proceso=HILOS_POR_PROCESO, batch_size=BATCH_SIZE,
+                                backend=BACKEND_INFERENCIA)
+        procesar(trabajo, cache, motor, args.shard, args.limite)
+        print(cache.resumen())
+        cache.cerrar()
+
+        # un shard es solo una parte del corpus: se fusiona cuando esten todos
+        if args.shard is None:
+            fusionar([directorio])
+        else:
+            print(f"shard {args.shard[0]}/{args.shard[1]} listo en '{directorio}' ({trabajo.registros} comentarios); "
+                  "fusionar con --fusionar cuando terminen todos")
+
+    # con PERFILADO=1 (ver utils/perfilado.py) se imprime el tiempo por etapa
+    if perfilado.activo():
+        print(perfilado.texto_resumen())
+
+
+if __name__ == "__main__":
+    main()
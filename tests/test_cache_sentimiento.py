@@ -0,0 +1,68 @@
+import pytest
+
+from utils.cache_sentimiento import CacheSentimiento
+
+
+def inferir(textos):
+    return [{"label": "POS" if "bien" in texto else "NEG", "score": 0.9} for texto in textos]
+
+
+def test_analizar_usa_la_cache(tmp_path):
+    cache = CacheSentimiento(str(tmp_path / "cache.sqlite"), "modelo")
+    llamadas = []
+    cache.analizar(["anda bien", "anda mal"], lambda textos: llamadas.append(textos) or inferir(textos))
+    resultados = cache.analizar(["anda  bien", "anda mal", "anda bien"], lambda textos: llamadas.append(textos) or inferir(textos))
+    assert llamadas == [["anda bien", "anda mal"]]
+    assert [r["label"] for r in resultados] == ["POS", "NEG", "POS"]
+    cache.cerrar()
+
+
+def test_diferidos_sobreviven_al_recorte(tmp_path):
+    # max_entradas menor que un lote: completar la primera consulta recorta de SQLite
+    # claves que la segunda todavia espera
+    cache = CacheSentimiento(str(tmp_path / "cache.sqlite"), "modelo", max_entradas=1)
+    textos = ["todo bien", "muy mal", "bien ahi"]
+    primera = cache.consultar(textos)
+    segunda = cache.consultar(textos + ["otro mal"])
+    assert set(segunda.diferidos) == {cache.clave(t) for t in textos}
+
+    cache.completar(primera, inferir(list(primera.pendientes.values())))
+    resultados = cache.completar(segunda, inferir(list(segunda.pendientes.values())))
+    assert [r["label"] for r in resultados] == ["POS", "NEG", "POS", "NEG"]
+    assert not cache._esperando and not cache._fijados
+    cache.cerrar()
+
+
+def test_cuenta_de_filas_sin_count(tmp_path):
+    ruta = str(tmp_path / "cache.sqlite")
+    cache = CacheSentimiento(ruta, "modelo", max_entradas=3)
+    cache.analizar(["a bien", "b mal"], inferir)
+    cache.analizar(["c bien", "d mal", "a bien"], inferir)
+    assert cache._filas == 3 and cache.evictions == 1
+    (total,) = cache.conexion.execute("SELECT COUNT(*) FROM sentimientos").fetchone()
+    assert total == cache._filas
+    cache.cerrar()
+    assert CacheSentimiento(ruta, "modelo")._filas == 3
+
+
+def test_inferencia_fallida_libera_los_textos(tmp_path):
+    cache = CacheSentimiento(str(tmp_path / "cache.sqlite"), "modelo")
+    primera = cache.consultar(["todo bien", "muy mal"])
+    segunda = cache.consultar(["todo bien", "otro mal"])
+    assert list(segunda.diferidos.values()) == ["todo bien"]
+
+    # la inferencia de la primera falla: se libera y la segunda infiere el texto que esperaba
+    cache.liberar(primera)
+    assert not cache._en_vuelo - set(segunda.pendientes)
+    resultados = cache.completar(segunda, inferir(list(segunda.pendientes.values())), inferir)
+    assert [r["label"] for r in resultados] == ["POS", "NEG"]
+    assert not cache._en_vuelo and not cache._esperando and not cache._fijados
+
+    def fallar(textos):
+        raise RuntimeError("modelo caido")
+
+    with pytest.raises(RuntimeError):
+        cache.analizar(["nuevo bien"], fallar)
+    assert not cache._en_vuelo
+    assert [r["label"] for r in cache.analizar(["nuevo bien", "todo bien"], inferir)] == ["POS", "POS"]
+    cache.cerrar()
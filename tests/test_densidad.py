@@ -0,0 +1,29 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils.densidad import densidades, densidades_por
+
+
+def test_cada_densidad_integra_uno():
+    rng = np.random.default_rng(0)
+    grilla, matriz = densidades(rng.normal(size=500), rng.integers(0, 3, size=500))
+    paso = grilla[1] - grilla[0]
+    assert np.allclose(matriz.sum(axis=1) * paso, 1, atol=1e-3)
+
+
+def test_densidades_por_ignora_claves_nulas():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "valor": rng.normal(size=300),
+        "region": rng.choice([1.0, 2.0, np.nan], size=300),
+    })
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        grilla, por_region = densidades_por(df, "valor", "region")
+    assert sorted(por_region) == [1.0, 2.0]
+    # las filas sin region no entran en ninguna curva
+    _, sin_nulos = densidades_por(df.dropna(subset=["region"]), "valor", "region")
+    for region in (1.0, 2.0):
+        assert np.allclose(por_region[region], sin_nulos[region])
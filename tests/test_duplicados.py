@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+import procesar_comentarios
+from utils.almacen import cargar_comentarios
+from utils.cache_sentimiento import CacheSentimiento
+from utils.duplicados import colapsar_duplicados, primeros_por_grupo
+from utils.trabajo import Trabajo
+
+
+def test_colapsar_duplicados():
+    df = pd.DataFrame({"texto": ["a", "b", "a!", "c"], "cluster_id": [7, 8, 7, 9]})
+    colapsado = colapsar_duplicados(df)
+    assert colapsado["texto"].tolist() == ["a", "b", "c"]
+    assert colapsado["repeticiones"].tolist() == [2, 1, 1]
+
+
+def test_colapsar_duplicados_sin_cluster_id():
+    # resultados procesados con AGRUPAR_DUPLICADOS=False: cada fila es su propio grupo
+    df = pd.DataFrame({"texto": ["a", "b", "c"], "cluster_id": [np.nan, 5, np.nan]})
+    colapsado = colapsar_duplicados(df)
+    assert colapsado["texto"].tolist() == ["a", "b", "c"]
+    assert colapsado["repeticiones"].tolist() == [1, 1, 1]
+
+
+def test_primeros_por_grupo():
+    primeras, conteos = primeros_por_grupo(np.array([7, 8, 7, 9, 8, 8]))
+    assert primeras.tolist() == [0, 1, 3]
+    assert conteos.tolist() == [2, 3, 1]
+
+
+def test_primeros_por_grupo_con_nulos():
+    primeras, conteos = primeros_por_grupo(np.array([np.nan, 5, np.nan, 5, 6]))
+    assert primeras.tolist() == [0, 1, 2, 4]
+    assert conteos.tolist() == [1, 2, 1, 1]
+
+
+class MotorFalso:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __call__(self, textos):
+        return self.inferir(textos, None)
+
+    def preparar(self, textos):
+        return None
+
+    def inferir(self, textos, lotes):
+        return [{"label": "POS", "score": 0.9} for _ in textos]
+
+
+def _procesar(directorio, duplicados):
+    trabajo = Trabajo(str(directorio / "trabajo"), {"duplicados": duplicados})
+    cache = CacheSentimiento(str(directorio / "cache.sqlite"), "modelo")
+    procesar_comentarios.procesar(trabajo, cache, MotorFalso(), limite=400, duplicados=duplicados)
+    cache.cerrar()
+    return cargar_comentarios(trabajo.resultados, columnas=["texto", "cluster_id"])
+
+
+def test_explorador_sin_agrupar_duplicados(tmp_path):
+    # AGRUPAR_DUPLICADOS=False deja cluster_id nulo: cada comentario es su propio grupo
+    df = _procesar(tmp_path, duplicados=False)
+    assert len(df) == 400 and df["cluster_id"].isna().all()
+    primeras, conteos = primeros_por_grupo(df["cluster_id"].to_numpy())
+    assert len(primeras) == len(df) and (conteos == 1).all()
+    assert len(colapsar_duplicados(df)) == len(df)
+
+
+def test_explorador_agrupando_duplicados(tmp_path):
+    df = _procesar(tmp_path, duplicados=True)
+    primeras, conteos = primeros_por_grupo(df["cluster_id"].to_numpy())
+    assert conteos.sum() == len(df) and len(primeras) == df["cluster_id"].nunique() < len(df)
+    assert colapsar_duplicados(df)["repeticiones"].tolist() == conteos.tolist()
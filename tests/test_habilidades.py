@@ -0,0 +1,49 @@
+from utils.habilidades import DetectorHabilidades, SIN_CATEGORIA, cognitive_skills, detectar_cognitive_insight
+
+
+def loop_original(texto):
+    texto_lower = texto.lower()
+    for habilidad in cognitive_skills:
+        for sinonimo in habilidad["synonyms"]:
+            if sinonimo in texto_lower:
+                return habilidad["name"]
+    return SIN_CATEGORIA
+
+
+def test_sinonimo_que_es_prefijo_de_otro():
+    detector = DetectorHabilidades(cognitive_skills)
+    assert detector.habilidades("Resolución de problemas nuevos") == [
+        "Razonamiento", "Inteligencia fluida", "Solución de problemas"]
+
+
+def test_sinonimos_anidados_y_solapados():
+    detector = DetectorHabilidades([
+        {"name": "A", "synonyms": ["memoria de trabajo"]},
+        {"name": "B", "synonyms": ["de trabajo duro"]},
+        {"name": "C", "synonyms": ["trabajo"]},
+    ])
+    coincidencias = detector.buscar("Memoria de trabajo duro")
+    assert {(c.habilidad, c.inicio, c.fin) for c in coincidencias} == {("A", 0, 18), ("B", 8, 23), ("C", 11, 18)}
+
+
+def test_subcadena_dentro_de_palabra_como_el_loop_original():
+    # "lógica" aparece dentro de "ideológica": el loop original la contaba
+    assert detectar_cognitive_insight("una postura ideológica") == "Razonamiento"
+
+
+def test_mismo_insight_que_el_loop_original():
+    textos = [
+        "no me acuerdo de nada", "me ayuda a aprender y entender conceptos", "tomar decisiones rápido",
+        "IMAGINACIÓN visual", "hola", "", "pensamiento estratégico y evaluación propia",
+    ]
+    for texto in textos:
+        assert detectar_cognitive_insight(texto) == loop_original(texto)
+
+
+def test_loop_y_regex_coinciden():
+    loop = DetectorHabilidades(cognitive_skills, regex=False)
+    regex = DetectorHabilidades(cognitive_skills, regex=True)
+    textos = ["Resolución de problemas nuevos y memoria de trabajo", "una postura IDEOLÓGICA", "nada", ""]
+    for texto in textos:
+        assert loop.buscar(texto) == regex.buscar(texto)
+        assert loop.habilidades(texto) == regex.habilidades(texto)
@@ -0,0 +1,14 @@
+import numpy as np
+
+from utils.remuestreo import bootstrap_diferencia, cohens_d, prueba_permutacion
+
+
+def test_diferencia_y_d_tienen_el_mismo_signo():
+    rng = np.random.default_rng(1)
+    a, b = rng.normal(10, 1, 200), rng.normal(11, 1, 200)
+    resultado = bootstrap_diferencia(a, b, n_remuestreos=2000)
+    assert resultado["diferencia"] == a.mean() - b.mean() < 0
+    assert resultado["dif_inf"] < resultado["dif_sup"] < 0
+    assert resultado["d"] == cohens_d(a, b) < 0
+    assert resultado["d_inf"] < resultado["d_sup"] < 0
+    assert prueba_permutacion(a, b, n_remuestreos=2000) < 0.01
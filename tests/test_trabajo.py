@@ -0,0 +1,69 @@
+import shutil
+
+import pytest
+
+import procesar_comentarios
+from utils.almacen import cargar_comentarios
+from utils.cache_sentimiento import CacheSentimiento
+from utils.ingesta import archivos_de_comentarios
+from utils.trabajo import Trabajo, firma_entrada
+
+
+class MotorContador:
+    """Motor falso que anota cuantos textos llegan al modelo."""
+
+    def __init__(self):
+        self.textos = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __call__(self, textos):
+        return self.inferir(textos, None)
+
+    def preparar(self, textos):
+        return None
+
+    def inferir(self, textos, lotes):
+        self.textos += len(textos)
+        return [{"label": "NEU", "score": 0.5} for _ in textos]
+
+
+def test_no_reanuda_un_trabajo_sin_terminar_con_otra_configuracion(tmp_path):
+    trabajo = Trabajo(str(tmp_path / "trabajo"), {"entrada": [["a.json", 10]]})
+    trabajo.guardar_bloque([], 5)
+    with pytest.raises(ValueError, match="entrada"):
+        Trabajo(str(tmp_path / "trabajo"), {"entrada": [["a.json", 10], ["b.json", 3]]})
+
+
+def _correr(entrada, directorio, cache):
+    parametros = {"entrada": firma_entrada(archivos_de_comentarios(str(entrada))), "duplicados": False}
+    trabajo = Trabajo(str(directorio), parametros)
+    motor = MotorContador()
+    procesar_comentarios.procesar(trabajo, cache, motor, directorio=str(entrada), duplicados=False)
+    return trabajo, motor
+
+
+def test_volver_a_correr_con_un_export_nuevo(tmp_path):
+    exports = archivos_de_comentarios(procesar_comentarios.DIRECTORIO_COMENTARIOS)
+    entrada = tmp_path / "comentarios"
+    entrada.mkdir()
+    shutil.copy(exports[0], entrada)
+    cache = CacheSentimiento(str(tmp_path / "cache.sqlite"), "modelo")
+
+    primero, motor = _correr(entrada, tmp_path / "trabajo", cache)
+    assert primero.estado["terminado"] and not primero.reiniciado
+    anteriores = primero.registros
+
+    # se scrapea otro video y se vuelve a correr sin --reiniciar
+    shutil.copy(exports[1], entrada)
+    segundo, motor = _correr(entrada, tmp_path / "trabajo", cache)
+    assert segundo.reiniciado and segundo.estado["terminado"]
+    assert segundo.registros > anteriores
+    assert len(cargar_comentarios(segundo.resultados, columnas=["texto"])) == segundo.registros
+    # los comentarios del primer export salen de la cache
+    assert motor.textos <= segundo.registros - anteriores
+    cache.cerrar()
@@ -0,0 +1 @@
+# modulos compartidos por el script de procesamiento y las paginas del dashboard
@@ -0,0 +1,123 @@
+import os
+from collections import defaultdict
+
+import pandas as pd
+
+from utils.habilidades import SIN_CATEGORIA
+from utils.registro import ruta_repo
+
+# tabla chica con conteos y suma de score por (video, sentimiento, insight), mas los
+# rollups "Todos"; el dashboard responde metricas y graficos sumando sus filas
+RUTA_AGREGADOS = ruta_repo("data", "resultados", "agregados.parquet")
+TODOS = "Todos"
+CLAVES = ["video", "sentimiento", "insight"]
+
+
+def con_rollups(base):
+    """Agrega a la tabla base las filas "Todos" por sentimiento, por insight y totales.
+
+    Igual que el dashboard, los rollups solo cuentan comentarios con una
+    habilidad detectada (insight distinto de "sin categoría").
+    """
+    categorizados = base[base["insight"] != SIN_CATEGORIA]
+    por_sentimiento = categorizados.groupby(["video", "sentimiento"], as_index=False)[["n", "suma_score"]].sum()
+    por_insight = categorizados.groupby(["video", "insight"], as_index=False)[["n", "suma_score"]].sum()
+    totales = categorizados.groupby("video", as_index=False)[["n", "suma_score"]].sum()
+    tabla = pd.concat([
+        base,
+        por_sentimiento.assign(insight=TODOS),
+        por_insight.assign(sentimiento=TODOS),
+        totales.assign(sentimiento=TODOS, insight=TODOS),
+    ], ignore_index=True)
+    return tabla[CLAVES + ["n", "suma_score"]]
+
+
+class AcumuladorAgregados:
+    """Acumula conteos y sumas de score bloque a bloque durante el procesamiento."""
+
+    def __init__(self):
+        self.conteos = defaultdict(lambda: [0, 0.0])
+
+    def agregar(self, filas):
+        for fila in filas:
+            acumulado = self.conteos[(fila["video"], fila["sentimiento"], fila["insight"])]
+            acumulado[0] += 1
+            acumulado[1] += fila["score"]
+
+    def tabla(self):
+        base = pd.DataFrame(
+            [(*clave, n, suma) for clave, (n, suma) in self.conteos.items()],
+            columns=CLAVES + ["n", "suma_score"],
+        )
+        return con_rollups(base)
+
+    def guardar(self, ruta=RUTA_AGREGADOS):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = ruta + ".tmp"
+        self.tabla().to_parquet(temporal, index=False)
+        os.replace(temporal, ruta)
+
+
+def agregados_desde_df(df):
+    """Calcula la misma tabla a partir de un DataFrame de comentarios ya cargado."""
+    if "video" not in df.columns:
+        df = df.assign(video="")
+    base = (
+        df.groupby(CLAVES, as_index=False, observed=True)
+        .agg(n=("score", "size"), suma_score=("score", "sum"))
+    )
+    for clave in CLAVES:
+        base[clave] = base[clave].astype(str)
+    return con_rollups(base)
+
+
+def cargar_agregados(ruta=RUTA_AGREGADOS):
+    if not os.path.exists(ruta):
+        return None
+    return pd.read_parquet(ruta)
+
+
+class ConsultaAgregados:
+    """Responde las metricas y distribuciones del dashboard con lookups sobre la tabla agregada."""
+
+    def __init__(self, tabla, videos=None):
+        if videos is not None:
+            tabla = tabla[tabla["video"].isin(videos)]
+        # sumar sobre los videos seleccionados deja una fila por (sentimiento, insight)
+        self.tabla = tabla.groupby(["sentimiento", "insight"])[["n", "suma_score"]].sum()
+
+    def sentimientos(self):
+        return [s for s in self.tabla.index.get_level_values("sentimiento").unique() if s != TODOS]
+
+    def insights(self):
+        return sorted(i for i in self.tabla.index.get_level_values("insight").unique() if i not in (TODOS, SIN_CATEGORIA))
+
+    def _fila(self, sentimiento, insight):
+        if (sentimiento, insight) in self.tabla.index:
+            return self.tabla.loc[(sentimiento, insight)]
+        return pd.Series({"n": 0, "suma_score": 0.0})
+
+    def metricas(self, sentimiento=TODOS, insight=TODOS):
+        """Devuelve (comentarios, score promedio, habilidades unicas) para el filtro."""
+        fila = self._fila(sentimiento, insight)
+        n = int(fila["n"])
+        promedio = fila["suma_score"] / n if n else float("nan")
+        habilidades = self.distribucion_insights(sentimiento, insight)
+        return n, promedio, int((habilidades > 0).sum())
+
+    def _conteos(self, nivel, valor):
+        if valor not in self.tabla.index.get_level_values(nivel):
+            return pd.Series(dtype="int64")
+        return self.tabla.xs(valor, level=nivel)["n"]
+
+    def distribucion_sentimientos(self, sentimiento=TODOS, insight=TODOS):
+        conteos = self._conteos("insight", insight).drop(TODOS, errors="ignore")
+        if sentimiento != TODOS:
+            conteos = conteos[conteos.index == sentimiento]
+        return conteos[conteos > 0].sort_values(ascending=False).rename("count")
+
+    def distribucion_insights(self, sentimiento=TODOS, insight=TODOS):
+        conteos = self._conteos("sentimiento", sentimiento).drop([TODOS, SIN_CATEGORIA], errors="ignore")
+        if insight != TODOS:
+            conteos = conteos[conteos.index == insight]
+        return conteos[conteos > 0].sort_values(ascending=False).rename("count")
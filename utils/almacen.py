@@ -0,0 +1,170 @@
+import os
+import shutil
+from urllib.parse import quote, unquote
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.registro import ruta_repo
+
+# resultados del procesamiento: un directorio por video con particion estilo hive (video=<nombre>)
+DIRECTORIO_RESULTADOS = ruta_repo("data", "resultados", "comentarios")
+
+_categoria = pa.dictionary(pa.int8(), pa.string())
+ESQUEMA = pa.schema([
+    ("texto", pa.string()),
+    ("sentimiento", _categoria),
+    ("score", pa.float32()),
+    ("insight", _categoria),
+    ("insights", pa.string()),
+    # grupo de duplicados (ver utils/duplicados.py); todos los del grupo comparten sentimiento
+    ("cluster_id", pa.int64()),
+])
+
+
+def directorio_particion(directorio, video):
+    return os.path.join(directorio, "video=" + quote(video, safe=""))
+
+
+def tabla_desde_filas(filas, esquema=ESQUEMA):
+    columnas = [pa.array([fila[campo.name] for fila in filas], type=campo.type) for campo in esquema]
+    return pa.Table.from_arrays(columnas, schema=esquema)
+
+
+def _por_video(filas):
+    por_video = {}
+    for fila in filas:
+        por_video.setdefault(fila["video"], []).append(fila)
+    return por_video
+
+
+class EscritorParquet:
+    """Escribe los resultados por bloques en un dataset Parquet particionado por video.
+
+    Cada bloque se agrega como row group al archivo de su video. Todo se
+    escribe en un directorio temporal que reemplaza al anterior en cerrar(),
+    asi el dashboard nunca lee un dataset a medio escribir.
+    """
+
+    def __init__(self, directorio=DIRECTORIO_RESULTADOS, esquema=ESQUEMA):
+        self.directorio = directorio
+        self.temporal = directorio.rstrip(os.sep) + ".tmp"
+        self.esquema = esquema
+        self.escritores = {}
+        shutil.rmtree(self.temporal, ignore_errors=True)
+
+    def _escritor(self, video):
+        if video not in self.escritores:
+            particion = directorio_particion(self.temporal, video)
+            os.makedirs(particion, exist_ok=True)
+            self.escritores[video] = pq.ParquetWriter(os.path.join(particion, "part-0.parquet"), self.esquema)
+        return self.escritores[video]
+
+    def escribir(self, filas):
+        for video, filas_video in _por_video(filas).items():
+            self._escritor(video).write_table(tabla_desde_filas(filas_video, self.esquema))
+
+    def cerrar(self):
+        for escritor in self.escritores.values():
+            escritor.close()
+        self.escritores = {}
+        os.makedirs(self.temporal, exist_ok=True)
+        shutil.rmtree(self.directorio, ignore_errors=True)
+        os.replace(self.temporal, self.directorio)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_error, *exc):
+        if tipo_error is None:
+            self.cerrar()
+        else:
+            for escritor in self.escritores.values():
+                escritor.close()
+            shutil.rmtree(self.temporal, ignore_errors=True)
+
+
+def escribir_bloque(directorio, nombre, filas, esquema=ESQUEMA):
+    """Escribe un bloque de resultados como un archivo `nombre`.parquet en la particion de cada video.
+
+    Cada archivo se escribe a un temporal y se renombra: nunca queda uno a medio escribir.
+    """
+    for video, filas_video in _por_video(filas).items():
+        particion = directorio_particion(directorio, video)
+        os.makedirs(particion, exist_ok=True)
+        ruta = os.path.join(particion, nombre + ".parquet")
+        pq.write_table(tabla_desde_filas(filas_video, esquema), ruta + ".tmp")
+        os.replace(ruta + ".tmp", ruta)
+
+
+def archivos_de_bloques(directorio):
+    """(particion, archivo) de todos los .parquet de un dataset particionado."""
+    if not os.path.isdir(directorio):
+        return []
+    return [
+        (particion, archivo)
+        for particion in sorted(os.listdir(directorio)) if particion.startswith("video=")
+        for archivo in sorted(os.listdir(os.path.join(directorio, particion))) if archivo.endswith(".parquet")
+    ]
+
+
+def fusionar_datasets(directorios, destino=DIRECTORIO_RESULTADOS):
+    """Une los datasets particionados de varios trabajos en `destino`, reemplazandolo de una vez.
+
+    `directorios` es {prefijo: directorio}; los archivos se enlazan (o se copian si el
+    sistema de archivos no lo permite) con el prefijo en el nombre para que no choquen.
+    """
+    temporal = destino.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(temporal, ignore_errors=True)
+    os.makedirs(temporal)
+    for prefijo, directorio in directorios.items():
+        for particion, archivo in archivos_de_bloques(directorio):
+            os.makedirs(os.path.join(temporal, particion), exist_ok=True)
+            origen = os.path.join(directorio, particion, archivo)
+            copia = os.path.join(temporal, particion, f"{prefijo}-{archivo}")
+            try:
+                os.link(origen, copia)
+            except OSError:
+                shutil.copy2(origen, copia)
+    shutil.rmtree(destino, ignore_errors=True)
+    os.replace(temporal, destino)
+
+
+def iterar_filas(directorio=DIRECTORIO_RESULTADOS, columnas=None, tamano=10_000):
+    """Recorre el dataset de resultados en listas de hasta `tamano` dicts, sin cargarlo entero."""
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(directorio, format="parquet", partitioning="hive")
+    for lote in dataset.to_batches(columns=columnas, batch_size=tamano):
+        yield lote.to_pylist()
+
+
+def listar_videos(directorio=DIRECTORIO_RESULTADOS):
+    if not os.path.isdir(directorio):
+        return []
+    return sorted(unquote(d[len("video="):]) for d in os.listdir(directorio) if d.startswith("video="))
+
+
+def columnas_disponibles(directorio=DIRECTORIO_RESULTADOS):
+    """Columnas del dataset de resultados (los generados antes pueden no tener todas las de ESQUEMA)."""
+    import pyarrow.dataset as ds
+
+    return ds.dataset(directorio, format="parquet", partitioning="hive").schema.names
+
+
+def cargar_comentarios(directorio=DIRECTORIO_RESULTADOS, columnas=None, videos=None, filtros=None):
+    """Lee solo las columnas y particiones (videos) pedidas del dataset de resultados.
+
+    sentimiento e insight vuelven como columnas categoricas y score como float32.
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(directorio, format="parquet", partitioning="hive")
+    expresion = None
+    if videos is not None:
+        expresion = ds.field("video").isin(list(videos))
+    for columna, operador, valor in filtros or []:
+        condicion = {"==": ds.field(columna) == valor, "!=": ds.field(columna) != valor}[operador]
+        expresion = condicion if expresion is None else expresion & condicion
+    tabla = dataset.to_table(columns=columnas, filter=expresion)
+    return tabla.to_pandas()
@@ -0,0 +1,255 @@
+import math
+import os
+import re
+import shutil
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import ipc
+
+from utils.duplicados import plegar
+from utils.registro import ruta_repo
+
+# indice invertido para buscar en los comentarios: se arma al procesar (ver procesar_comentarios.py)
+# y se guarda junto a los resultados como archivos Arrow que se leen mapeados en memoria.
+# Por cada termino (texto plegado: sin acentos ni mayusculas) guarda los comentarios donde
+# aparece, cuantas veces y en que posiciones, asi las frases no necesitan releer los textos
+RUTA_BUSQUEDA = ruta_repo("data", "resultados", "busqueda")
+ESQUEMA_DOCUMENTO = pa.schema([
+    ("video", pa.string()),
+    ("texto", pa.string()),
+    ("sentimiento", pa.string()),
+    ("score", pa.float32()),
+    ("insight", pa.string()),
+    ("cluster_id", pa.int64()),
+])
+COLUMNAS_DOCUMENTO = ESQUEMA_DOCUMENTO.names
+CATEGORICAS = ["video", "sentimiento", "insight"]
+MAX_RESULTADOS = 1000
+# parametros de BM25
+K1 = 1.2
+B = 0.75
+
+_CONSULTA = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokens(texto):
+    return plegar(texto).split()
+
+
+def parsear_consulta(consulta):
+    """Clausulas unidas por OR; cada una es una lista de terminos o frases (tuplas) que deben estar todos.
+
+    'ia memoria OR "pensamiento critico"' -> [[("ia",), ("memoria",)], [("pensamiento", "critico")]]
+    """
+    clausulas = [[]]
+    for frase, palabra in _CONSULTA.findall(consulta):
+        if palabra == "OR":
+            clausulas.append([])
+            continue
+        partes = tuple(tokens(frase or palabra))
+        if partes:
+            clausulas[-1].append(partes)
+    return [clausula for clausula in clausulas if clausula]
+
+
+def _a_numpy(columna):
+    # las columnas se escriben en un solo bloque y sin nulos: vista sobre el archivo mapeado, sin copia
+    arreglo = columna.chunk(0) if columna.num_chunks == 1 else columna.combine_chunks()
+    return arreglo.to_numpy()
+
+
+def _escribir(tabla, ruta):
+    with pa.OSFile(ruta, "wb") as archivo, ipc.new_file(archivo, tabla.schema) as escritor:
+        escritor.write_table(tabla)
+
+
+def _leer(ruta):
+    with pa.memory_map(ruta, "r") as fuente:
+        return ipc.open_file(fuente).read_all()
+
+
+class ConstructorBusqueda:
+    """Acumula los comentarios por lotes y arma el indice al final.
+
+    Cada lote se convierte en arreglos (termino, comentario, posicion); al
+    terminar se ordenan por termino una sola vez y se cortan en postings.
+    """
+
+    def __init__(self):
+        self.vocabulario = {}
+        self.terminos = []
+        self.largos = []
+        self.documentos = []
+
+    def agregar(self, filas):
+        terminos = []
+        for fila in filas:
+            palabras = tokens(fila["texto"])
+            terminos.extend(self.vocabulario.setdefault(p, len(self.vocabulario)) for p in palabras)
+            self.largos.append(len(palabras))
+        self.terminos.append(np.array(terminos, dtype=np.int32))
+        self.documentos.append(pa.table({
+            columna: [fila.get(columna) for fila in filas] for columna in COLUMNAS_DOCUMENTO
+        }, schema=ESQUEMA_DOCUMENTO))
+
+    def indice(self):
+        largos = np.array(self.largos, dtype=np.int32)
+        terminos = np.concatenate(self.terminos) if self.terminos else np.empty(0, dtype=np.int32)
+        docs = np.repeat(np.arange(len(largos), dtype=np.int32), largos)
+        # posicion dentro del comentario: indice global menos el inicio de su comentario
+        inicios_doc = np.concatenate([[0], np.cumsum(largos)[:-1]]).astype(np.int64)
+        posiciones = (np.arange(len(terminos)) - np.repeat(inicios_doc, largos)).astype(np.int32)
+
+        # ids de termino en orden alfabetico; el orden estable mantiene (comentario, posicion)
+        palabras = np.array(list(self.vocabulario), dtype=object)
+        alfabetico = np.argsort(palabras, kind="stable")
+        rango = np.empty(len(palabras), dtype=np.int32)
+        rango[alfabetico] = np.arange(len(palabras), dtype=np.int32)
+        terminos = rango[terminos]
+        orden = np.argsort(terminos, kind="stable")
+        terminos, docs, posiciones = terminos[orden], docs[orden], posiciones[orden]
+
+        # un posting por (termino, comentario)
+        cortes = np.flatnonzero((terminos[1:] != terminos[:-1]) | (docs[1:] != docs[:-1])) + 1
+        inicio_posiciones = np.concatenate([[0], cortes]).astype(np.int64) if len(terminos) else np.empty(0, np.int64)
+        tf = np.diff(np.append(inicio_posiciones, len(terminos))).astype(np.int32)
+        termino_posting = terminos[inicio_posiciones]
+        inicio_postings = np.searchsorted(termino_posting, np.arange(len(palabras) + 1)).astype(np.int64)
+
+        documentos = pa.concat_tables(self.documentos or [ESQUEMA_DOCUMENTO.empty_table()]).combine_chunks()
+        for columna in CATEGORICAS:
+            i = documentos.schema.get_field_index(columna)
+            documentos = documentos.set_column(i, columna, pc.dictionary_encode(documentos.column(columna)))
+        documentos = documentos.append_column("largo", pa.array(largos))
+
+        return IndiceBusqueda(
+            pa.table({"termino": pa.array(palabras[alfabetico], type=pa.string()), "inicio": inicio_postings[:-1],
+                      "fin": inicio_postings[1:]}),
+            pa.table({"doc": docs[inicio_posiciones], "tf": tf, "inicio": inicio_posiciones}),
+            pa.table({"posicion": posiciones}),
+            documentos,
+        )
+
+
+class IndiceBusqueda:
+    """Busqueda por palabras y frases con ranking BM25 sobre el indice invertido.
+
+    Sintaxis: las palabras separadas por espacios deben estar todas (Y); OR en
+    mayusculas separa alternativas; "entre comillas" busca la frase exacta. Los
+    acentos, mayusculas y la puntuacion no importan.
+    """
+
+    def __init__(self, terminos, postings, posiciones, documentos):
+        self.tablas = {"terminos": terminos, "postings": postings, "posiciones": posiciones, "documentos": documentos}
+        self.vocabulario = {t: i for i, t in enumerate(terminos.column("termino").to_pylist())}
+        self.inicio = _a_numpy(terminos.column("inicio"))
+        self.fin = _a_numpy(terminos.column("fin"))
+        self.doc = _a_numpy(postings.column("doc"))
+        self.tf = _a_numpy(postings.column("tf"))
+        self.inicio_posiciones = np.append(_a_numpy(postings.column("inicio")), len(posiciones))
+        self.posiciones = _a_numpy(posiciones.column("posicion"))
+        self.documentos = documentos
+        self.largos = _a_numpy(documentos.column("largo")).astype(np.float64)
+        self.largo_medio = self.largos.mean() if len(self.largos) else 0.0
+
+    def __len__(self):
+        return self.documentos.num_rows
+
+    @classmethod
+    def cargar(cls, ruta=RUTA_BUSQUEDA):
+        if not os.path.exists(os.path.join(ruta, "documentos.arrow")):
+            return None
+        return cls(*(_leer(os.path.join(ruta, f"{nombre}.arrow"))
+                     for nombre in ("terminos", "postings", "posiciones", "documentos")))
+
+    def guardar(self, ruta=RUTA_BUSQUEDA):
+        temporal = ruta.rstrip(os.sep) + ".tmp"
+        shutil.rmtree(temporal, ignore_errors=True)
+        os.makedirs(temporal)
+        for nombre, tabla in self.tablas.items():
+            _escribir(tabla, os.path.join(temporal, f"{nombre}.arrow"))
+        shutil.rmtree(ruta, ignore_errors=True)
+        os.replace(temporal, ruta)
+
+    def _postings(self, termino):
+        i = self.vocabulario[termino]
+        return slice(self.inicio[i], self.fin[i])
+
+    def _frase(self, frase, candidatos):
+        """Comentarios de `candidatos` donde los terminos de la frase aparecen seguidos."""
+        claves = None
+        for desplazamiento, termino in enumerate(frase):
+            rango = self._postings(termino)
+            docs = self.doc[rango]
+            posiciones = self.posiciones[self.inicio_posiciones[rango.start]:self.inicio_posiciones[rango.stop]]
+            doc_por_posicion = np.repeat(docs, self.tf[rango]).astype(np.int64)
+            dentro = np.isin(doc_por_posicion, candidatos)
+            # (comentario, posicion donde empezaria la frase) en un solo entero
+            actuales = (doc_por_posicion[dentro] << 32) | (posiciones[dentro].astype(np.int64) - desplazamiento)
+            claves = actuales if claves is None else np.intersect1d(claves, actuales)
+        return np.unique(claves >> 32).astype(np.int32)
+
+    def _bm25(self, termino, docs):
+        rango = self._postings(termino)
+        n_docs = rango.stop - rango.start
+        idf = math.log(1 + (len(self) - n_docs + 0.5) / (n_docs + 0.5))
+        tf = self.tf[rango][np.searchsorted(self.doc[rango], docs)].astype(np.float64)
+        return idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * self.largos[docs] / self.largo_medio))
+
+    def _clausula(self, partes):
+        terminos = {t for parte in partes for t in parte}
+        if not terminos or any(t not in self.vocabulario for t in terminos):
+            return np.empty(0, dtype=np.int32), np.empty(0)
+        # interseccion empezando por el termino menos frecuente
+        docs = None
+        for termino in sorted(terminos, key=lambda t: self.fin[self.vocabulario[t]] - self.inicio[self.vocabulario[t]]):
+            actuales = self.doc[self._postings(termino)]
+            docs = actuales if docs is None else np.intersect1d(docs, actuales, assume_unique=True)
+        for frase in partes:
+            if len(frase) > 1 and len(docs):
+                docs = self._frase(frase, docs)
+        return docs, sum(self._bm25(t, docs) for t in terminos)
+
+    def _mascara_filtros(self, docs, filtros):
+        mascara = np.ones(len(docs), dtype=bool)
+        for columna, valores in (filtros or {}).items():
+            diccionario = self.documentos.column(columna).chunk(0)
+            permitidos = np.flatnonzero(np.isin(diccionario.dictionary.to_numpy(zero_copy_only=False), list(valores)))
+            mascara &= np.isin(diccionario.indices.to_numpy(zero_copy_only=False)[docs], permitidos)
+        return mascara
+
+    def buscar(self, consulta, k=MAX_RESULTADOS, filtros=None):
+        """(DataFrame con los k comentarios mas relevantes y su "relevancia", total de coincidencias).
+
+        `filtros` es {columna: valores permitidos} para video, sentimiento o insight.
+        """
+        resultados = [self._clausula(partes) for partes in parsear_consulta(consulta)]
+        if resultados:
+            # OR: union de las clausulas; la relevancia se suma
+            docs, inverso = np.unique(np.concatenate([d for d, _ in resultados]), return_inverse=True)
+            relevancia = np.bincount(inverso, weights=np.concatenate([s for _, s in resultados]), minlength=len(docs))
+        else:
+            docs, relevancia = np.empty(0, dtype=np.int32), np.empty(0)
+        mascara = self._mascara_filtros(docs, filtros)
+        docs, relevancia = docs[mascara], relevancia[mascara]
+
+        if len(docs) > k:
+            mejores = np.argpartition(-relevancia, k)[:k]
+            docs, relevancia = docs[mejores], relevancia[mejores]
+        orden = np.lexsort((docs, -relevancia))
+        tabla = self.documentos.take(pa.array(docs[orden])).drop_columns(["largo"]).to_pandas()
+        tabla.insert(0, "relevancia", relevancia[orden].round(3))
+        if self.documentos.column("cluster_id").null_count == len(self):
+            tabla = tabla.drop(columns="cluster_id")
+        return tabla, int(mascara.sum())
+
+
+def indice_desde_df(df):
+    """Indice armado en memoria a partir de un DataFrame de comentarios ya cargado."""
+    constructor = ConstructorBusqueda()
+    columnas = [c for c in COLUMNAS_DOCUMENTO if c in df.columns]
+    filas = df[columnas].astype({c: str for c in CATEGORICAS if c in columnas}).to_dict("records")
+    constructor.agregar(filas)
+    return constructor.indice()
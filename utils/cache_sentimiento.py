@@ -0,0 +1,205 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import Counter, namedtuple
+
+# sqlite limita la cantidad de parametros por consulta, asi que buscamos por bloques
+TAMANO_BLOQUE = 500
+
+
+def normalizar_texto(texto):
+    texto = unicodedata.normalize("NFC", texto)
+    return re.sub(r"\s+", " ", texto).strip()
+
+
+# resultado de consultar(): claves de cada texto, resultados ya guardados, textos que faltan
+# y claves (con su texto) que ya van camino al modelo en una consulta anterior sin completar
+Consulta = namedtuple("Consulta", ["claves", "encontrados", "pendientes", "diferidos"])
+
+
+class CacheSentimiento:
+    """Cache persistente (SQLite) de resultados del modelo de sentimiento.
+
+    La clave es el sha256 del id del modelo mas el texto normalizado, asi que
+    cambiar de modelo invalida la cache sin borrarla. Cuando se supera
+    max_entradas se eliminan las entradas usadas hace mas tiempo (LRU).
+
+    Se puede usar desde varios hilos (p. ej. consultar en una etapa de la
+    tuberia y completar en otra): las operaciones sobre SQLite van con candado.
+    Un texto que ya esta pendiente en una consulta sin completar no se vuelve a
+    pedir: su resultado queda fijado en memoria (aunque el LRU lo saque de
+    SQLite) hasta que se completan las consultas que lo esperan, lo que debe
+    hacerse en el mismo orden que las consultas. Si la inferencia de una
+    consulta falla hay que liberarla (liberar()); las que esperaban sus textos
+    los infieren al completar.
+    """
+
+    def __init__(self, ruta, modelo, max_entradas=500_000):
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        self.modelo = modelo
+        self.max_entradas = max_entradas
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._candado = threading.Lock()
+        self._en_vuelo = set()
+        # claves diferidas: cuantas consultas esperan cada una y su resultado ya calculado
+        # (None si la consulta que la tenia pendiente fallo)
+        self._esperando = Counter()
+        self._fijados = {}
+        self.conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self.conexion.execute(
+            "CREATE TABLE IF NOT EXISTS sentimientos ("
+            "clave TEXT PRIMARY KEY, label TEXT NOT NULL, score REAL NOT NULL, usado REAL NOT NULL)"
+        )
+        self.conexion.execute("CREATE INDEX IF NOT EXISTS idx_usado ON sentimientos (usado)")
+        self.conexion.commit()
+        # filas en la tabla, llevadas a mano para no hacer un COUNT(*) (recorre la tabla) por bloque
+        (self._filas,) = self.conexion.execute("SELECT COUNT(*) FROM sentimientos").fetchone()
+
+    def clave(self, texto):
+        contenido = self.modelo + "\0" + normalizar_texto(texto)
+        return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+    def _buscar(self, claves):
+        encontrados = {}
+        for i in range(0, len(claves), TAMANO_BLOQUE):
+            bloque = claves[i:i + TAMANO_BLOQUE]
+            marcas = ",".join("?" * len(bloque))
+            filas = self.conexion.execute(
+                f"SELECT clave, label, score FROM sentimientos WHERE clave IN ({marcas})", bloque
+            )
+            for clave, label, score in filas:
+                encontrados[clave] = {"label": label, "score": score}
+        return encontrados
+
+    def _guardar(self, filas):
+        self.conexion.executemany(
+            "INSERT OR REPLACE INTO sentimientos (clave, label, score, usado) VALUES (?, ?, ?, ?)", filas
+        )
+        # son claves que no estaban al consultar y nadie mas tenia en vuelo: todas filas nuevas
+        self._filas += len(filas)
+
+    def _tocar(self, claves, ahora):
+        self.conexion.executemany("UPDATE sentimientos SET usado = ? WHERE clave = ?", [(ahora, c) for c in claves])
+
+    def _recortar(self):
+        sobrantes = self._filas - self.max_entradas
+        if sobrantes > 0:
+            eliminadas = self.conexion.execute(
+                "DELETE FROM sentimientos WHERE clave IN "
+                "(SELECT clave FROM sentimientos ORDER BY usado ASC LIMIT ?)", (sobrantes,)
+            ).rowcount
+            self._filas -= eliminadas
+            self.evictions += eliminadas
+
+    def consultar(self, textos):
+        """Busca los textos en la cache; los que faltan (deduplicados) quedan en Consulta.pendientes."""
+        claves = [self.clave(t) for t in textos]
+        with self._candado:
+            encontrados = self._buscar(list(set(claves)))
+            pendientes = {}
+            diferidos = {}
+            for clave, texto in zip(claves, textos):
+                if clave in encontrados:
+                    continue
+                if clave in self._en_vuelo:
+                    diferidos.setdefault(clave, texto)
+                else:
+                    pendientes.setdefault(clave, texto)
+            self._en_vuelo.update(pendientes)
+            self._esperando.update(diferidos.keys())
+            # los textos repetidos dentro de la misma corrida cuentan como hits: no llegan al modelo
+            self.misses += len(pendientes)
+            self.hits += len(textos) - len(pendientes)
+        return Consulta(claves, encontrados, pendientes, diferidos)
+
+    def _soltar_diferidos(self, diferidos):
+        for clave in diferidos:
+            self._esperando[clave] -= 1
+            if not self._esperando[clave]:
+                del self._esperando[clave]
+                self._fijados.pop(clave, None)
+
+    def liberar(self, consulta):
+        """Descarta una consulta cuya inferencia fallo, sin guardar nada.
+
+        Sus pendientes dejan de estar en vuelo; las consultas posteriores que
+        los esperaban los infieren en su completar().
+        """
+        with self._candado:
+            self._en_vuelo.difference_update(consulta.pendientes)
+            for clave in consulta.pendientes:
+                if self._esperando[clave]:
+                    self._fijados[clave] = None
+            self._soltar_diferidos(consulta.diferidos)
+
+    def completar(self, consulta, nuevos, inferir=None):
+        """Guarda los resultados de los pendientes y devuelve un resultado por texto, en orden.
+
+        `inferir` solo se usa para los diferidos cuya consulta original fallo
+        (ver liberar()); si hace falta y no se pasa es un error.
+        """
+        claves, encontrados, pendientes, diferidos = consulta
+        with self._candado:
+            # los diferidos los resolvio el completar de una consulta anterior; no se leen de
+            # SQLite porque _recortar puede haberlos eliminado si max_entradas es chico
+            resueltos = {clave: self._fijados.get(clave) for clave in diferidos}
+        huerfanos = {clave: diferidos[clave] for clave, resultado in resueltos.items() if resultado is None}
+        if huerfanos:
+            if inferir is None:
+                raise ValueError(f"{len(huerfanos)} textos diferidos quedaron sin resultado (su consulta falló) "
+                                 "y completar() no recibió con qué inferirlos")
+            # si esto falla no se toco ningun estado: quien llama puede liberar() la consulta
+            nuevos = list(nuevos) + list(inferir(list(huerfanos.values())))
+            pendientes = {**pendientes, **huerfanos}
+
+        ahora = time.time()
+        filas = []
+        for clave, resultado in zip(pendientes, nuevos):
+            encontrados[clave] = {"label": resultado["label"], "score": float(resultado["score"])}
+            filas.append((clave, resultado["label"], float(resultado["score"]), ahora))
+        encontrados.update((clave, resultado) for clave, resultado in resueltos.items() if resultado is not None)
+
+        with self._candado:
+            if filas:
+                self._guardar(filas)
+            self._en_vuelo.difference_update(pendientes)
+            for clave in pendientes:
+                if self._esperando[clave] and self._fijados.get(clave) is None:
+                    self._fijados[clave] = encontrados[clave]
+            self._soltar_diferidos(diferidos)
+            self._tocar([c for c in encontrados if c not in pendientes], ahora)
+            self._recortar()
+            self.conexion.commit()
+        return [encontrados[c] for c in claves]
+
+    def analizar(self, textos, inferir):
+        """Devuelve un resultado {'label', 'score'} por texto, en el mismo orden.
+
+        Solo los textos que no estan en la cache (deduplicados) se envian a
+        inferir(lista_de_textos), que debe devolver una lista de resultados
+        con la forma del pipeline de transformers.
+        """
+        consulta = self.consultar(textos)
+        try:
+            nuevos = inferir(list(consulta.pendientes.values())) if consulta.pendientes else []
+            return self.completar(consulta, nuevos, inferir)
+        except BaseException:
+            self.liberar(consulta)
+            raise
+
+    def resumen(self):
+        total = self.hits + self.misses
+        tasa = self.hits / total * 100 if total else 0.0
+        return f"cache de sentimiento: {self.hits} hits, {self.misses} misses ({tasa:.1f}% hits), {self.evictions} eliminadas"
+
+    def cerrar(self):
+        with self._candado:
+            self.conexion.close()
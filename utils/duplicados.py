@@ -0,0 +1,218 @@
+import hashlib
+import re
+import unicodedata
+
+import numpy as np
+import pyarrow as pa
+
+# comentarios repetidos o casi iguales (respuestas copiadas, variantes de "gracias", el mismo
+# video scrapeado dos veces) se agrupan antes del modelo: solo el representante de cada grupo
+# se analiza y los demas heredan su etiqueta. Primero igualdad exacta del texto plegado
+# (sin acentos, mayusculas ni puntuacion); los textos largos ademas se comparan con
+# MinHash/LSH sobre shingles de caracteres
+K_SHINGLE = 5
+N_PERMUTACIONES = 64
+BANDAS = 16  # 16 bandas de 4 filas: casi seguro que un par con Jaccard >= 0.85 es candidato
+UMBRAL_JACCARD = 0.85
+# en textos cortos una palabra cambia el sentido ("me gusta" / "no me gusta"): solo exactos
+MIN_CARACTERES_LSH = 30
+# elementos (shingles x permutaciones) por paso del calculo vectorizado de firmas
+MAX_ELEMENTOS_BLOQUE = 4_000_000
+SEMILLA = 0
+
+_PRIMO = (1 << 31) - 1
+_NO_ALFANUMERICO = re.compile(r"[\W_]+")
+
+ESQUEMA_DELTA = pa.schema([
+    ("hash", pa.int64()),
+    ("cluster_id", pa.int64()),
+    ("texto", pa.string()),
+    ("firma", pa.list_(pa.uint32())),
+])
+
+
+def plegar(texto):
+    """Texto sin acentos, en minusculas y con la puntuacion como un espacio."""
+    texto = unicodedata.normalize("NFKD", texto)
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).casefold()
+    plegado = _NO_ALFANUMERICO.sub(" ", texto).strip()
+    # solo emojis o simbolos: se comparan tal cual, si no todos quedarian en el mismo grupo
+    return plegado or " ".join(texto.split())
+
+
+def hash_texto(plegado):
+    return int.from_bytes(hashlib.blake2b(plegado.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+
+def _permutaciones(semilla=SEMILLA):
+    rng = np.random.default_rng(semilla)
+    a = rng.integers(1, _PRIMO, size=N_PERMUTACIONES, dtype=np.uint64)
+    b = rng.integers(0, _PRIMO, size=N_PERMUTACIONES, dtype=np.uint64)
+    return a[:, None], b[:, None]
+
+
+def _hashes_shingles(textos):
+    """Hash de cada shingle de K_SHINGLE caracteres de todos los textos, y el inicio de cada texto.
+
+    Los textos se concatenan como codigos unicode y el hash polinomial de cada
+    ventana se calcula vectorizado; las ventanas que cruzan dos textos se descartan.
+    """
+    codigos = [np.frombuffer(t.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64) for t in textos]
+    largos = np.array([len(c) for c in codigos])
+    todos = np.concatenate(codigos)
+    n_ventanas = len(todos) - K_SHINGLE + 1
+    h = np.zeros(n_ventanas, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for j in range(K_SHINGLE):
+            h = h * np.uint64(1_000_003) + todos[j:j + n_ventanas]
+        # mezcla para repartir los bits altos (las ventanas parecidas difieren en pocos bits)
+        h ^= h >> np.uint64(29)
+        h *= np.uint64(0xBF58476D1CE4E5B9)
+        h ^= h >> np.uint64(32)
+    inicios = np.concatenate([[0], np.cumsum(largos)[:-1]])
+    validas = np.concatenate([np.arange(i, i + n - K_SHINGLE + 1) for i, n in zip(inicios, largos)])
+    por_texto = largos - K_SHINGLE + 1
+    return h[validas] % np.uint64(_PRIMO), np.concatenate([[0], np.cumsum(por_texto)[:-1]])
+
+
+def firmas_minhash(textos, permutaciones=None):
+    """Firma MinHash (N_PERMUTACIONES enteros uint32) de cada texto; todos deben tener >= K_SHINGLE caracteres.
+
+    Se calcula con un minimo por segmentos (np.minimum.reduceat) sobre grupos
+    de textos que no pasan de MAX_ELEMENTOS_BLOQUE valores intermedios.
+    """
+    a, b = permutaciones or _permutaciones()
+    firmas = np.empty((len(textos), N_PERMUTACIONES), dtype=np.uint32)
+    por_grupo = max(1, MAX_ELEMENTOS_BLOQUE // N_PERMUTACIONES)
+    i = 0
+    while i < len(textos):
+        # grupo de textos cuyos shingles entran en el limite (al menos uno)
+        total, j = 0, i
+        while j < len(textos) and (j == i or total + len(textos[j]) <= por_grupo):
+            total += len(textos[j])
+            j += 1
+        hashes, inicios = _hashes_shingles(textos[i:j])
+        valores = (a * hashes[None, :] + b) % np.uint64(_PRIMO)
+        firmas[i:j] = np.minimum.reduceat(valores, inicios, axis=1).T
+        i = j
+    return firmas
+
+
+class IndiceDuplicados:
+    """Asigna un cluster_id a cada texto y el texto representante que va al modelo.
+
+    El cluster_id es el hash del texto plegado del representante (el primero que
+    aparecio del grupo). Los representantes largos se guardan en un indice LSH
+    por bandas; un texto nuevo se une al candidato con mayor Jaccard estimado si
+    pasa UMBRAL_JACCARD. El indice vive mientras dura el trabajo y se reconstruye
+    al reanudar a partir de los deltas que devuelve nuevos().
+    """
+
+    def __init__(self):
+        self.permutaciones = _permutaciones()
+        self.exactos = {}
+        self.representantes = {}
+        self.firmas = []
+        self.ids_firmas = []
+        self.bandas = {}
+        self._delta = []
+
+    def _agregar_firma(self, cluster_id, firma):
+        posicion = len(self.firmas)
+        self.firmas.append(firma)
+        self.ids_firmas.append(cluster_id)
+        filas = N_PERMUTACIONES // BANDAS
+        for banda in range(BANDAS):
+            self.bandas.setdefault((banda, firma[banda * filas:(banda + 1) * filas].tobytes()), []).append(posicion)
+
+    def _buscar(self, firma):
+        filas = N_PERMUTACIONES // BANDAS
+        candidatos = set()
+        for banda in range(BANDAS):
+            candidatos.update(self.bandas.get((banda, firma[banda * filas:(banda + 1) * filas].tobytes()), ()))
+        mejor, similitud = None, UMBRAL_JACCARD
+        for posicion in candidatos:
+            estimada = np.count_nonzero(self.firmas[posicion] == firma) / N_PERMUTACIONES
+            if estimada >= similitud:
+                mejor, similitud = self.ids_firmas[posicion], estimada
+        return mejor
+
+    def agrupar(self, textos):
+        """Lista de (cluster_id, texto representante) por texto, en orden."""
+        plegados = [plegar(t) for t in textos]
+        hashes = [hash_texto(p) for p in plegados]
+        # firmas solo de los textos largos que no tienen un igual exacto ya conocido
+        unicos = {}
+        for i, (plegado, h) in enumerate(zip(plegados, hashes)):
+            if h not in self.exactos and len(plegado) >= MIN_CARACTERES_LSH:
+                unicos.setdefault(h, i)
+        firmas = dict(zip(unicos, firmas_minhash([plegados[i] for i in unicos.values()], self.permutaciones)))
+
+        resultado = []
+        for texto, plegado, h in zip(textos, plegados, hashes):
+            cluster_id = self.exactos.get(h)
+            if cluster_id is None:
+                firma = firmas.get(h)
+                cluster_id = self._buscar(firma) if firma is not None else None
+                nuevo = cluster_id is None
+                if nuevo:
+                    cluster_id = h
+                    self.representantes[cluster_id] = texto
+                    if firma is not None:
+                        self._agregar_firma(cluster_id, firma)
+                self.exactos[h] = cluster_id
+                self._delta.append((h, cluster_id, texto if nuevo else None,
+                                    firma if nuevo and firma is not None else None))
+            resultado.append((cluster_id, self.representantes[cluster_id]))
+        return resultado
+
+    def nuevos(self):
+        """Tabla Arrow con lo agregado desde la llamada anterior (para persistir por bloque)."""
+        delta, self._delta = self._delta, []
+        return pa.table({
+            "hash": [d[0] for d in delta],
+            "cluster_id": [d[1] for d in delta],
+            "texto": [d[2] for d in delta],
+            "firma": [None if d[3] is None else d[3].tolist() for d in delta],
+        }, schema=ESQUEMA_DELTA)
+
+    def cargar(self, tabla):
+        """Aplica un delta guardado con nuevos()."""
+        firmas = tabla.column("firma").to_pylist()
+        for h, cluster_id, texto, firma in zip(tabla.column("hash").to_pylist(), tabla.column("cluster_id").to_pylist(),
+                                               tabla.column("texto").to_pylist(), firmas):
+            self.exactos[h] = cluster_id
+            if texto is not None:
+                self.representantes[cluster_id] = texto
+            if firma is not None:
+                self._agregar_firma(cluster_id, np.array(firma, dtype=np.uint32))
+
+
+def colapsar_duplicados(df):
+    """Una fila por cluster_id (la primera) con la cantidad de comentarios del grupo en "repeticiones".
+
+    Las filas sin cluster_id (procesadas con AGRUPAR_DUPLICADOS=False) quedan
+    cada una como su propio grupo.
+    """
+    nulos = df["cluster_id"].isna().to_numpy()
+    # (cluster_id, posicion): la posicion solo distingue a las filas sin cluster_id
+    grupos = df.groupby([df["cluster_id"].fillna(0).to_numpy(), np.where(nulos, np.arange(len(df)), -1)], sort=False)
+    colapsado = grupos.head(1).drop(columns="cluster_id")
+    return colapsado.assign(repeticiones=grupos.size().to_numpy())
+
+
+def primeros_por_grupo(cluster_ids):
+    """(indice de la primera fila de cada cluster_id, tamaño de su grupo), en el orden en que aparecen.
+
+    Lo mismo que colapsar_duplicados pero sobre un arreglo, sin copiar el DataFrame;
+    igual que alli, cada fila sin cluster_id (NaN) es su propio grupo.
+    """
+    cluster_ids = np.asarray(cluster_ids)
+    nulos = np.isnan(cluster_ids) if cluster_ids.dtype.kind == "f" else np.zeros(len(cluster_ids), dtype=bool)
+    # np.unique junta todos los NaN en un solo grupo: solo se agrupan las filas con cluster_id
+    validas, sueltas = np.flatnonzero(~nulos), np.flatnonzero(nulos)
+    _, primeras, conteos = np.unique(cluster_ids[validas], return_index=True, return_counts=True)
+    primeras = np.concatenate([validas[primeras], sueltas])
+    conteos = np.concatenate([conteos, np.ones(len(sueltas), dtype=conteos.dtype)])
+    orden = np.argsort(primeras)
+    return primeras[orden], conteos[orden]
@@ -0,0 +1,374 @@
+import json
+import math
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from utils.duplicados import hash_texto, plegar
+from utils.habilidades import SIN_CATEGORIA, cognitive_skills
+from utils.perfilado import etapa
+from utils.registro import ruta_repo
+
+# embeddings de oraciones de todos los comentarios (ver calcular_embeddings.py): una matriz
+# float16 normalizada en disco que se lee mapeada en memoria, mas un indice de vecinos
+# para "comentarios similares" y los centroides de las habilidades para etiquetarlas por
+# significado y no solo por sinonimo. Un vector por grupo de duplicados (cluster_id)
+RUTA_EMBEDDINGS = ruta_repo("data", "resultados", "embeddings")
+ARCHIVO_META = "meta.json"
+MODELO_EMBEDDINGS = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+# textos por llamada al modelo al construir (la matriz se escribe por partes)
+TAMANO_LOTE = 4096
+
+# busqueda exacta: filas por producto de matrices (float16 -> float32 de a un bloque)
+BLOQUE_FILAS = 32_768
+# por encima de esto buscar() usa el modo aproximado (si el indice tiene listas)
+MAX_FILAS_EXACTA = 50_000
+# modo aproximado (IVF): k-means esferico que reparte las filas en listas; cada consulta
+# recorre solo las SONDAS listas con el centroide mas parecido
+MIN_FILAS_LISTAS = 20_000
+SONDAS = 24
+ITERACIONES_KMEANS = 10
+MUESTRA_POR_LISTA = 32
+
+# etiquetado por centroides: una habilidad se asigna si la similitud coseno con su
+# centroide pasa el umbral; como mucho MAX_HABILIDADES por comentario
+UMBRAL_HABILIDAD = 0.45
+MAX_HABILIDADES = 3
+# comentarios etiquetados por sinonimo que hacen falta para refinar el centroide de una habilidad
+MIN_EJEMPLOS = 5
+
+COLUMNAS_RESULTADOS = ["video", "texto", "sentimiento", "insight", "insights", "cluster_id"]
+
+
+def normalizar(matriz):
+    normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+    return matriz / np.maximum(normas, 1e-12)
+
+
+class CodificadorTextos:
+    """Embeddings de oraciones en CPU: promedio de los vectores de los tokens, normalizado.
+
+    Al estar normalizados, la similitud coseno es el producto punto. Los textos
+    se agrupan en lotes de largo parecido como en MotorInferencia.
+    """
+
+    def __init__(self, modelo=MODELO_EMBEDDINGS, hilos=None, batch_size=64):
+        self.modelo = modelo
+        self.hilos = hilos or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self._tokenizer = None
+        self._modelo = None
+
+    def _cargar(self):
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        torch.set_num_threads(self.hilos)
+        with etapa("carga_modelo_embeddings"):
+            self._tokenizer = AutoTokenizer.from_pretrained(self.modelo)
+            self._modelo = AutoModel.from_pretrained(self.modelo).eval()
+
+    def __call__(self, textos):
+        import torch
+
+        # utils.inferencia trae multiprocessing: solo hace falta al codificar, no en el dashboard
+        from utils.inferencia import lotes_por_longitud
+
+        if self._modelo is None:
+            self._cargar()
+        salida = np.empty((len(textos), self._modelo.config.hidden_size), dtype=np.float32)
+        if not textos:
+            return salida
+        longitudes = [len(ids) for ids in self._tokenizer(textos, truncation=True)["input_ids"]]
+        with etapa("embeddings", filas=len(textos)), torch.inference_mode():
+            for lote in lotes_por_longitud(longitudes, self.batch_size):
+                entrada = self._tokenizer([textos[i] for i in lote], padding=True, truncation=True, return_tensors="pt")
+                ocultos = self._modelo(**entrada).last_hidden_state
+                mascara = entrada["attention_mask"].unsqueeze(-1).to(ocultos.dtype)
+                salida[lote] = ((ocultos * mascara).sum(1) / mascara.sum(1).clamp(min=1)).numpy()
+        return normalizar(salida)
+
+
+def _top_k(similitudes, ids, k):
+    """Los k mayores por fila de `similitudes` (q, m), ordenados; `ids` es (m,) o (q, m)."""
+    ids = np.broadcast_to(ids, similitudes.shape)
+    if similitudes.shape[1] > k:
+        parte = np.argpartition(-similitudes, k - 1, axis=1)[:, :k]
+        similitudes = np.take_along_axis(similitudes, parte, axis=1)
+        ids = np.take_along_axis(ids, parte, axis=1)
+    orden = np.argsort(-similitudes, axis=1, kind="stable")
+    return np.take_along_axis(ids, orden, axis=1), np.take_along_axis(similitudes, orden, axis=1)
+
+
+def _asignar(vectores, centroides):
+    # centroide mas parecido de cada fila, por bloques
+    asignacion = np.empty(len(vectores), dtype=np.int32)
+    for inicio in range(0, len(vectores), BLOQUE_FILAS):
+        bloque = np.asarray(vectores[inicio:inicio + BLOQUE_FILAS], dtype=np.float32)
+        asignacion[inicio:inicio + len(bloque)] = np.argmax(bloque @ centroides.T, axis=1)
+    return asignacion
+
+
+def kmeans_esferico(vectores, listas, iteraciones=ITERACIONES_KMEANS, semilla=0):
+    """Centroides (listas, d) normalizados entrenados sobre una muestra de las filas."""
+    rng = np.random.default_rng(semilla)
+    muestra = np.sort(rng.choice(len(vectores), size=min(len(vectores), MUESTRA_POR_LISTA * listas), replace=False))
+    datos = np.asarray(vectores[muestra], dtype=np.float32)
+    centroides = datos[rng.choice(len(datos), size=listas, replace=False)]
+    for _ in range(iteraciones):
+        asignacion = _asignar(datos, centroides)
+        orden = np.argsort(asignacion, kind="stable")
+        conteos = np.bincount(asignacion, minlength=listas)
+        ocupadas = np.flatnonzero(conteos)
+        inicios = np.concatenate([[0], np.cumsum(conteos[ocupadas])[:-1]])
+        centroides[ocupadas] = normalizar(np.add.reduceat(datos[orden], inicios, axis=0))
+        # listas vacias: se vuelven a sembrar con filas al azar
+        vacias = np.flatnonzero(conteos == 0)
+        centroides[vacias] = datos[rng.choice(len(datos), size=len(vacias), replace=False)]
+    return centroides
+
+
+def centroides_habilidades(codificar, vectores, insights, habilidades=cognitive_skills):
+    """(nombres, centroides) de cada habilidad.
+
+    La semilla es el promedio de los embeddings de su nombre y sus sinonimos; si
+    hay al menos MIN_EJEMPLOS comentarios que el detector por sinonimos ya
+    etiqueto con ella, se le suma el promedio de esos comentarios.
+    """
+    nombres = [habilidad["name"] for habilidad in habilidades]
+    centroides = np.empty((len(habilidades), vectores.shape[1]), dtype=np.float32)
+    for i, habilidad in enumerate(habilidades):
+        semilla = codificar([habilidad["name"], *habilidad["synonyms"]]).mean(axis=0)
+        ejemplos = [fila for fila, etiquetas in enumerate(insights) if habilidad["name"] in etiquetas]
+        if len(ejemplos) >= MIN_EJEMPLOS:
+            semilla = normalizar(semilla[None])[0] + normalizar(
+                np.asarray(vectores[ejemplos], dtype=np.float32).mean(axis=0, keepdims=True))[0]
+        centroides[i] = semilla
+    return nombres, normalizar(centroides)
+
+
+def etiquetar(vectores, nombres, centroides, umbral=UMBRAL_HABILIDAD, maximo=MAX_HABILIDADES):
+    """Habilidades de cada fila por similitud con los centroides, de la mas parecida a la menos ("A|B")."""
+    etiquetas = []
+    for inicio in range(0, len(vectores), BLOQUE_FILAS):
+        bloque = np.asarray(vectores[inicio:inicio + BLOQUE_FILAS], dtype=np.float32)
+        ids, similitudes = _top_k(bloque @ centroides.T, np.arange(len(nombres)), min(maximo, len(nombres)))
+        for fila_ids, fila_similitudes in zip(ids, similitudes):
+            etiquetas.append("|".join(nombres[i] for i, s in zip(fila_ids, fila_similitudes) if s >= umbral))
+    return etiquetas
+
+
+class ConstructorEmbeddings:
+    """Junta los comentarios (uno por grupo de duplicados) y arma el indice en guardar().
+
+    Los grupos se identifican por cluster_id, o por el texto plegado si los
+    resultados no lo tienen; cada texto distinto queda como alias de su fila
+    para encontrarla desde la pagina.
+    """
+
+    def __init__(self):
+        self.filas = {}
+        self.documentos = []
+        self.repeticiones = []
+        self.alias = {}
+
+    def agregar(self, filas):
+        for fila in filas:
+            h = hash_texto(plegar(fila["texto"]))
+            clave = fila.get("cluster_id")
+            clave = h if clave is None else clave
+            posicion = self.filas.get(clave)
+            if posicion is None:
+                posicion = self.filas[clave] = len(self.documentos)
+                insights = fila.get("insights")
+                self.documentos.append({
+                    "clave": clave,
+                    "video": fila.get("video"),
+                    "texto": fila["texto"],
+                    "sentimiento": fila.get("sentimiento"),
+                    "insight": fila.get("insight"),
+                    "insights": insights.split("|") if insights else [],
+                })
+                self.repeticiones.append(0)
+            self.repeticiones[posicion] += 1
+            self.alias.setdefault(h, posicion)
+
+    def __len__(self):
+        return len(self.documentos)
+
+    def guardar(self, codificar, destino=RUTA_EMBEDDINGS, listas=None, habilidades=cognitive_skills):
+        """Calcula los embeddings por lotes con `codificar` (textos -> matriz normalizada) y escribe el indice.
+
+        listas=None elige la cantidad de listas del modo aproximado segun el
+        tamaño (ninguna con menos de MIN_FILAS_LISTAS filas); 0 no las arma.
+        """
+        temporal = destino.rstrip(os.sep) + ".tmp"
+        shutil.rmtree(temporal, ignore_errors=True)
+        os.makedirs(temporal)
+        textos = [documento["texto"] for documento in self.documentos]
+
+        vectores = None
+        for inicio in range(0, len(textos), TAMANO_LOTE):
+            lote = codificar(textos[inicio:inicio + TAMANO_LOTE])
+            if vectores is None:
+                vectores = np.lib.format.open_memmap(os.path.join(temporal, "vectores.npy"), mode="w+",
+                                                     dtype=np.float16, shape=(len(textos), lote.shape[1]))
+            vectores[inicio:inicio + len(lote)] = lote
+        if vectores is None:
+            raise ValueError("no hay comentarios para calcular embeddings")
+        vectores.flush()
+
+        if listas is None:
+            listas = int(2 * math.sqrt(len(vectores))) if len(vectores) >= MIN_FILAS_LISTAS else 0
+        listas = min(listas, len(vectores))
+        if listas:
+            with etapa("kmeans", filas=len(vectores), listas=listas):
+                centroides = kmeans_esferico(vectores, listas)
+                asignacion = _asignar(vectores, centroides)
+            orden = np.argsort(asignacion, kind="stable").astype(np.int32)
+            inicios = np.searchsorted(asignacion[orden], np.arange(listas + 1)).astype(np.int64)
+            np.save(os.path.join(temporal, "listas_centroides.npy"), centroides)
+            np.save(os.path.join(temporal, "listas_filas.npy"), orden)
+            np.save(os.path.join(temporal, "listas_inicios.npy"), inicios)
+
+        with etapa("etiquetado_habilidades", filas=len(vectores)):
+            nombres, centroides_hab = centroides_habilidades(
+                codificar, vectores, [documento["insights"] for documento in self.documentos], habilidades)
+            semanticas = etiquetar(vectores, nombres, centroides_hab)
+        np.save(os.path.join(temporal, "habilidades_centroides.npy"), centroides_hab)
+
+        claves = np.fromiter(self.alias, dtype=np.int64, count=len(self.alias))
+        filas_alias = np.fromiter(self.alias.values(), dtype=np.int32, count=len(self.alias))
+        orden_alias = np.argsort(claves)
+        np.save(os.path.join(temporal, "alias_claves.npy"), claves[orden_alias])
+        np.save(os.path.join(temporal, "alias_filas.npy"), filas_alias[orden_alias])
+
+        tabla = pa.table({
+            "clave": pa.array([d["clave"] for d in self.documentos], type=pa.int64()),
+            "video": pa.array([d["video"] for d in self.documentos], type=pa.string()).dictionary_encode(),
+            "texto": pa.array(textos, type=pa.string()),
+            "sentimiento": pa.array([d["sentimiento"] for d in self.documentos], type=pa.string()).dictionary_encode(),
+            "insight": pa.array([d["insight"] for d in self.documentos], type=pa.string()).dictionary_encode(),
+            "habilidades": pa.array(semanticas, type=pa.string()),
+            "repeticiones": pa.array(self.repeticiones, type=pa.int32()),
+        })
+        with pa.OSFile(os.path.join(temporal, "documentos.arrow"), "wb") as archivo, \
+                ipc.new_file(archivo, tabla.schema) as escritor:
+            escritor.write_table(tabla)
+
+        meta = {"modelo": getattr(codificar, "modelo", None), "filas": len(vectores), "dimension": vectores.shape[1],
+                "listas": listas, "habilidades": nombres, "umbral_habilidad": UMBRAL_HABILIDAD,
+                "creado": datetime.now().isoformat(timespec="seconds")}
+        with open(os.path.join(temporal, ARCHIVO_META), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        del vectores
+        shutil.rmtree(destino, ignore_errors=True)
+        os.replace(temporal, destino)
+        return resumen_etiquetado(self.documentos, semanticas)
+
+
+def resumen_etiquetado(documentos, semanticas):
+    """Cuantos comentarios (contando repetidos no) tienen habilidad por sinonimo, por centroide o ninguna."""
+    lexicas = [documento["insight"] not in (None, SIN_CATEGORIA) for documento in documentos]
+    return {
+        "comentarios": len(documentos),
+        "con_sinonimo": sum(lexicas),
+        "con_centroide": sum(1 for etiquetas in semanticas if etiquetas),
+        "solo_centroide": sum(1 for lexica, etiquetas in zip(lexicas, semanticas) if etiquetas and not lexica),
+    }
+
+
+class IndiceEmbeddings:
+    """Vecinos mas cercanos sobre la matriz de embeddings mapeada en memoria.
+
+    Modo "exacta": productos de matrices por bloques de BLOQUE_FILAS sobre todas
+    las filas. Modo "aproximada": solo las filas de las SONDAS listas mas
+    cercanas a la consulta; mucho mas rapido con millones de filas, a cambio de
+    perder algun vecino que haya quedado en otra lista.
+    """
+
+    def __init__(self, directorio):
+        def ruta(nombre):
+            return os.path.join(directorio, nombre)
+
+        with open(ruta(ARCHIVO_META), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.vectores = np.load(ruta("vectores.npy"), mmap_mode="r")
+        with pa.memory_map(ruta("documentos.arrow"), "r") as fuente:
+            self.documentos = ipc.open_file(fuente).read_all()
+        self.alias_claves = np.load(ruta("alias_claves.npy"), mmap_mode="r")
+        self.alias_filas = np.load(ruta("alias_filas.npy"), mmap_mode="r")
+        self.habilidades = self.meta["habilidades"]
+        self.centroides_habilidades = np.load(ruta("habilidades_centroides.npy"))
+        self.listas = None
+        if self.meta["listas"]:
+            self.listas = (np.load(ruta("listas_centroides.npy")), np.load(ruta("listas_filas.npy"), mmap_mode="r"),
+                           np.load(ruta("listas_inicios.npy")))
+
+    @classmethod
+    def cargar(cls, ruta=RUTA_EMBEDDINGS):
+        if not os.path.exists(os.path.join(ruta, ARCHIVO_META)):
+            return None
+        return cls(ruta)
+
+    def __len__(self):
+        return len(self.vectores)
+
+    def fila(self, texto):
+        """Fila del indice que corresponde a un texto (o a su grupo de duplicados), o None."""
+        h = hash_texto(plegar(texto))
+        i = np.searchsorted(self.alias_claves, h)
+        if i < len(self.alias_claves) and self.alias_claves[i] == h:
+            return int(self.alias_filas[i])
+        return None
+
+    def _exacta(self, consultas, k):
+        ids = np.empty((len(consultas), 0), dtype=np.int64)
+        similitudes = np.empty((len(consultas), 0), dtype=np.float32)
+        for inicio in range(0, len(self.vectores), BLOQUE_FILAS):
+            bloque = np.asarray(self.vectores[inicio:inicio + BLOQUE_FILAS], dtype=np.float32)
+            ids_bloque, sim_bloque = _top_k(consultas @ bloque.T, np.arange(inicio, inicio + len(bloque)), k)
+            ids, similitudes = _top_k(np.hstack([similitudes, sim_bloque]), np.hstack([ids, ids_bloque]), k)
+        return list(zip(ids, similitudes))
+
+    def _aproximada(self, consultas, k, sondas):
+        centroides, filas_listas, inicios = self.listas
+        cercanas = _top_k(consultas @ centroides.T, np.arange(len(centroides)), min(sondas, len(centroides)))[0]
+        resultados = []
+        for consulta, listas in zip(consultas, cercanas):
+            filas = np.sort(np.concatenate([filas_listas[inicios[l]:inicios[l + 1]] for l in listas]))
+            ids, similitudes = _top_k((np.asarray(self.vectores[filas], dtype=np.float32) @ consulta)[None], filas, k)
+            resultados.append((ids[0], similitudes[0]))
+        return resultados
+
+    def vecinos(self, consultas, k=10, modo=None, sondas=SONDAS):
+        """[(filas, similitudes)] con los k vecinos de cada consulta (vectores normalizados).
+
+        modo=None elige "aproximada" si hay listas y mas de MAX_FILAS_EXACTA filas.
+        """
+        consultas = np.atleast_2d(np.asarray(consultas, dtype=np.float32))
+        if modo is None:
+            modo = "aproximada" if self.listas is not None and len(self) > MAX_FILAS_EXACTA else "exacta"
+        if modo == "aproximada":
+            if self.listas is None:
+                raise ValueError("el indice no tiene listas para el modo aproximado; reconstruirlo con --listas")
+            return self._aproximada(consultas, k, sondas)
+        if modo == "exacta":
+            return self._exacta(consultas, k)
+        raise ValueError(f"modo desconocido '{modo}', opciones: exacta, aproximada")
+
+    def similares(self, texto, k=10, modo=None):
+        """DataFrame con los k comentarios mas parecidos a `texto` y su "similitud"; None si no esta en el indice."""
+        fila = self.fila(texto)
+        if fila is None:
+            return None
+        ids, similitudes = self.vecinos(self.vectores[fila], k + 1, modo)[0]
+        distintos = ids != fila
+        ids, similitudes = ids[distintos][:k], similitudes[distintos][:k]
+        tabla = self.documentos.take(pa.array(ids)).drop_columns(["clave"]).to_pandas()
+        tabla.insert(0, "similitud", similitudes.round(3))
+        return tabla
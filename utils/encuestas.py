@@ -0,0 +1,196 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from utils.registro import ruta_repo
+
+DIRECTORIO_ENCUESTAS = ruta_repo("data", "countries")
+
+# esquema declarativo de las encuestas por pais: para cada metrica normalizada (0 a 1)
+# se indica la columna de origen por nombre y como se transforma:
+#   "mapa":   respuesta -> valor (las respuestas fuera del mapa quedan en NaN)
+#   "escala": (minimo, maximo) de una escala numerica, reescalada linealmente
+#   "tramos": [(operador, limite, valor), ...] evaluados en orden, y "resto" para lo demas
+# Para sumar un pais basta con agregar su entrada aqui.
+ESQUEMAS = {
+    "Bangladesh": {
+        "archivo": "bangladesh.csv",
+        "metricas": {
+            "AI_Usage_Normalized": {
+                "columna": "How often do you use AI tools like ChatGPT  for academic purposes?",
+                "mapa": {"Never": 0, "Occasionally": 0.25, "Monthly": 0.5, "Weekly": 0.75, "Daily": 1},
+            },
+        },
+    },
+    "India": {
+        "archivo": "india.csv",
+        "metricas": {
+            "AI_Usage_Normalized": {
+                "columna": "Daily_Usage_Hours",
+                "tramos": [("<", 1, 0.25), ("<=", 3, 0.5)],
+                "resto": 1,
+            },
+            "AI_Knowledge_Normalized": {"columna": "Awareness_Level", "escala": (1, 10)},
+        },
+    },
+    "Rumania": {
+        "archivo": "rumania.csv",
+        "metricas": {
+            "AI_Knowledge_Normalized": {
+                "columna": "On a scale from 1 to 5, how would you rate your knowledge and understanding of Artificial Intelligence (AI)?",
+                "escala": (1, 5),
+            },
+            "AI_Usage_Normalized": {
+                "columna": "On a scale from 1 to 5, how often do you use Artificial Intelligence (AI) for school-related tasks?",
+                "escala": (1, 5),
+            },
+        },
+    },
+    "Turquía": {
+        "archivo": "turkey.csv",
+        "metricas": {
+            "AI_Knowledge_Normalized": {
+                "columna": "AI and Automation Knowledge Level",
+                "mapa": {"No knowledge": 0, "Little knowledge": 1 / 3, "Moderate knowledge": 2 / 3, "High knowledge": 1},
+            },
+        },
+    },
+}
+
+# orden de los paises en cada grafico comparativo
+ORDEN_METRICAS = {
+    "AI_Usage_Normalized": ["Bangladesh", "Rumania", "India"],
+    "AI_Knowledge_Normalized": ["Turquía", "Rumania", "India"],
+}
+
+# copia compacta de cada CSV: Arrow IPC sin compresion (se puede mapear en memoria), las
+# respuestas de texto como columnas diccionario (codigos int8/int16 + un diccionario por
+# columna) y las escalas numericas en el entero/flotante mas chico que las contiene
+DIRECTORIO_COMPACTO = "compacto"
+
+_OPERADORES = {"<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal}
+
+
+def ruta_encuesta(pais, directorio=DIRECTORIO_ENCUESTAS):
+    return os.path.join(directorio, ESQUEMAS[pais]["archivo"])
+
+
+def tipar_columnas(df):
+    """Convierte cada columna al tipo compacto: category para texto, enteros/flotantes reducidos."""
+    tipadas = {}
+    for columna, serie in df.items():
+        if pd.api.types.is_integer_dtype(serie):
+            tipadas[columna] = pd.to_numeric(serie, downcast="integer")
+        elif pd.api.types.is_float_dtype(serie):
+            tipadas[columna] = serie.astype("float32")
+        else:
+            tipadas[columna] = serie.astype("category")
+    return pd.DataFrame(tipadas, index=df.index)
+
+
+def ruta_compacta(ruta_csv):
+    directorio, archivo = os.path.split(ruta_csv)
+    return os.path.join(directorio, DIRECTORIO_COMPACTO, os.path.splitext(archivo)[0] + ".arrow")
+
+
+def convertir_encuesta(ruta_csv, destino=None):
+    """Escribe la copia compacta de una encuesta y devuelve la tabla Arrow."""
+    destino = ruta_compacta(ruta_csv) if destino is None else destino
+    tabla = pa.Table.from_pandas(tipar_columnas(pd.read_csv(ruta_csv)), preserve_index=False)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temporal = destino + ".tmp"
+    with pa.OSFile(temporal, "wb") as archivo, ipc.new_file(archivo, tabla.schema) as escritor:
+        escritor.write_table(tabla)
+    os.replace(temporal, destino)
+    return tabla
+
+
+def _columna_pandas(columna):
+    # sin nulos, los codigos del diccionario y los numeros se usan tal cual desde el mapa de
+    # memoria (los arreglos quedan de solo lectura); con nulos pandas necesita -1/NaN y se copia
+    columna = columna.combine_chunks()
+    if columna.null_count == 0:
+        if pa.types.is_dictionary(columna.type):
+            tipo = pd.CategoricalDtype(columna.dictionary.to_pandas())
+            return pd.Categorical.from_codes(columna.indices.to_numpy(zero_copy_only=True), dtype=tipo, validate=False)
+        if pa.types.is_integer(columna.type) or pa.types.is_floating(columna.type):
+            return columna.to_numpy(zero_copy_only=True)
+    return columna.to_pandas()
+
+
+def cargar_encuesta(ruta_csv):
+    """Encuesta tipada desde su copia compacta, mapeada en memoria y sin copiar las columnas.
+
+    Las copias las genera compactar_encuestas.py; la pagina solo lee. Si la
+    copia falta o es mas vieja que el CSV se tipa el CSV en memoria.
+    """
+    destino = ruta_compacta(ruta_csv)
+    if not os.path.exists(destino) or os.path.getmtime(destino) < os.path.getmtime(ruta_csv):
+        return tipar_columnas(pd.read_csv(ruta_csv))
+    with pa.memory_map(destino, "r") as fuente:
+        tabla = ipc.open_file(fuente).read_all()
+    return pd.DataFrame({nombre: _columna_pandas(tabla.column(nombre)) for nombre in tabla.column_names}, copy=False)
+
+
+def _por_mapa(serie, mapa):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # se mapea el diccionario (pocas categorias) y se expande con los codigos
+        por_categoria = _por_mapa(pd.Series(serie.cat.categories), mapa)
+        return np.append(por_categoria, np.nan)[serie.cat.codes.to_numpy()]
+    # codigos categoricos en vez de .map por fila; el codigo -1 (sin mapeo) cae en el NaN final
+    codigos = pd.Categorical(serie, categories=list(mapa)).codes
+    valores = np.append(np.asarray(list(mapa.values()), dtype=float), np.nan)
+    return valores[codigos]
+
+
+def _por_escala(serie, escala):
+    minimo, maximo = escala
+    return (pd.to_numeric(serie, errors="coerce").to_numpy(dtype=float) - minimo) / (maximo - minimo)
+
+
+def _por_tramos(serie, tramos, resto):
+    valores = pd.to_numeric(serie, errors="coerce").to_numpy(dtype=float)
+    condiciones = [_OPERADORES[operador](valores, limite) for operador, limite, _ in tramos]
+    resultado = np.select(condiciones, [valor for _, _, valor in tramos], default=resto)
+    return np.where(np.isnan(valores), np.nan, resultado)
+
+
+def normalizar_metrica(serie, regla):
+    if "mapa" in regla:
+        return _por_mapa(serie, regla["mapa"])
+    if "escala" in regla:
+        return _por_escala(serie, regla["escala"])
+    if "tramos" in regla:
+        return _por_tramos(serie, regla["tramos"], regla.get("resto", np.nan))
+    raise ValueError(f"Regla de normalización desconocida: {sorted(regla)}")
+
+
+def normalizar(df, pais, esquema=None):
+    """Columnas normalizadas de un pais segun su esquema, alineadas con df."""
+    esquema = ESQUEMAS[pais] if esquema is None else esquema
+    faltantes = [r["columna"] for r in esquema["metricas"].values() if r["columna"] not in df.columns]
+    if faltantes:
+        raise KeyError(f"{pais}: faltan las columnas {faltantes}")
+    normalizadas = pd.DataFrame(
+        {metrica: normalizar_metrica(df[regla["columna"]], regla).astype("float32")
+         for metrica, regla in esquema["metricas"].items()},
+        index=df.index,
+    )
+    normalizadas["Country"] = pd.Categorical.from_codes(np.zeros(len(df), dtype="int8"), [pais])
+    return normalizadas
+
+
+def combinar(normalizadas, metrica, orden=None):
+    """Une la metrica de varios paises en un DataFrame largo (Country, metrica).
+
+    Country se arma directamente como codigos categoricos en el orden del grafico.
+    """
+    orden = ORDEN_METRICAS[metrica] if orden is None else orden
+    tamanos = [len(normalizadas[pais]) for pais in orden]
+    return pd.DataFrame({
+        "Country": pd.Categorical.from_codes(np.repeat(np.arange(len(orden), dtype="int8"), tamanos), orden),
+        metrica: np.concatenate([normalizadas[pais][metrica].to_numpy() for pais in orden]),
+    })
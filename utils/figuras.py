@@ -0,0 +1,33 @@
+import hashlib
+import io
+import os
+
+_hashes = {}
+
+
+def hash_archivo(ruta):
+    """sha256 del contenido; se recalcula solo si cambian mtime o tamaño."""
+    estado = os.stat(ruta)
+    firma = (ruta, estado.st_mtime_ns, estado.st_size)
+    if firma not in _hashes:
+        digest = hashlib.sha256()
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                digest.update(bloque)
+        _hashes[firma] = digest.hexdigest()
+    return _hashes[firma]
+
+
+def huella_archivos(rutas):
+    """Clave de cache para un conjunto de archivos de entrada."""
+    return tuple(hash_archivo(ruta) for ruta in rutas)
+
+
+def figura_a_png(fig, dpi=200):
+    # mismos parametros que usa st.pyplot; la figura se cierra para no acumular memoria
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
@@ -0,0 +1,101 @@
+import os
+import re
+from collections import Counter
+
+import pandas as pd
+
+from utils.habilidades import SIN_CATEGORIA
+from utils.registro import ruta_repo
+
+# indice de frecuencias de palabras por (video, sentimiento, insight); la nube de palabras
+# de cualquier filtro se arma sumando conteos en lugar de re-tokenizar el corpus
+RUTA_FRECUENCIAS = ruta_repo("data", "resultados", "frecuencias.parquet")
+TODOS = "Todos"
+CLAVES = ["video", "sentimiento", "insight"]
+
+# misma tokenizacion que WordCloud.process_text con sus opciones por defecto
+_PATRON_PALABRA = re.compile(r"\w[\w']*")
+
+
+def tokenizar(texto):
+    for palabra in _PATRON_PALABRA.findall(texto.lower()):
+        if palabra.endswith("'s"):
+            palabra = palabra[:-2]
+        if palabra and not palabra.isdigit():
+            yield palabra
+
+
+def _a_tabla(conteos):
+    tabla = pd.DataFrame(
+        [(*clave, n) for clave, n in conteos.items()],
+        columns=CLAVES + ["palabra", "n"],
+    )
+    for columna in CLAVES + ["palabra"]:
+        tabla[columna] = tabla[columna].astype("category")
+    tabla["n"] = tabla["n"].astype("int32")
+    return tabla
+
+
+class IndiceFrecuencias:
+    """Cuenta palabras por comentario y las acumula por (video, sentimiento, insight)."""
+
+    def __init__(self):
+        self.conteos = Counter()
+
+    def agregar(self, filas):
+        for fila in filas:
+            clave = (fila["video"], fila["sentimiento"], fila["insight"])
+            for palabra in tokenizar(fila["texto"]):
+                self.conteos[(*clave, palabra)] += 1
+
+    def tabla(self):
+        return _a_tabla(self.conteos)
+
+    def guardar(self, ruta=RUTA_FRECUENCIAS):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = ruta + ".tmp"
+        self.tabla().to_parquet(temporal, index=False)
+        os.replace(temporal, ruta)
+
+
+def indice_desde_df(df):
+    indice = IndiceFrecuencias()
+    if "video" not in df.columns:
+        df = df.assign(video="")
+    filas = df[CLAVES + ["texto"]].dropna(subset=["texto"]).astype(str).to_dict("records")
+    indice.agregar(filas)
+    return indice.tabla()
+
+
+def cargar_indice(ruta=RUTA_FRECUENCIAS):
+    if not os.path.exists(ruta):
+        return None
+    return pd.read_parquet(ruta)
+
+
+def normalizar_plurales(frecuencias):
+    # igual que wordcloud: "x" + "s" se suma a "x" si ambas formas aparecen (salvo "ss")
+    resultado = dict(frecuencias)
+    for palabra in list(resultado):
+        if palabra.endswith("s") and not palabra.endswith("ss") and palabra[:-1] in resultado:
+            resultado[palabra[:-1]] += resultado.pop(palabra)
+    return resultado
+
+
+def frecuencias(tabla, videos=None, sentimiento=TODOS, insight=TODOS, stopwords=()):
+    """Suma los conteos del filtro y devuelve {palabra: frecuencia} lista para generate_from_frequencies.
+
+    Como el dashboard, ignora los comentarios sin habilidad detectada.
+    """
+    mascara = tabla["insight"] != SIN_CATEGORIA
+    if videos is not None:
+        mascara &= tabla["video"].isin(videos)
+    if sentimiento != TODOS:
+        mascara &= tabla["sentimiento"] == sentimiento
+    if insight != TODOS:
+        mascara &= tabla["insight"] == insight
+    conteos = tabla.loc[mascara].groupby("palabra", observed=True)["n"].sum()
+
+    stopwords = {s.lower() for s in stopwords}
+    conteos = conteos[(conteos > 0) & ~conteos.index.isin(stopwords)]
+    return normalizar_plurales(conteos.astype(int).to_dict())
@@ -0,0 +1,227 @@
+import re
+from collections import namedtuple
+
+# definicion de habilidades cognitivas
+# lista mejorada con vocabulario de los comentarios reales
+
+cognitive_skills = [
+    {
+        "name": "Memoria",
+        "synonyms": [
+            "memoria", "retención", "recuerdo", "reconocimiento", "memorización", 
+            "memoria a corto plazo", "memoria a largo plazo", "memoria de trabajo", 
+            "olvido", "olvidan", "olvidaba", "no me acuerdo", "no recordaba", "retener información"
+        ]
+    },
+    {
+        "name": "Atención",
+        "synonyms": [
+            "atención", "concentración", "enfoque", "vigilancia", "alerta", 
+            "atención selectiva", "atención sostenida",
+            "no me concentraba", "distracciones", "mantener la atención", "capacidad de atención"
+        ]
+    },
+    {
+        "name": "Velocidad de procesamiento",
+        "synonyms": [
+            "velocidad mental", "velocidad cognitiva", "tiempo de reacción", 
+            "procesamiento de información", "rapidez mental",
+            "agilizar procesos", "más rápido", "ahorrar tiempo", "en segundos", "inmediato"
+        ]
+    },
+    {
+        "name": "Razonamiento",
+        "synonyms": [
+            "pensamiento lógico", "razonamiento deductivo", "razonamiento inductivo", 
+            "pensamiento crítico", "pensamiento abstracto", "resolución de problemas", 
+            "pensamiento analítico", "inferencias", "lógica",
+            "criterio", "sentido crítico", "capacidad de análisis", "capacidad de razonamiento",
+            "analizar", "cuestionar", "conclusiones", "evaluación"
+        ]
+    },
+    {
+        "name": "Función ejecutiva",
+        "synonyms": [
+            "autorregulación", "control cognitivo", "planificación", "toma de decisiones", 
+            "flexibilidad mental", "inhibición", "gestión de metas", "pensamiento estratégico",
+            "organizar ideas", "estructurar ideas", "tomar decisiones"
+        ]
+    },
+    {
+        "name": "Comprensión del lenguaje",
+        "synonyms": [
+            "comprensión verbal", "procesamiento semántico", "comprensión lectora", 
+            "análisis de texto", "habilidades lingüísticas", "razonamiento verbal",
+            "redacción", "capacidad de redacción", "entender"
+        ]
+    },
+    {
+        "name": "Aprendizaje",
+        "synonyms": [
+            "adquisición de conocimiento", "aprendizaje de habilidades", "adaptabilidad", 
+            "crecimiento cognitivo", "aprendizaje asociativo", "aprender",
+            "entender conceptos", "esfuerzo cognitivo", "proceso de aprendizaje", "apropiarme"
+        ]
+    },
+    {
+        "name": "Creatividad",
+        "synonyms": [
+            "pensamiento divergente", "originalidad", "pensamiento innovador", 
+            "generación de ideas", "flexibilidad conceptual", "imaginación",
+            "ideas propias", "chispa inicial", "desbloquear la creatividad"
+        ]
+    },
+    {"name": "Habilidad visoespacial", "synonyms": ["razonamiento espacial", "procesamiento visual", "rotación mental", "visualización espacial", "conciencia espacial", "imaginación visual", "integración visomotriz"]},
+    {"name": "Habilidad numérica", "synonyms": ["razonamiento matemático", "pensamiento cuantitativo", "cálculo", "numeración", "habilidad aritmética", "procesamiento numérico"]},
+    {"name": "Metacognición", "synonyms": ["pensar sobre pensar", "autoconciencia", "reflexión", "evaluación propia", "autorregulación cognitiva", "monitoreo del pensamiento", "reflexionar"]},
+    {"name": "Inteligencia fluida", "synonyms": ["resolución de problemas nuevos", "razonamiento abstracto", "pensamiento adaptativo"]},
+    {"name": "Inteligencia cristalizada", "synonyms": ["base de conocimientos", "habilidad verbal", "conocimiento factual", "conocimiento acumulado", "conocimiento cultural"]},
+    {"name": "Percepción", "synonyms": ["percepción visual", "percepción auditiva", "procesamiento sensorial", "reconocimiento de patrones", "percepción táctil"]},
+    {"name": "Solución de problemas", "synonyms": ["estrategia de solución", "razonamiento heurístico", "pensamiento estratégico", "resolución de problemas", "diagnóstico", "buscar soluciones"]},
+    {"name": "Toma de decisiones", "synonyms": ["juicio", "evaluación", "elección", "priorización", "análisis de riesgos"]},
+    {"name": "Flexibilidad cognitiva", "synonyms": ["flexibilidad mental", "cambio de tareas", "adaptabilidad", "cambio cognitivo"]}
+]
+
+
+SIN_CATEGORIA = "sin categoría"
+# desde cuantos sinonimos conviene la regex compilada al loop de subcadenas. Segun
+# benchmarks/bench_habilidades.py (2000 comentarios): con el vocabulario real (139
+# sinonimos) el loop tarda ~80 ms y la regex ~170 ms; se cruzan entre 470 y 970 sinonimos
+# y con 50k la regex sigue en ~250 ms contra ~26 s del loop, pero tarda ~3.5 s en compilar
+MIN_SINONIMOS_REGEX = 700
+
+# una coincidencia por habilidad detectada; inicio/fin son offsets sobre el texto original
+Coincidencia = namedtuple("Coincidencia", ["habilidad", "sinonimo", "inicio", "fin"])
+
+
+def _construir_trie(terminos):
+    trie = {}
+    for termino in terminos:
+        nodo = trie
+        for caracter in termino:
+            nodo = nodo.setdefault(caracter, {})
+        nodo[""] = True
+    return trie
+
+
+def _trie_a_regex(nodo):
+    # convierte el trie en una regex con prefijos compartidos, asi el motor
+    # solo explora las ramas que empiezan con el caracter actual
+    termina_aqui = "" in nodo
+    ramas = [re.escape(c) + _trie_a_regex(hijo) for c, hijo in sorted(nodo.items()) if c != ""]
+    if not ramas:
+        return ""
+    if len(ramas) == 1 and not termina_aqui:
+        return ramas[0]
+    grupo = "(?:" + "|".join(ramas) + ")"
+    # el cuantificador greedy prefiere el sinonimo mas largo; los mas cortos del mismo camino
+    # se recuperan recorriendo el trie (ver DetectorHabilidades.buscar)
+    return grupo + "?" if termina_aqui else grupo
+
+
+class DetectorHabilidades:
+    """Busca todas las habilidades mencionadas en un texto.
+
+    Como el loop original, un sinonimo cuenta si aparece como subcadena (sin
+    mayusculas), aunque este dentro de otra palabra o de otro sinonimo. Con
+    pocos sinonimos se recorren con `in`/find (en C, sin costo de compilar);
+    desde MIN_SINONIMOS_REGEX se usa una sola regex compilada desde un trie,
+    cuyo costo por comentario no crece con el vocabulario. `regex` fuerza un
+    modo (None = segun la cantidad de sinonimos).
+    """
+
+    def __init__(self, habilidades, regex=None):
+        self.prioridad = {}
+        self.por_sinonimo = {}
+        self.por_habilidad = {}
+        for indice, habilidad in enumerate(habilidades):
+            self.prioridad.setdefault(habilidad["name"], indice)
+            for sinonimo in habilidad["synonyms"]:
+                clave = sinonimo.strip().lower()
+                if not clave:
+                    continue
+                nombres = self.por_sinonimo.setdefault(clave, [])
+                if habilidad["name"] not in nombres:
+                    nombres.append(habilidad["name"])
+                self.por_habilidad.setdefault(habilidad["name"], []).append(clave)
+
+        self.regex = len(self.por_sinonimo) >= MIN_SINONIMOS_REGEX if regex is None else regex
+        self.trie = None
+        self.patron = None
+        if self.regex and self.por_sinonimo:
+            self._compilar()
+
+    def _compilar(self):
+        self.trie = _construir_trie(self.por_sinonimo)
+        # lookahead: la coincidencia no consume texto, asi se prueba cada posicion y
+        # los sinonimos que empiezan dentro de otro (solapados o anidados) tambien salen
+        self.patron = re.compile(r"(?=(" + _trie_a_regex(self.trie) + "))", re.IGNORECASE)
+
+    def _terminales(self, texto, inicio, fin):
+        # sinonimos que empiezan en `inicio`: todos los nodos terminales del camino hasta el mas largo
+        nodo = self.trie
+        for posicion in range(inicio, fin):
+            for caracter in texto[posicion].lower():
+                # IGNORECASE tambien iguala letras cuyo lower() no esta en el trie (p. ej. "ſ" y "s")
+                nodo = nodo.get(caracter, {})
+            if "" in nodo:
+                yield posicion + 1
+
+    def _buscar_regex(self, texto):
+        if self.patron is None:
+            self._compilar()
+        coincidencias = []
+        for match in self.patron.finditer(texto):
+            inicio = match.start(1)
+            for fin in self._terminales(texto, inicio, match.end(1)):
+                sinonimo = texto[inicio:fin].lower()
+                for habilidad in self.por_sinonimo.get(sinonimo, ()):
+                    coincidencias.append(Coincidencia(habilidad, sinonimo, inicio, fin))
+        return coincidencias
+
+    def buscar(self, texto):
+        """Devuelve todas las coincidencias (habilidad, sinonimo, inicio, fin) en orden de aparicion."""
+        if not texto or not self.por_sinonimo:
+            return []
+        minusculas = texto.lower()
+        # lower() puede cambiar el largo (p. ej. "İ"); ahi los offsets solo salen bien con la regex
+        if self.regex or len(minusculas) != len(texto):
+            return self._buscar_regex(texto)
+        coincidencias = []
+        for sinonimo, nombres in self.por_sinonimo.items():
+            inicio = minusculas.find(sinonimo)
+            while inicio >= 0:
+                coincidencias.extend(Coincidencia(h, sinonimo, inicio, inicio + len(sinonimo)) for h in nombres)
+                inicio = minusculas.find(sinonimo, inicio + 1)
+        # mismo orden que la regex: por inicio y, en el mismo inicio, del sinonimo mas corto al mas largo
+        coincidencias.sort(key=lambda c: (c.inicio, c.fin))
+        return coincidencias
+
+    def habilidades(self, texto):
+        """Habilidades distintas encontradas, ordenadas segun la lista original."""
+        if not texto:
+            return []
+        if self.regex:
+            encontradas = {c.habilidad for c in self.buscar(texto)}
+            return sorted(encontradas, key=self.prioridad.__getitem__)
+        minusculas = texto.lower()
+        encontradas = []
+        for nombre, sinonimos in self.por_habilidad.items():
+            for sinonimo in sinonimos:
+                if sinonimo in minusculas:
+                    encontradas.append(nombre)
+                    break
+        return encontradas
+
+
+detector = DetectorHabilidades(cognitive_skills)
+
+
+def detectar_cognitive_insights(texto):
+    return detector.buscar(texto)
+
+
+def detectar_cognitive_insight(texto):
+    # se conserva la prioridad de la lista: gana la primera habilidad de cognitive_skills que aparezca
+    encontradas = detector.habilidades(texto)
+    return encontradas[0] if encontradas else SIN_CATEGORIA
@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.perfilado import etapa
+
+# pytorch: modelo fp32 original; int8: cuantizacion dinamica de las capas Linear;
+# onnx: grafo exportado con exportar_modelo.py y ejecutado con ONNX Runtime
+BACKENDS = ("pytorch", "int8", "onnx")
+
+# estado de cada proceso trabajador: su propia copia del modelo
+_pipeline_local = None
+
+
+def _cargar_pipeline(modelo, hilos, backend="pytorch"):
+    import torch
+    from transformers import AutoTokenizer, pipeline
+
+    torch.set_num_threads(hilos)
+    if backend == "pytorch":
+        return pipeline("sentiment-analysis", model=modelo, device=-1)
+
+    tokenizer = AutoTokenizer.from_pretrained(modelo)
+    if backend == "int8":
+        from transformers import AutoModelForSequenceClassification
+
+        base = AutoModelForSequenceClassification.from_pretrained(modelo).eval()
+        cuantizado = torch.ao.quantization.quantize_dynamic(base, {torch.nn.Linear}, dtype=torch.qint8)
+        return pipeline("sentiment-analysis", model=cuantizado, tokenizer=tokenizer, device=-1)
+
+    if backend == "onnx":
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+
+        if not os.path.exists(os.path.join(modelo, "model.onnx")):
+            raise ValueError(f"'{modelo}' no contiene model.onnx; generalo primero con exportar_modelo.py")
+        opciones = onnxruntime.SessionOptions()
+        opciones.intra_op_num_threads = hilos
+        opciones.inter_op_num_threads = 1
+        ort_model = ORTModelForSequenceClassification.from_pretrained(modelo, session_options=opciones)
+        return pipeline("sentiment-analysis", model=ort_model, tokenizer=tokenizer, device=-1)
+
+    raise ValueError(f"backend desconocido '{backend}', opciones: {', '.join(BACKENDS)}")
+
+
+def _iniciar_trabajador(modelo, hilos, backend="pytorch"):
+    global _pipeline_local
+    # evita que cada libreria numerica lance su propio pool de hilos por encima del presupuesto
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(hilos)
+    with etapa("carga_modelo", backend=backend, proceso=os.getpid()):
+        _pipeline_local = _cargar_pipeline(modelo, hilos, backend)
+
+
+def _inferir_lote(textos, sentiment_pipeline=None):
+    sentiment_pipeline = sentiment_pipeline or _pipeline_local
+    return sentiment_pipeline(textos, batch_size=len(textos), truncation=True)
+
+
+def lotes_por_longitud(longitudes, batch_size):
+    """Agrupa indices en lotes de largo parecido para minimizar el padding.
+
+    Devuelve listas de indices sobre la entrada original; los lotes se arman
+    sobre los indices ordenados por longitud.
+    """
+    orden = sorted(range(len(longitudes)), key=longitudes.__getitem__)
+    return [orden[i:i + batch_size] for i in range(0, len(orden), batch_size)]
+
+
+class MotorInferencia:
+    """Inferencia de sentimiento en CPU con varios procesos y lotes por longitud.
+
+    Cada proceso carga su propia copia del modelo y usa hilos_por_proceso
+    hilos de torch. Los textos se ordenan por cantidad de tokens antes de
+    armar los lotes y los resultados se devuelven en el orden original.
+    Con procesos=1 todo corre en el proceso actual.
+
+    modelo puede ser un id del hub o un directorio local (necesario para
+    backend="onnx" y para trabajar sin conexion).
+    """
+
+    def __init__(self, modelo, procesos=None, hilos_por_proceso=None, batch_size=16, backend="pytorch"):
+        if backend not in BACKENDS:
+            raise ValueError(f"backend desconocido '{backend}', opciones: {', '.join(BACKENDS)}")
+        cpus = os.cpu_count() or 1
+        self.modelo = modelo
+        self.backend = backend
+        self.procesos = procesos or max(1, cpus // 4)
+        self.hilos_por_proceso = hilos_por_proceso or max(1, cpus // self.procesos)
+        self.batch_size = batch_size
+        self._tokenizer = None
+        self._pool = None
+        self._pipeline = None
+
+    def _longitudes(self, textos):
+        if self._tokenizer is None:
+            from transformers import AutoTokenizer
+
+            self._tokenizer = AutoTokenizer.from_pretrained(self.modelo)
+        ids = self._tokenizer(textos, truncation=True)["input_ids"]
+        return [len(x) for x in ids]
+
+    def _ejecutor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.procesos,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_iniciar_trabajador,
+                initargs=(self.modelo, self.hilos_por_proceso, self.backend),
+            )
+        return self._pool
+
+    def preparar(self, textos):
+        """Tokeniza y arma los lotes por longitud (listas de indices sobre textos)."""
+        if not textos:
+            return []
+        with etapa("tokenizacion", filas=len(textos)):
+            return lotes_por_longitud(self._longitudes(textos), self.batch_size)
+
+    def inferir(self, textos, lotes):
+        """Corre el modelo sobre lotes ya preparados y devuelve los resultados en el orden de textos."""
+        if not textos:
+            return []
+        textos_por_lote = [[textos[i] for i in lote] for lote in lotes]
+
+        if self.procesos == 1:
+            if self._pipeline is None:
+                with etapa("carga_modelo", backend=self.backend):
+                    self._pipeline = _cargar_pipeline(self.modelo, self.hilos_por_proceso, self.backend)
+            resultados_por_lote = (_inferir_lote(lote, self._pipeline) for lote in textos_por_lote)
+        else:
+            resultados_por_lote = self._ejecutor().map(_inferir_lote, textos_por_lote)
+
+        resultados = [None] * len(textos)
+        with etapa("inferencia", filas=len(textos), backend=self.backend):
+            for lote, resultados_lote in zip(lotes, resultados_por_lote):
+                for indice, resultado in zip(lote, resultados_lote):
+                    resultados[indice] = resultado
+        return resultados
+
+    def __call__(self, textos):
+        return self.inferir(textos, self.preparar(textos))
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
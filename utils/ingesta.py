@@ -0,0 +1,135 @@
+import glob
+import json
+import os
+
+TAMANO_LECTURA = 1 << 16  # 64 KB por lectura
+_decoder = json.JSONDecoder()
+_ESPACIOS = " \t\r\n"
+
+
+def _saltar(buffer, pos, caracteres):
+    while pos < len(buffer) and buffer[pos] in caracteres:
+        pos += 1
+    return pos
+
+
+def iterar_arreglo_json(archivo):
+    """Recorre un archivo con un arreglo JSON de objetos sin cargarlo completo.
+
+    Lee bloques de TAMANO_LECTURA y decodifica un elemento a la vez con
+    raw_decode, por lo que la memoria depende del elemento mas grande y no
+    del tamaño del archivo.
+    """
+    buffer = ""
+    pos = 0
+    fin_archivo = False
+    dentro = False
+
+    def leer_mas():
+        nonlocal buffer, pos, fin_archivo
+        bloque = archivo.read(TAMANO_LECTURA)
+        if not bloque:
+            fin_archivo = True
+        buffer = buffer[pos:] + bloque
+        pos = 0
+
+    while True:
+        pos = _saltar(buffer, pos, _ESPACIOS + ("," if dentro else ""))
+        if pos >= len(buffer):
+            if fin_archivo:
+                if dentro:
+                    raise ValueError("arreglo JSON incompleto")
+                return
+            leer_mas()
+            continue
+
+        if not dentro:
+            if buffer[pos] != "[":
+                raise ValueError("se esperaba un arreglo JSON de comentarios")
+            dentro = True
+            pos += 1
+            continue
+
+        if buffer[pos] == "]":
+            return
+
+        try:
+            elemento, nueva_pos = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # el elemento quedo cortado entre dos lecturas
+            if fin_archivo:
+                raise
+            leer_mas()
+            continue
+        # raw_decode de un numero al final del buffer puede estar incompleto
+        if nueva_pos == len(buffer) and not fin_archivo:
+            leer_mas()
+            continue
+        pos = nueva_pos
+        yield elemento
+
+
+def iterar_json_lines(archivo):
+    for linea in archivo:
+        linea = linea.strip()
+        if linea:
+            yield json.loads(linea)
+
+
+def archivos_de_comentarios(directorio):
+    patrones = ("*.json", "*.jsonl")
+    return sorted(ruta for patron in patrones for ruta in glob.glob(os.path.join(directorio, patron)))
+
+
+def nombre_video(ruta):
+    # cada export corresponde a un video; el nombre del archivo identifica la fuente
+    return os.path.splitext(os.path.basename(ruta))[0]
+
+
+def iterar_comentarios_por_archivo(directorio):
+    """Genera (ruta, comentario) de todos los exports (.json o .jsonl) del directorio."""
+    for ruta in archivos_de_comentarios(directorio):
+        with open(ruta, encoding="utf-8") as f:
+            if ruta.endswith(".jsonl"):
+                comentarios = iterar_json_lines(f)
+            else:
+                comentarios = iterar_arreglo_json(f)
+            for item in comentarios:
+                yield ruta, item
+
+
+def iterar_comentarios(directorio):
+    """Genera los comentarios crudos de todos los exports (.json o .jsonl) del directorio."""
+    for _, item in iterar_comentarios_por_archivo(directorio):
+        yield item
+
+
+def extraer_texto(item):
+    texto = item.get("ytcoreattributedstring") or item.get("Título") or ""
+    if texto and isinstance(texto, str) and texto.strip():
+        return texto
+    return None
+
+
+def iterar_registros(directorio):
+    """Genera un dict {'video', 'texto'} por comentario con texto."""
+    for ruta, item in iterar_comentarios_por_archivo(directorio):
+        texto = extraer_texto(item)
+        if texto is not None:  # solo procesar si el texto no esta vacio
+            yield {"video": nombre_video(ruta), "texto": texto}
+
+
+def iterar_textos(directorio):
+    for registro in iterar_registros(directorio):
+        yield registro["texto"]
+
+
+def en_bloques(iterable, tamano):
+    bloque = []
+    for elemento in iterable:
+        bloque.append(elemento)
+        if len(bloque) == tamano:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
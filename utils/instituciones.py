@@ -0,0 +1,137 @@
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from utils.registro import ruta_repo
+
+# indice persistente de instituciones: cada inst_id agrupa todos los (nombre, ciudad, estado)
+# con los que aparecio la institucion, asi los ids se mantienen estables al agregar años
+RUTA_INSTITUCIONES = ruta_repo("data", "instituciones.csv")
+COLUMNAS_INDICE = ["inst_id", "INSTNM", "CITY", "STABBR", "nombre_norm", "ciudad_norm"]
+
+# pasos de emparejamiento, del mas estricto al mas laxo. El segundo tolera cambios en
+# la ciudad (p. ej. "Saint Paul" / "St. Paul"). Emparejar solo por ciudad y estado
+# mezcla instituciones distintas, asi que los renombres se registran a mano en el CSV
+PASOS = [
+    ["nombre_norm", "ciudad_norm", "STABBR"],
+    ["nombre_norm", "STABBR"],
+]
+
+
+def normalizar_nombre(nombre):
+    nombre = unicodedata.normalize("NFKD", str(nombre)).encode("ascii", "ignore").decode("ascii").lower()
+    nombre = nombre.replace("&", " and ")
+    nombre = re.sub(r"[^a-z0-9]+", " ", nombre).strip()
+    return re.sub(r"^the ", "", nombre)
+
+
+def _normalizar_columna(serie):
+    # normaliza cada valor distinto una sola vez
+    valores = serie.astype(str)
+    unicos = pd.unique(valores)
+    return valores.map(dict(zip(unicos, map(normalizar_nombre, unicos))))
+
+
+def claves(df):
+    return pd.DataFrame({
+        "INSTNM": df["INSTNM"].astype(str),
+        "CITY": df["CITY"].astype(str),
+        "STABBR": df["STABBR"].astype(str),
+        "nombre_norm": _normalizar_columna(df["INSTNM"]),
+        "ciudad_norm": _normalizar_columna(df["CITY"]),
+    }, index=df.index)
+
+
+class IndiceInstituciones:
+    """Asigna un inst_id estable a cada fila de un año a partir de (INSTNM, CITY, STABBR).
+
+    Cada paso es un join por hash (pd.merge) sobre las filas que aun no tienen
+    id; las claves ambiguas en cualquiera de los dos lados se descartan para no
+    duplicar ni cruzar instituciones. Las filas sin pareja reciben un id nuevo.
+    """
+
+    def __init__(self, tabla=None):
+        self.tabla = tabla if tabla is not None else pd.DataFrame(columns=COLUMNAS_INDICE)
+        self.tabla = self.tabla.astype({"inst_id": "int64"})
+        self.modificado = False
+
+    @classmethod
+    def cargar(cls, ruta=RUTA_INSTITUCIONES):
+        if os.path.exists(ruta):
+            return cls(pd.read_csv(ruta, dtype=str, keep_default_na=False).astype({"inst_id": "int64"}))
+        return cls()
+
+    def guardar(self, ruta=RUTA_INSTITUCIONES):
+        if self.modificado:
+            temporal = ruta + ".tmp"
+            self.tabla.sort_values("inst_id").to_csv(temporal, index=False)
+            os.replace(temporal, ruta)
+            self.modificado = False
+
+    def asignar(self, df):
+        filas = claves(df)
+        ids = pd.Series(-1, index=df.index, dtype="int64")
+
+        for columnas in PASOS:
+            pendientes = filas[ids < 0]
+            if pendientes.empty or self.tabla.empty:
+                break
+            usados = set(ids[ids >= 0])
+            indice = self.tabla[~self.tabla["inst_id"].isin(usados)][columnas + ["inst_id"]].drop_duplicates()
+            # la clave debe apuntar a un solo inst_id en el indice y a una sola fila en este año
+            indice = indice[~indice.duplicated(columnas, keep=False)]
+            pendientes = pendientes[~pendientes.duplicated(columnas, keep=False)]
+            emparejadas = pendientes[columnas].reset_index().merge(indice, on=columnas, how="inner")
+            # dos alias del mismo inst_id no pueden tomar filas distintas del mismo año
+            emparejadas = emparejadas[~emparejadas["inst_id"].duplicated(keep=False)]
+            ids.loc[emparejadas["index"].to_numpy()] = emparejadas["inst_id"].to_numpy()
+
+        nuevas = ids < 0
+        siguiente = int(self.tabla["inst_id"].max()) + 1 if not self.tabla.empty else 0
+        ids[nuevas] = np.arange(siguiente, siguiente + int(nuevas.sum()))
+
+        alias = filas.assign(inst_id=ids)[COLUMNAS_INDICE]
+        tabla = pd.concat([self.tabla, alias], ignore_index=True).drop_duplicates()
+        if len(tabla) != len(self.tabla):
+            self.tabla = tabla.reset_index(drop=True)
+            self.modificado = True
+        return ids
+
+
+def serie_cambios(df, columna="SAT_AVG_ALL"):
+    """Cambio % por institucion para todos los pares ordenados de años.
+
+    Devuelve un DataFrame indexado por inst_id con columnas MultiIndex
+    (anio_a, anio_b); cada columna es el cambio de anio_a a anio_b.
+    """
+    ancho = df.pivot(index="inst_id", columns="Year", values=columna)
+    anios = list(ancho.columns)
+    valores = ancho.to_numpy(dtype=float)
+    a, b = np.nonzero(~np.eye(len(anios), dtype=bool))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cambios = (valores[:, b] - valores[:, a]) / valores[:, a] * 100
+    columnas = pd.MultiIndex.from_arrays([[anios[i] for i in a], [anios[j] for j in b]], names=["anio_a", "anio_b"])
+    return pd.DataFrame(cambios, index=ancho.index, columns=columnas)
+
+
+def top_cambios(cambios, nombres, anio_a, anio_b, k=5):
+    """Las k mayores subidas y bajadas entre dos años, con seleccion parcial (nlargest/nsmallest)."""
+    serie = cambios[(anio_a, anio_b)].dropna()
+    seleccion = pd.concat([serie.nlargest(k), serie.nsmallest(k)])
+    seleccion = seleccion[~seleccion.index.duplicated()]
+    return pd.DataFrame({
+        "INSTNM": nombres.reindex(seleccion.index).to_numpy(),
+        "%_cambio_SAT": seleccion.to_numpy(),
+    }).sort_values(by="%_cambio_SAT")
+
+
+def nombres_para_mostrar(df):
+    """Nombre mas reciente de cada inst_id; si el nombre se repite se agrega ciudad y estado."""
+    ultimos = df.sort_values("Year").drop_duplicates("inst_id", keep="last").set_index("inst_id")
+    nombres = ultimos["INSTNM"].astype(str)
+    repetidos = nombres.duplicated(keep=False)
+    nombres[repetidos] = nombres[repetidos] + " (" + ultimos.loc[repetidos, "CITY"].astype(str) + ", " + ultimos.loc[repetidos, "STABBR"].astype(str) + ")"
+    return nombres
@@ -0,0 +1,178 @@
+import contextlib
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+# perfilado opcional por etapas. Se activa con la variable de entorno PERFILADO:
+#   PERFILADO=1        tiempo, filas/s y pico de RSS por etapa
+#   PERFILADO=memoria  ademas el pico de memoria de Python con tracemalloc (mas lento)
+# Cada etapa terminada se emite como una linea JSON en el logger "perfilado" (stderr,
+# o el archivo de PERFILADO_ARCHIVO). Desactivado, etapa() no mide nada.
+MAX_REGISTROS = 1000
+
+logger = logging.getLogger("perfilado")
+_registros = deque(maxlen=MAX_REGISTROS)
+_candado = threading.Lock()
+_local = threading.local()
+_estado = {"activo": False, "memoria": False}
+
+
+def activar(memoria=False, archivo=None):
+    _estado["activo"] = True
+    _estado["memoria"] = memoria
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if not logger.handlers:
+        manejador = logging.FileHandler(archivo, encoding="utf-8") if archivo else logging.StreamHandler(sys.stderr)
+        manejador.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(manejador)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+def desactivar():
+    _estado["activo"] = False
+    if _estado["memoria"] and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _estado["memoria"] = False
+
+
+def activo():
+    return _estado["activo"]
+
+
+def _rss_pico_mb():
+    try:
+        import resource
+    except ImportError:  # windows
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux lo reporta en KB, macOS en bytes
+    return round(pico / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+
+
+def _pila():
+    if not hasattr(_local, "pila"):
+        _local.pila = []
+    return _local.pila
+
+
+@contextlib.contextmanager
+def etapa(nombre, filas=None, **extra):
+    """Mide el bloque como la etapa `nombre`; el dict devuelto acepta "filas" si se conocen al final.
+
+    Las etapas se pueden anidar: el pico de tracemalloc de una etapa incluye el de sus hijas.
+    """
+    if not _estado["activo"]:
+        yield {}
+        return
+
+    medicion = {"etapa": nombre, "filas": filas, **extra}
+    pila = _pila()
+    memoria = _estado["memoria"] and tracemalloc.is_tracing()
+    if memoria:
+        # reset_peak es global: antes de reiniciarlo se le pasa el pico actual a la etapa padre
+        if pila:
+            pila[-1]["_pico_hijas"] = max(pila[-1].get("_pico_hijas", 0), tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        memoria_inicial = tracemalloc.get_traced_memory()[0]
+    pila.append(medicion)
+    inicio = time.perf_counter()
+    try:
+        yield medicion
+    finally:
+        segundos = time.perf_counter() - inicio
+        pila.pop()
+        medicion["segundos"] = round(segundos, 6)
+        if medicion["filas"]:
+            medicion["filas_por_s"] = round(medicion["filas"] / segundos, 1) if segundos > 0 else None
+        medicion["rss_pico_mb"] = _rss_pico_mb()
+        if memoria:
+            pico = max(tracemalloc.get_traced_memory()[1], medicion.pop("_pico_hijas", 0))
+            medicion["tracemalloc_pico_mb"] = round((pico - memoria_inicial) / 2 ** 20, 2)
+            if pila:
+                pila[-1]["_pico_hijas"] = max(pila[-1].get("_pico_hijas", 0), pico)
+        medicion["hilo"] = threading.current_thread().name
+        medicion["ts"] = round(time.time(), 3)
+        with _candado:
+            _registros.append(dict(medicion))
+        logger.info(json.dumps(medicion, ensure_ascii=False))
+
+
+def medido(nombre=None):
+    """Decorador: cada llamada a la funcion es una etapa (por defecto con el nombre de la funcion)."""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with etapa(nombre or funcion.__name__):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def iterar_medido(nombre, iterable):
+    """Itera midiendo cada next() como una etapa; las filas son len(elemento) si existe."""
+    iterador = iter(iterable)
+    while True:
+        with etapa(nombre) as medicion:
+            try:
+                elemento = next(iterador)
+            except StopIteration:
+                return
+            medicion["filas"] = len(elemento) if hasattr(elemento, "__len__") else None
+        yield elemento
+
+
+def registros():
+    with _candado:
+        return list(_registros)
+
+
+def resumen():
+    """Totales por etapa: llamadas, segundos, filas, filas/s y picos de memoria."""
+    totales = {}
+    for registro in registros():
+        total = totales.setdefault(registro["etapa"], {
+            "etapa": registro["etapa"], "llamadas": 0, "segundos": 0.0, "filas": 0,
+            "rss_pico_mb": None, "tracemalloc_pico_mb": None,
+        })
+        total["llamadas"] += 1
+        total["segundos"] += registro["segundos"]
+        total["filas"] += registro["filas"] or 0
+        for campo in ("rss_pico_mb", "tracemalloc_pico_mb"):
+            if registro.get(campo) is not None:
+                total[campo] = max(total[campo] or 0, registro[campo])
+    for total in totales.values():
+        total["segundos"] = round(total["segundos"], 4)
+        total["filas_por_s"] = round(total["filas"] / total["segundos"], 1) if total["filas"] and total["segundos"] else None
+    return sorted(totales.values(), key=lambda t: -t["segundos"])
+
+
+def texto_resumen():
+    lineas = [f"{'etapa':<28} {'llamadas':>8} {'segundos':>10} {'filas':>9} {'filas/s':>11} {'rss MB':>8}"]
+    for t in resumen():
+        filas_por_s = f"{t['filas_por_s']:.0f}" if t["filas_por_s"] else "-"
+        lineas.append(f"{t['etapa']:<28} {t['llamadas']:>8} {t['segundos']:>10.3f} {t['filas']:>9} {filas_por_s:>11} "
+                      f"{t['rss_pico_mb'] or '-':>8}")
+    return "\n".join(lineas)
+
+
+def mostrar_panel():
+    """Panel en la barra lateral del dashboard con el resumen por etapa (solo si el perfilado esta activo)."""
+    if not _estado["activo"]:
+        return
+    import streamlit as st
+
+    with st.sidebar.expander("⏱️ Perfilado", expanded=False):
+        st.caption("Totales del proceso del servidor desde que arrancó (todas las sesiones).")
+        st.dataframe(resumen(), hide_index=True)
+
+
+if os.environ.get("PERFILADO", "").strip().lower() not in ("", "0", "no"):
+    activar(memoria=os.environ["PERFILADO"].strip().lower() == "memoria", archivo=os.environ.get("PERFILADO_ARCHIVO"))
@@ -0,0 +1,97 @@
+import glob
+import os
+import threading
+from collections import namedtuple
+
+from utils.figuras import hash_archivo
+from utils.perfilado import etapa
+
+# raiz del repositorio: las rutas de datos se resuelven desde aqui y no desde el
+# directorio de trabajo, asi `streamlit run` y los scripts funcionan desde cualquier lado
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def ruta_repo(*partes):
+    return os.path.join(RAIZ, *partes)
+
+
+def archivos(directorio, patron="*"):
+    """Archivos de un directorio (recursivo) para usar como rutas de un dataset."""
+    return sorted(r for r in glob.glob(os.path.join(directorio, "**", patron), recursive=True) if os.path.isfile(r))
+
+
+def _firma(rutas):
+    # barata: solo stat; un archivo que no existe queda como None
+    firma = []
+    for ruta in rutas:
+        try:
+            estado = os.stat(ruta)
+            firma.append((ruta, estado.st_mtime_ns, estado.st_size))
+        except FileNotFoundError:
+            firma.append((ruta, None))
+    return tuple(firma)
+
+
+def _huella(rutas):
+    return tuple(hash_archivo(ruta) if os.path.exists(ruta) else None for ruta in rutas)
+
+
+Entrada = namedtuple("Entrada", ["rutas", "firma", "huella", "valor"])
+
+
+class RegistroDatasets:
+    """Datasets cargados una vez por proceso y compartidos entre todas las sesiones.
+
+    Streamlit importa los modulos de utils una sola vez por servidor, asi que el
+    registro global de este modulo es el mismo para todas las paginas y usuarios.
+    Cada consulta compara mtime/tamaño de los archivos; si cambiaron se compara el
+    hash del contenido y solo se recarga si tambien cambio. Los valores se comparten:
+    quien los use no debe modificarlos en el lugar.
+    """
+
+    def __init__(self):
+        self._entradas = {}
+        self._candados = {}
+        self._candado = threading.Lock()
+
+    def _candado_de(self, nombre):
+        with self._candado:
+            return self._candados.setdefault(nombre, threading.Lock())
+
+    def obtener(self, nombre, rutas, cargar):
+        rutas = tuple(rutas)
+        firma = _firma(rutas)
+        entrada = self._entradas.get(nombre)
+        if entrada is not None and entrada.rutas == rutas and entrada.firma == firma:
+            return entrada.valor
+
+        # una sola sesion carga; las demas esperan y reutilizan el resultado
+        with self._candado_de(nombre):
+            entrada = self._entradas.get(nombre)
+            if entrada is not None and entrada.rutas == rutas and entrada.firma == firma:
+                return entrada.valor
+            huella = _huella(rutas)
+            if entrada is not None and entrada.rutas == rutas and entrada.huella == huella:
+                # cambio el mtime pero no el contenido
+                self._entradas[nombre] = entrada._replace(firma=firma)
+                return entrada.valor
+            with etapa(f"carga:{nombre}") as medicion:
+                valor = cargar()
+                # filas solo para DataFrames (o cualquier valor con shape)
+                medicion["filas"] = getattr(valor, "shape", (None,))[0]
+            self._entradas[nombre] = Entrada(rutas, firma, huella, valor)
+            return valor
+
+    def huella(self, nombre):
+        entrada = self._entradas.get(nombre)
+        return None if entrada is None else entrada.huella
+
+    def invalidar(self, nombre=None):
+        with self._candado:
+            if nombre is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(nombre, None)
+
+
+registro = RegistroDatasets()
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+# bootstrap y pruebas de permutacion vectorizados: cada bloque de remuestreos es una
+# matriz (remuestreos x n) y las medias/varianzas salen con operaciones por fila
+N_REMUESTREOS = 10_000
+SEMILLA = 0
+# tope de elementos por matriz de remuestreo (~16 MB en float64) para acotar la memoria
+MAX_ELEMENTOS_BLOQUE = 2_000_000
+
+
+def _sin_nan(valores):
+    valores = np.asarray(valores, dtype=float)
+    return valores[~np.isnan(valores)]
+
+
+def _tamanos_bloque(n_remuestreos, n_elementos):
+    filas = max(1, MAX_ELEMENTOS_BLOQUE // max(n_elementos, 1))
+    for inicio in range(0, n_remuestreos, filas):
+        yield min(filas, n_remuestreos - inicio)
+
+
+def cohens_d(a, b):
+    """d de Cohen con varianza combinada y signo de media_a - media_b (como utils.sat.pruebas_pareadas).
+
+    Acepta vectores o matrices (una muestra por fila); un remuestreo sin varianza da NaN/inf.
+    """
+    a, b = np.atleast_2d(a), np.atleast_2d(b)
+    na, nb = a.shape[1], b.shape[1]
+    var_combinada = ((na - 1) * a.var(axis=1, ddof=1) + (nb - 1) * b.var(axis=1, ddof=1)) / (na + nb - 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d = (a.mean(axis=1) - b.mean(axis=1)) / np.sqrt(var_combinada)
+    return d if len(d) > 1 else d[0]
+
+
+def bootstrap_diferencia(a, b, n_remuestreos=N_REMUESTREOS, confianza=0.95, rng=None):
+    """Intervalos bootstrap (percentil) para media_a - media_b y para la d de Cohen.
+
+    Ambos con el signo de media_a - media_b, como cohens_d y los t/d de
+    utils.sat.pruebas_pareadas que el dashboard muestra al lado. Los NaN se
+    descartan antes de remuestrear. Se remuestrea cada grupo por separado en
+    bloques de filas, asi que la memoria no depende de n_remuestreos.
+    """
+    rng = np.random.default_rng(SEMILLA) if rng is None else rng
+    a, b = _sin_nan(a), _sin_nan(b)
+    diferencias, ds = [], []
+    for filas in _tamanos_bloque(n_remuestreos, len(a) + len(b)):
+        muestra_a = a[rng.integers(0, len(a), size=(filas, len(a)))]
+        muestra_b = b[rng.integers(0, len(b), size=(filas, len(b)))]
+        diferencias.append(muestra_a.mean(axis=1) - muestra_b.mean(axis=1))
+        ds.append(np.atleast_1d(cohens_d(muestra_a, muestra_b)))
+    diferencias, ds = np.concatenate(diferencias), np.concatenate(ds)
+
+    cola = (1 - confianza) / 2 * 100
+    return {
+        "diferencia": a.mean() - b.mean(),
+        "dif_inf": np.percentile(diferencias, cola),
+        "dif_sup": np.percentile(diferencias, 100 - cola),
+        "d": cohens_d(a, b),
+        "d_inf": np.nanpercentile(ds[np.isfinite(ds)], cola),
+        "d_sup": np.nanpercentile(ds[np.isfinite(ds)], 100 - cola),
+    }
+
+
+def prueba_permutacion(a, b, n_remuestreos=N_REMUESTREOS, rng=None):
+    """Valor p bilateral de permutacion para la diferencia de medias.
+
+    Cada bloque permuta la muestra combinada fila por fila (Generator.permuted) y
+    solo suma las primeras len(a) columnas; el resto sale del total.
+    """
+    rng = np.random.default_rng(SEMILLA) if rng is None else rng
+    a, b = _sin_nan(a), _sin_nan(b)
+    combinada = np.concatenate([a, b])
+    total, na, nb = combinada.sum(), len(a), len(b)
+    observada = abs(a.mean() - b.mean())
+
+    extremos = 0
+    for filas in _tamanos_bloque(n_remuestreos, len(combinada)):
+        permutadas = rng.permuted(np.broadcast_to(combinada, (filas, len(combinada))), axis=1)
+        suma_a = permutadas[:, :na].sum(axis=1)
+        diferencias = suma_a / na - (total - suma_a) / nb
+        # tolerancia para que las permutaciones identicas a la observada cuenten como extremas
+        extremos += int(np.count_nonzero(np.abs(diferencias) >= observada - 1e-12))
+    return (extremos + 1) / (n_remuestreos + 1)
+
+
+def tabla_remuestreo(df, anio_a, anio_b, columnas, por=None, n_remuestreos=N_REMUESTREOS,
+                     confianza=0.95, semilla=SEMILLA, minimo=2):
+    """Bootstrap y permutacion de anio_a vs anio_b para cada columna (y cada grupo de `por`).
+
+    Cada combinacion usa su propio generador derivado de la semilla, asi que el
+    resultado de una fila no depende de que otras filas se calculen. Los grupos
+    con menos de `minimo` valores en alguno de los años se omiten.
+    """
+    grupos = [(None, df)] if por is None else list(df.groupby(por, observed=True))
+    tareas = [(columna, grupo, datos) for columna in columnas for grupo, datos in grupos]
+    semillas = np.random.SeedSequence(semilla).spawn(len(tareas))
+
+    filas = []
+    for (columna, grupo, datos), semilla_tarea in zip(tareas, semillas):
+        a = _sin_nan(datos.loc[datos["Year"] == anio_a, columna])
+        b = _sin_nan(datos.loc[datos["Year"] == anio_b, columna])
+        if len(a) < minimo or len(b) < minimo:
+            continue
+        rng = np.random.default_rng(semilla_tarea)
+        fila = {"columna": columna, "n_a": len(a), "n_b": len(b)}
+        if por is not None:
+            fila[por] = grupo
+        fila.update(bootstrap_diferencia(a, b, n_remuestreos, confianza, rng))
+        fila["p_perm"] = prueba_permutacion(a, b, n_remuestreos, rng)
+        filas.append(fila)
+
+    indice = ["columna"] if por is None else ["columna", por]
+    return pd.DataFrame(filas).set_index(indice)
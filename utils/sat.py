@@ -0,0 +1,115 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.registro import ruta_repo
+
+DIRECTORIO_SAT = ruta_repo("data", "clean")
+COLUMNAS_SAT = ["SAT_AVG_ALL", "SATVR25", "SATVR75", "SATMT25", "SATMT75"]
+SECCIONES_SAT = COLUMNAS_SAT[1:]
+COLUMNAS_INSTITUCION = ["INSTNM", "CITY", "STABBR"]
+
+# codigos REGION del College Scorecard
+NOMBRES_REGION = {
+    0: "Academias militares", 1: "Nueva Inglaterra", 2: "Atlántico Medio", 3: "Grandes Lagos", 4: "Llanuras",
+    5: "Sureste", 6: "Suroeste", 7: "Montañas Rocosas", 8: "Lejano Oeste", 9: "Territorios",
+}
+
+# categorias de desempeño segun SAT_AVG_ALL
+BINS_DESEMPENO = [0, 1000, 1200, 1400, 1500, float("inf")]
+LABELS_DESEMPENO = ["Bajo", "Básico", "Intermedio", "Alto", "Sobresaliente"]
+
+
+def etiqueta_anio(ruta):
+    # "2021-2022.csv" -> "2021–2022", el formato que muestra el dashboard
+    return os.path.splitext(os.path.basename(ruta))[0].replace("-", "–")
+
+
+def descubrir_anios(directorio=DIRECTORIO_SAT):
+    """Lista ordenada de (etiqueta, ruta) con un CSV por año académico."""
+    return [(etiqueta_anio(ruta), ruta) for ruta in sorted(glob.glob(os.path.join(directorio, "*.csv")))]
+
+
+def cargar_anios(anios, indice=None):
+    """Carga todos los años en un solo DataFrame largo, tipado y con la columna Year.
+
+    Si se pasa un IndiceInstituciones (utils/instituciones.py) se agrega la
+    columna inst_id, asignada año por año en orden.
+    """
+    tipos = {"INSTNM": "category", "CITY": "category", "STABBR": "category", "HIGHDEG": "int8", "REGION": "int8"}
+    usadas = set(tipos) | set(COLUMNAS_SAT)
+    frames = []
+    for etiqueta, ruta in anios:
+        df = pd.read_csv(ruta, usecols=lambda c: c in usadas)
+        df[COLUMNAS_SAT] = df[COLUMNAS_SAT].apply(pd.to_numeric, errors="coerce")
+        if indice is not None:
+            df["inst_id"] = indice.asignar(df)
+        frames.append(df.assign(Year=etiqueta))
+    df = pd.concat(frames, ignore_index=True)
+    df = df.astype({c: t for c, t in tipos.items() if c in df.columns})
+    df["Year"] = pd.Categorical(df["Year"], categories=[e for e, _ in anios], ordered=True)
+    df["Desempeño"] = pd.cut(df["SAT_AVG_ALL"], bins=BINS_DESEMPENO, labels=LABELS_DESEMPENO)
+    return df
+
+
+def resumen_por_anio(df, columna="SAT_AVG_ALL"):
+    return df.groupby("Year", observed=True)[columna].agg(["count", "mean", "var", "std", "min", "max"])
+
+
+def kpis(df, columna="SAT_AVG_ALL"):
+    return resumen_por_anio(df, columna)[["mean", "std", "min", "max"]].round(2)
+
+
+def desempeno_por_anio(df):
+    """Conteo de instituciones por categoria de desempeño (filas = años)."""
+    return pd.crosstab(df["Year"], df["Desempeño"], dropna=False)
+
+
+def ratio_verbal_matematico(df):
+    verbal = (df["SATVR25"] + df["SATVR75"]) / 2
+    matematico = (df["SATMT25"] + df["SATMT75"]) / 2
+    medias = pd.DataFrame({"verbal": verbal, "matematico": matematico, "Year": df["Year"]}).groupby("Year", observed=True).mean()
+    return medias["verbal"] / medias["matematico"]
+
+
+def pruebas_pareadas(df, columna="SAT_AVG_ALL"):
+    """t de Student (varianzas iguales), d de Cohen, cambio % y z-score para cada par de años.
+
+    Todo sale de los resumenes por año (n, media, varianza), asi que el costo
+    es una pasada sobre los datos mas operaciones vectorizadas sobre los pares.
+    Indexado por (anio_a, anio_b); t y d tienen el signo de media_a - media_b.
+    """
+    from scipy import stats
+
+    resumen = resumen_por_anio(df, columna)
+    anios = resumen.index.to_numpy()
+    n = resumen["count"].to_numpy(dtype=float)
+    media = resumen["mean"].to_numpy(dtype=float)
+    var = resumen["var"].to_numpy(dtype=float)
+
+    a, b = np.nonzero(~np.eye(len(anios), dtype=bool))
+    gl = n[a] + n[b] - 2
+    var_combinada = ((n[a] - 1) * var[a] + (n[b] - 1) * var[b]) / gl
+    diferencia = media[a] - media[b]
+    t = diferencia / np.sqrt(var_combinada * (1 / n[a] + 1 / n[b]))
+    p = 2 * stats.t.sf(np.abs(t), gl)
+
+    # z-score medio del año b sobre los datos de ambos años juntos (ddof=0, como scipy.stats.zscore)
+    total = n[a] + n[b]
+    media_par = (n[a] * media[a] + n[b] * media[b]) / total
+    suma_cuadrados = (n[a] - 1) * var[a] + n[a] * (media[a] - media_par) ** 2 \
+        + (n[b] - 1) * var[b] + n[b] * (media[b] - media_par) ** 2
+
+    return pd.DataFrame({
+        "anio_a": anios[a],
+        "anio_b": anios[b],
+        "n_a": n[a],
+        "n_b": n[b],
+        "t": t,
+        "p": p,
+        "d": diferencia / np.sqrt(var_combinada),
+        "cambio_pct": (media[b] - media[a]) / media[a] * 100,
+        "z_b": (media[b] - media_par) / np.sqrt(suma_cuadrados / total),
+    }).set_index(["anio_a", "anio_b"])
@@ -0,0 +1,156 @@
+import math
+import operator
+import re
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# tablas paginadas de los exploradores: st.dataframe con el DataFrame entero lo serializa
+# completo al navegador en cada rerun. Aca el servidor filtra, ordena y proyecta con
+# arreglos de posiciones sobre el DataFrame cacheado (sin copiarlo) y solo se envia la
+# pagina visible
+FILAS_POR_PAGINA = 50
+OPCIONES_FILAS = (25, 50, 100, 250)
+ORIGINAL = "(orden original)"
+# ordenes y mascaras calculados sobre los DataFrames compartidos (por id + weakref)
+MAX_MEMO = 32
+
+_CONDICION = re.compile(r"\s*(<=|>=|!=|<|>|=)?\s*(-?\d+(?:[.,]\d+)?)\s*")
+_OPERADORES = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+               "=": operator.eq, "!=": operator.ne}
+
+_memo = OrderedDict()
+_candado = threading.Lock()
+
+
+def _memorizado(df, clave, calcular):
+    # solo para DataFrames que viven mas que un rerun (los del registro); el weakref
+    # evita confundir un DataFrame nuevo con uno liberado que tenia el mismo id
+    llave = (id(df), clave)
+    with _candado:
+        entrada = _memo.get(llave)
+        if entrada is not None and entrada[0]() is df:
+            _memo.move_to_end(llave)
+            return entrada[1]
+    valor = calcular()
+    with _candado:
+        _memo[llave] = (weakref.ref(df), valor)
+        while len(_memo) > MAX_MEMO:
+            _memo.popitem(last=False)
+    return valor
+
+
+def orden_columna(serie, descendente=False):
+    """Posiciones que ordenan la serie (estable, nulos al final)."""
+    return serie.reset_index(drop=True).sort_values(
+        ascending=not descendente, kind="stable", na_position="last").index.to_numpy()
+
+
+def mascara_filtro(serie, texto):
+    """Filas que pasan el filtro: subcadena (sin mayusculas) o, en columnas numericas, '>= 3', '< 0.5', '= 2'.
+
+    ValueError si la condicion numerica no se entiende.
+    """
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        coincidencia = _CONDICION.fullmatch(texto)
+        if coincidencia is None:
+            raise ValueError(f"filtro numérico inválido '{texto}', se espera p. ej. '>= 0.5' o '3'")
+        valor = float(coincidencia.group(2).replace(",", "."))
+        return _OPERADORES[coincidencia.group(1) or "="](serie.to_numpy(dtype=float, na_value=np.nan), valor)
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # se compara cada categoria una vez y se expande con los codigos (-1 = nulo)
+        coinciden = serie.cat.categories.astype(str).str.contains(texto, case=False, regex=False)
+        return np.append(np.asarray(coinciden, dtype=bool), False)[serie.cat.codes.to_numpy()]
+    return serie.astype("string").str.contains(texto, case=False, regex=False).fillna(False).to_numpy(dtype=bool)
+
+
+def _serie(df, extras, columna):
+    return df[columna] if columna in df.columns else pd.Series(extras[columna])
+
+
+def posiciones_visibles(df, posiciones=None, extras=None, orden=None, descendente=False, filtro=None):
+    """Posiciones de `df` que se muestran, en orden.
+
+    `posiciones` restringe las filas (en el orden dado si no se ordena), `extras`
+    son columnas calculadas {nombre: arreglo del largo de df} y `filtro` es
+    (columna, texto). Solo se copian arreglos de posiciones, nunca el DataFrame.
+    """
+    extras = extras or {}
+    incluidas = np.zeros(len(df), dtype=bool)
+    incluidas[np.arange(len(df)) if posiciones is None else posiciones] = True
+    if filtro is not None:
+        columna, texto = filtro
+        if columna in df.columns:
+            incluidas &= _memorizado(df, ("filtro", columna, texto), lambda: mascara_filtro(df[columna], texto))
+        else:
+            incluidas &= mascara_filtro(_serie(df, extras, columna), texto)
+    if orden is None:
+        base = np.arange(len(df)) if posiciones is None else np.asarray(posiciones)
+        return base[incluidas[base]]
+    if orden in df.columns:
+        ordenadas = _memorizado(df, ("orden", orden, descendente), lambda: orden_columna(df[orden], descendente))
+    else:
+        ordenadas = orden_columna(_serie(df, extras, orden), descendente)
+    return ordenadas[incluidas[ordenadas]]
+
+
+def pagina(df, posiciones, columnas, extras=None, numero=1, filas_por_pagina=FILAS_POR_PAGINA):
+    """DataFrame con solo las filas de la pagina `numero` (desde 1) y las columnas pedidas."""
+    visibles = posiciones[(numero - 1) * filas_por_pagina:numero * filas_por_pagina]
+    vista = df.iloc[visibles, [df.columns.get_loc(c) for c in columnas if c in df.columns]]
+    for nombre, valores in (extras or {}).items():
+        if nombre in columnas:
+            vista = vista.assign(**{nombre: np.asarray(valores)[visibles]})
+    return vista[[c for c in columnas if c in vista.columns]]
+
+
+def tabla_paginada(df, clave, posiciones=None, extras=None, columnas=None, filas_por_pagina=FILAS_POR_PAGINA):
+    """Tabla de Streamlit con paginacion, orden, filtro y seleccion de columnas del lado del servidor.
+
+    `clave` distingue los widgets de cada tabla. Devuelve el DataFrame de la
+    pagina visible.
+    """
+    import streamlit as st
+
+    extras = extras or {}
+    columnas = list(columnas or df.columns) + [c for c in extras if c not in (columnas or ())]
+    estado = st.session_state
+
+    col_columnas, col_orden, col_desc = st.columns([3, 2, 1])
+    mostradas = col_columnas.multiselect("Columnas", columnas, default=columnas, key=f"{clave}_columnas")
+    orden = col_orden.selectbox("Ordenar por", [ORIGINAL] + columnas, key=f"{clave}_orden")
+    descendente = col_desc.toggle("Descendente", key=f"{clave}_descendente")
+    col_filtro, col_texto, col_filas = st.columns([2, 3, 1])
+    columna_filtro = col_filtro.selectbox("Filtrar columna", columnas, key=f"{clave}_columna_filtro")
+    texto_filtro = col_texto.text_input(
+        "Contiene", key=f"{clave}_texto_filtro",
+        help="Texto a buscar en la columna; en columnas numéricas una condición como '>= 0.5' o '3'.")
+    filas_por_pagina = col_filas.selectbox(
+        "Filas", OPCIONES_FILAS, index=OPCIONES_FILAS.index(filas_por_pagina) if filas_por_pagina in OPCIONES_FILAS else 1,
+        key=f"{clave}_filas")
+
+    filtro = (columna_filtro, texto_filtro.strip()) if texto_filtro.strip() else None
+    try:
+        visibles = posiciones_visibles(df, posiciones, extras, None if orden == ORIGINAL else orden, descendente, filtro)
+    except ValueError as error:
+        st.warning(str(error))
+        visibles = posiciones_visibles(df, posiciones, extras, None if orden == ORIGINAL else orden, descendente)
+
+    # al cambiar el filtro, el orden o el tamaño se vuelve a la primera pagina
+    paginas = max(1, math.ceil(len(visibles) / filas_por_pagina))
+    firma = (orden, descendente, filtro, filas_por_pagina, len(visibles))
+    if estado.get(f"{clave}_firma") != firma or estado.get(f"{clave}_pagina", 1) > paginas:
+        estado[f"{clave}_pagina"] = 1
+    estado[f"{clave}_firma"] = firma
+
+    col_pagina, col_info = st.columns([1, 4])
+    numero = col_pagina.number_input("Página", min_value=1, max_value=paginas, step=1, key=f"{clave}_pagina")
+    vista = pagina(df, visibles, mostradas, extras, numero, filas_por_pagina)
+    inicio = (numero - 1) * filas_por_pagina
+    col_info.caption(f"Filas {inicio + 1 if len(visibles) else 0}–{inicio + len(vista)} de {len(visibles)} "
+                     f"(página {numero} de {paginas})")
+    st.dataframe(vista)
+    return vista
@@ -0,0 +1,172 @@
+import json
+import os
+import re
+import shutil
+from itertools import islice
+
+import pyarrow.parquet as pq
+
+from utils.almacen import archivos_de_bloques, escribir_bloque
+from utils.registro import ruta_repo
+
+# modo trabajo de procesar_comentarios.py: cada bloque terminado se escribe como archivos
+# propios dentro del directorio del trabajo y despues se actualiza el checkpoint. Si el
+# proceso se cae, la siguiente corrida saltea los registros ya hechos y sigue desde ahi
+DIRECTORIO_TRABAJOS = ruta_repo("data", "resultados", "trabajos")
+ARCHIVO_CHECKPOINT = "checkpoint.json"
+_BLOQUE = re.compile(r"^bloque-(\d+)\.parquet$")
+
+
+def parsear_shard(texto):
+    """'2/4' -> (2, 4). Los shards se numeran desde 1."""
+    try:
+        indice, total = (int(parte) for parte in texto.split("/"))
+    except ValueError:
+        raise ValueError(f"shard inválido '{texto}', se espera i/n (p. ej. 1/4)") from None
+    if not 1 <= indice <= total:
+        raise ValueError(f"shard inválido '{texto}', i debe estar entre 1 y n")
+    return indice, total
+
+
+def nombre_trabajo(shard=None):
+    return "completo" if shard is None else f"shard-{shard[0]}-de-{shard[1]}"
+
+
+def seleccionar(registros, shard=None, limite=None, saltar=0):
+    """Registros que le tocan a un trabajo.
+
+    El shard i/n toma uno de cada n registros por posicion (los archivos se leen
+    siempre en el mismo orden), `limite` corta el total del trabajo y `saltar`
+    descarta los que ya estan en el checkpoint.
+    """
+    if shard is not None:
+        indice, total = shard
+        registros = islice(registros, indice - 1, None, total)
+    if limite is not None:
+        registros = islice(registros, limite)
+    return islice(registros, saltar, None)
+
+
+def firma_entrada(rutas):
+    # nombre y tamaño, no mtime: los shards pueden correr en maquinas con copias distintas
+    return [[os.path.basename(ruta), os.path.getsize(ruta)] for ruta in rutas]
+
+
+def leer_checkpoint(directorio):
+    ruta = os.path.join(directorio, ARCHIVO_CHECKPOINT)
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class Trabajo:
+    """Directorio de un trabajo de procesamiento: bloques de resultados mas el checkpoint.
+
+    Los parametros (archivos de entrada, shard, tamaño de bloque, modelo) definen
+    que registros le tocan al trabajo y como se procesan; reanudar con otros
+    mezclaria resultados, asi que es un error salvo que se pida reiniciar o que
+    el trabajo anterior ya haya terminado (p. ej. se agregaron exports nuevos):
+    ahi se empieza uno nuevo y `reiniciado` queda en True; la cache de
+    sentimiento evita repetir las inferencias. El limite no es parametro: se
+    puede volver a correr con uno mayor para seguir.
+    """
+
+    def __init__(self, directorio, parametros, reiniciar=False):
+        self.directorio = directorio
+        estado = None if reiniciar else leer_checkpoint(directorio)
+        self.reiniciado = False
+        if estado is not None and estado["parametros"] != parametros:
+            if not estado["terminado"]:
+                distintos = sorted(k for k in set(parametros) | set(estado["parametros"])
+                                   if parametros.get(k) != estado["parametros"].get(k))
+                raise ValueError(f"el checkpoint de '{directorio}' es de otra configuración ({', '.join(distintos)}) "
+                                 "y no terminó; usar --reiniciar para empezar de cero")
+            estado, self.reiniciado = None, True
+        if reiniciar or self.reiniciado:
+            shutil.rmtree(directorio, ignore_errors=True)
+        if estado is None:
+            estado = {"parametros": parametros, "registros": 0, "bloques": 0, "terminado": False}
+        self.estado = estado
+        self._borrar_bloques_sin_checkpoint()
+
+    @property
+    def resultados(self):
+        return os.path.join(self.directorio, "comentarios")
+
+    @property
+    def duplicados(self):
+        # lo que agregó cada bloque al indice de duplicados, para reconstruirlo al reanudar
+        return os.path.join(self.directorio, "duplicados")
+
+    @property
+    def registros(self):
+        return self.estado["registros"]
+
+    def _borrar_bloques_sin_checkpoint(self):
+        # archivos de un bloque que se estaba escribiendo cuando se cayo el proceso
+        for particion, archivo in archivos_de_bloques(self.resultados):
+            coincidencia = _BLOQUE.match(archivo)
+            if coincidencia is None or int(coincidencia.group(1)) >= self.estado["bloques"]:
+                os.remove(os.path.join(self.resultados, particion, archivo))
+        for archivo in self._deltas():
+            if int(_BLOQUE.match(archivo).group(1)) >= self.estado["bloques"]:
+                os.remove(os.path.join(self.duplicados, archivo))
+
+    def _deltas(self):
+        if not os.path.isdir(self.duplicados):
+            return []
+        return sorted(archivo for archivo in os.listdir(self.duplicados) if _BLOQUE.match(archivo))
+
+    def deltas_duplicados(self):
+        """Tablas guardadas con cada bloque para el indice de duplicados, en orden."""
+        for archivo in self._deltas():
+            yield pq.read_table(os.path.join(self.duplicados, archivo))
+
+    def _guardar_checkpoint(self):
+        os.makedirs(self.directorio, exist_ok=True)
+        ruta = os.path.join(self.directorio, ARCHIVO_CHECKPOINT)
+        with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.estado, f, ensure_ascii=False, indent=2)
+        os.replace(ruta + ".tmp", ruta)
+
+    def guardar_bloque(self, filas, registros, duplicados=None):
+        """Escribe los resultados de un bloque y recien despues avanza el checkpoint.
+
+        `duplicados` es la tabla de IndiceDuplicados.nuevos() del bloque, si se usa.
+        """
+        nombre = f"bloque-{self.estado['bloques']:06d}"
+        escribir_bloque(self.resultados, nombre, filas)
+        if duplicados is not None:
+            os.makedirs(self.duplicados, exist_ok=True)
+            ruta = os.path.join(self.duplicados, nombre + ".parquet")
+            pq.write_table(duplicados, ruta + ".tmp")
+            os.replace(ruta + ".tmp", ruta)
+        self.estado["bloques"] += 1
+        self.estado["registros"] += registros
+        self.estado["terminado"] = False
+        self._guardar_checkpoint()
+
+    def terminar(self):
+        self.estado["terminado"] = True
+        self._guardar_checkpoint()
+
+
+def revisar_trabajos(directorios):
+    """Avisos antes de fusionar: trabajos sin terminar y shards que faltan."""
+    avisos = []
+    shards = {}
+    for directorio in directorios:
+        estado = leer_checkpoint(directorio)
+        if estado is None:
+            raise ValueError(f"'{directorio}' no es un trabajo (no tiene {ARCHIVO_CHECKPOINT})")
+        if not estado["terminado"]:
+            avisos.append(f"'{directorio}' no terminó ({estado['registros']} registros procesados)")
+        shard = estado["parametros"].get("shard")
+        if shard is not None:
+            shards.setdefault(shard[1], set()).add(shard[0])
+    for total, presentes in shards.items():
+        faltan = sorted(set(range(1, total + 1)) - presentes)
+        if faltan:
+            avisos.append(f"faltan los shards {', '.join(f'{i}/{total}' for i in faltan)}")
+    return avisos
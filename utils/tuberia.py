@@ -0,0 +1,103 @@
+import queue
+import threading
+
+from utils.perfilado import etapa
+
+# cada etapa corre en su hilo y se comunica con la siguiente por una cola acotada: mientras
+# el modelo procesa un bloque, el lector ya parsea el siguiente y la escritura guarda el
+# anterior. Los hilos alcanzan porque lo pesado (torch, el pool de procesos, el tokenizer
+# rapido, Parquet) suelta el GIL
+CAPACIDAD = 2
+ESPERA = 0.1
+
+_FIN = object()
+
+
+class _Error:
+    def __init__(self, excepcion):
+        self.excepcion = excepcion
+
+
+def _poner(cola, elemento, parar):
+    # put con timeout para no quedar bloqueado si la etapa siguiente ya se detuvo
+    while not parar.is_set():
+        try:
+            cola.put(elemento, timeout=ESPERA)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _sacar(cola, parar):
+    while not parar.is_set():
+        try:
+            return cola.get(timeout=ESPERA)
+        except queue.Empty:
+            pass
+    return _FIN
+
+
+def _fuente(iterable, salida, parar, nombre):
+    try:
+        iterador = iter(iterable)
+        while not parar.is_set():
+            with etapa(nombre) as medicion:
+                try:
+                    elemento = next(iterador)
+                except StopIteration:
+                    break
+                medicion["filas"] = len(elemento) if hasattr(elemento, "__len__") else None
+            if not _poner(salida, elemento, parar):
+                return
+        _poner(salida, _FIN, parar)
+    except BaseException as error:
+        _poner(salida, _Error(error), parar)
+
+
+def _etapa(funcion, entrada, salida, parar, nombre):
+    try:
+        while True:
+            elemento = _sacar(entrada, parar)
+            if elemento is _FIN or isinstance(elemento, _Error):
+                _poner(salida, elemento, parar)
+                return
+            with etapa(nombre):
+                resultado = funcion(elemento)
+            if not _poner(salida, resultado, parar):
+                return
+    except BaseException as error:
+        _poner(salida, _Error(error), parar)
+
+
+def tuberia(fuente, etapas, capacidad=CAPACIDAD, nombre_fuente="lectura"):
+    """Procesa `fuente` con una cadena de etapas concurrentes y genera la salida de la ultima.
+
+    Cada etapa es (nombre, funcion) y recibe lo que produjo la anterior; la
+    fuente (un iterable) y cada etapa corren en su propio hilo. Como cada etapa
+    es un solo hilo y las colas son FIFO, la salida respeta el orden de la
+    fuente. Si una etapa falla, el error se relanza en quien consume y los
+    hilos se detienen; lo mismo si el consumidor deja de iterar.
+    """
+    parar = threading.Event()
+    colas = [queue.Queue(maxsize=capacidad) for _ in range(len(etapas) + 1)]
+    hilos = [threading.Thread(target=_fuente, args=(fuente, colas[0], parar, nombre_fuente),
+                              name=nombre_fuente, daemon=True)]
+    for i, (nombre, funcion) in enumerate(etapas):
+        hilos.append(threading.Thread(target=_etapa, args=(funcion, colas[i], colas[i + 1], parar, nombre),
+                                      name=nombre, daemon=True))
+    for hilo in hilos:
+        hilo.start()
+
+    try:
+        while True:
+            elemento = colas[-1].get()
+            if elemento is _FIN:
+                return
+            if isinstance(elemento, _Error):
+                raise elemento.excepcion
+            yield elemento
+    finally:
+        parar.set()
+        for hilo in hilos:
+            hilo.join()